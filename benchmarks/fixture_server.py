@@ -0,0 +1,268 @@
+"""Local fixture site and fake Ollama server for offline benchmarks.
+
+One ThreadingHTTPServer serves both:
+
+- ``/`` and ``/search?q=...``: a minimal search engine whose markup matches
+  the default type/click/extract selectors used by the planner.
+- ``/app`` and ``/consent``: a client-rendered shell and a consent wall with
+  no results, pages the HTTP fast path must hand to the browser.
+- ``/api/generate``, ``/api/chat``, ``/api/tags``, ``/api/embeddings``: an
+  Ollama-compatible API that answers after a configurable latency, streaming
+  NDJSON chunks when the request asks for ``"stream": true``. Like Ollama, it
+  only evaluates the part of a prompt that differs from the previous prompt
+  and reports ``prompt_eval_count``/``prompt_eval_duration`` for it. Setting
+  ``server.ollama.available = False`` makes the API answer 503, to exercise
+  backend ejection with several servers.
+"""
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+from urllib.parse import urlparse, parse_qs
+
+SEARCH_HOME = """<!doctype html>
+<html><head><title>Fixture Search</title></head>
+<body>
+<form action="/search" method="get">
+  <textarea name="q"></textarea>
+  <button type="submit">Search</button>
+</form>
+</body></html>
+"""
+
+APP_SHELL = """<!doctype html>
+<html><head><title>App</title><script src="/static/app.js"></script></head>
+<body><div id="root"></div><noscript>You need to enable JavaScript to run this app.</noscript></body></html>
+"""
+
+CONSENT_WALL = """<!doctype html>
+<html><head><title>Before you continue</title></head>
+<body><main>
+<h1>Before you continue to Fixture Search</h1>
+<p>We use cookies and data to deliver and maintain our services, track outages and protect against abuse.</p>
+<p>If you choose to accept all, we will also use cookies and data to develop and improve new services.</p>
+<button>Reject all</button><button>Accept all</button>
+</main></body></html>
+"""
+
+SHOPPING_WORDS = ("laptop", "phone", "buy", "price", "product")
+
+
+def render_results(query: str, count: int = 10) -> str:
+    shopping = any(word in query.lower() for word in SHOPPING_WORDS)
+    blocks = []
+    for i in range(1, count + 1):
+        title = f"{query.title()} result {i}"
+        url = f"https://example{i}.com/{query.replace(' ', '-')}"
+        snippet = f"Detailed information about {query} from source {i}. " * 3
+        extra = f"<span>₹{30000 + i * 1500:,}</span> <span>Rating {3.5 + (i % 3) * 0.5}/5</span>" if shopping else ""
+        blocks.append(
+            f'<div class="g"><h3>{escape(title)}</h3><cite>{escape(url)}</cite>'
+            f'<div>{escape(snippet)}</div>{extra}</div>'
+        )
+    return (
+        "<!doctype html><html><head><title>Results</title></head><body>"
+        f'<div id="search"><div id="rso">{"".join(blocks)}</div></div></body></html>'
+    )
+
+
+class FakeOllama:
+    """Canned Ollama responses; planning prompts get a plan for the fixture site"""
+
+    def __init__(self, site_url: str, latency_ms: int = 200, token_ms: int = 5, prompt_token_ms: float = 0.2):
+        self.site_url = site_url
+        self.latency_ms = latency_ms
+        self.token_ms = token_ms
+        self.prompt_token_ms = prompt_token_ms
+        self.calls = {"generate": 0, "chat": 0, "embeddings": 0}
+        self.available = True
+        self.loaded = set()
+        self._last_prompt = ""
+        self._prompt_lock = threading.Lock()
+
+    def _text_of(self, payload: Dict[str, Any]) -> str:
+        parts = [payload.get("system", ""), payload.get("prompt", "")]
+        parts += [m.get("content", "") for m in payload.get("messages", [])]
+        return "\n".join(p for p in parts if p)
+
+    def answer(self, payload: Dict[str, Any]) -> str:
+        text = self._text_of(payload)
+        if "browser actions" in text:
+            return json.dumps([
+                {"action": "navigate", "value": self.site_url, "description": "Open fixture search"},
+                {"action": "type", "selector": "textarea[name='q']", "value": "fixture query",
+                 "description": "Type search query"},
+                {"action": "click", "selector": "button[type='submit']", "description": "Submit search"},
+                {"action": "wait", "value": "5000", "selector": ".g", "description": "Wait for results"},
+                {"action": "extract", "selector": ".g", "description": "Extract search results"}
+            ])
+        if "valid JSON" in text or payload.get("format"):
+            # Properties come in schema order, summary first
+            return json.dumps({
+                "summary": "Fixture summary of the extracted results.",
+                "query": "fixture query",
+                "products": [{"name": f"Product {i}", "price": f"₹{30000 + i * 1500}", "rating": "4.0",
+                              "store": f"example{i}.com", "specifications": "8GB RAM"} for i in range(1, 6)],
+                "results": [{"title": f"Result {i}", "description": "Fixture description",
+                             "source": f"example{i}.com", "relevance": "high"} for i in range(1, 6)],
+                "key_findings": ["Finding one", "Finding two"]
+            })
+        return "Here is a concise summary of the fixture results. " * 4
+
+    def evaluate_prompt(self, payload: Dict[str, Any]) -> Dict[str, int]:
+        """Evaluate the prompt past the prefix shared with the previous one (~4 chars per token)"""
+        text = self._text_of(payload)
+        with self._prompt_lock:
+            shared = len(os.path.commonprefix([self._last_prompt, text]))
+            self._last_prompt = text
+        evaluated = max(1, (len(text) - shared) // 4)
+        time.sleep(evaluated * self.prompt_token_ms / 1000)
+        return {"prompt_eval_count": evaluated, "prompt_eval_duration": int(evaluated * self.prompt_token_ms * 1e6)}
+
+    def delay(self):
+        """Time to first token"""
+        time.sleep(self.latency_ms / 1000)
+
+    def chunks(self, text: str):
+        """Split an answer into word-sized chunks, paced at ``token_ms`` each"""
+        for chunk in re.findall(r'\S+\s*|\s+', text):
+            time.sleep(self.token_ms / 1000)
+            yield chunk
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections at exit is expected
+        pass
+
+
+class FixtureServer:
+    """Runs the fixture site and fake Ollama on 127.0.0.1 in a background thread"""
+
+    def __init__(self, llm_latency_ms: int = 200, page_latency_ms: int = 0, port: int = 0, token_ms: int = 5):
+        self.page_latency_ms = page_latency_ms
+        self._httpd = _QuietServer(("127.0.0.1", port), self._handler_class())
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self.ollama = FakeOllama(self.url + "/", llm_latency_ms, token_ms)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, data: Dict[str, Any]):
+                self._send(200, json.dumps(data).encode("utf-8"), "application/json")
+
+            def _send_stream(self, lines):
+                """Chunked NDJSON response, one object per write"""
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for data in lines:
+                    body = (json.dumps(data) + "\n").encode("utf-8")
+                    self.wfile.write(f"{len(body):x}\r\n".encode("ascii") + body + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _answer(self, payload: Dict[str, Any], wrap):
+                """Send the answer whole or as a stream; ``wrap`` builds the per-chunk body"""
+                answer = server.ollama.answer(payload)
+                model = payload.get("model")
+                counters = server.ollama.evaluate_prompt(payload)
+                if payload.get("stream", True):
+                    lines = (dict(wrap(chunk), model=model, done=False) for chunk in server.ollama.chunks(answer))
+                    done = dict(counters, model=model, done=True)
+                    self._send_stream(itertools.chain(lines, [done]))
+                else:
+                    # A non-streaming reply waits for the whole generation
+                    for _ in server.ollama.chunks(answer):
+                        pass
+                    self._send_json(dict(wrap(answer), model=model, done=True, **counters))
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                time.sleep(server.page_latency_ms / 1000)
+                if parsed.path == "/":
+                    self._send(200, SEARCH_HOME.encode("utf-8"), "text/html; charset=utf-8")
+                elif parsed.path == "/search":
+                    query = parse_qs(parsed.query).get("q", [""])[0]
+                    self._send(200, render_results(query).encode("utf-8"), "text/html; charset=utf-8")
+                elif parsed.path == "/app":
+                    self._send(200, APP_SHELL.encode("utf-8"), "text/html; charset=utf-8")
+                elif parsed.path == "/consent":
+                    self._send(200, CONSENT_WALL.encode("utf-8"), "text/html; charset=utf-8")
+                elif parsed.path.startswith("/api/") and not server.ollama.available:
+                    self._send(503, b"unavailable", "text/plain")
+                elif parsed.path == "/api/tags":
+                    self._send_json({"models": [{"name": "fixture-model"}]})
+                elif parsed.path == "/api/ps":
+                    self._send_json({"models": [{"name": name} for name in sorted(server.ollama.loaded)]})
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                path = urlparse(self.path).path
+                ollama = server.ollama
+                if not ollama.available:
+                    self._send(503, b"unavailable", "text/plain")
+                    return
+                if payload.get("model"):
+                    ollama.loaded.add(payload["model"])
+                if path == "/api/generate" and not payload.get("prompt"):
+                    # A prompt-less generate only loads the model, as in Ollama
+                    self._send_json({"model": payload.get("model"), "response": "", "done": True,
+                                     "done_reason": "load"})
+                    return
+                ollama.delay()
+
+                if path == "/api/generate":
+                    ollama.calls["generate"] += 1
+                    self._answer(payload, lambda text: {"response": text})
+                elif path == "/api/chat":
+                    ollama.calls["chat"] += 1
+                    self._answer(payload, lambda text: {"message": {"role": "assistant", "content": text}})
+                elif path in ("/api/embeddings", "/api/embed"):
+                    ollama.calls["embeddings"] += 1
+                    text = payload.get("prompt") or payload.get("input") or ""
+                    vector = [float((sum(map(ord, text)) * (i + 1)) % 97) / 97 for i in range(32)]
+                    self._send_json({"embedding": vector, "embeddings": [vector]})
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+        return Handler
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""End-to-end latency benchmark against a local fixture site and fake Ollama.
+
+Runs the query corpus through the agent, the chat manager and the console
+front end, then reports p50/p95/p99 per pipeline stage. Nothing leaves
+127.0.0.1, so runs are repeatable and comparable across commits.
+
+    python -m benchmarks.run_benchmarks --iterations 3
+    python -m benchmarks.run_benchmarks --save-baseline
+    python -m benchmarks.run_benchmarks --pipelines chat --ollama-backends 3
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config.settings import settings
+from benchmarks.fixture_server import FixtureServer
+from src.utils.helpers import elapsed_ms
+
+DEFAULT_QUERIES = os.path.join(ROOT, "benchmarks", "queries.json")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+PIPELINES = ("agent", "chat", "console")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return round(ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower), 1)
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        stage: {"p50": percentile(values, 50), "p95": percentile(values, 95),
+                "p99": percentile(values, 99), "n": len(values)}
+        for stage, values in samples.items()
+    }
+
+
+def configure(server: FixtureServer, work_dir: str, use_cache: bool, use_rules: bool = False,
+              ollama_urls: List[str] = None):
+    """Point every component at the fixture server and a throwaway cache.
+
+    Intent rules are off by default because their plans target live sites.
+    ``ollama_urls`` spreads LLM calls over several fake Ollama servers.
+    """
+    settings.OLLAMA_BASE_URL = server.url
+    settings.OLLAMA_BASE_URLS = ollama_urls or [server.url]
+    settings.CACHE_DIR = os.path.join(work_dir, ".cache")
+    settings.HAR_DIR = os.path.join(work_dir, "hars")
+    settings.HAR_MODE = "off"
+    settings.PAGE_CACHE_ENABLED = use_cache
+    settings.PLAN_CACHE_ENABLED = use_cache
+    settings.INTENT_RULES_ENABLED = use_rules
+
+
+def record(samples: Dict[str, List[float]], stage: str, value):
+    if value is not None:
+        samples.setdefault(stage, []).append(value)
+
+
+def discard_chunk(chunk: str):
+    pass
+
+
+def bench_agent(queries: List[Dict], iterations: int, stream: bool = True) -> Dict[str, List[float]]:
+    from src.orchestrator.agent import WebNavigatorAgent
+
+    agent = WebNavigatorAgent(output_dir="outputs")
+    samples: Dict[str, List[float]] = {}
+    try:
+        for _ in range(iterations):
+            for item in queries:
+                if item["kind"] != "navigation":
+                    continue
+                started = time.perf_counter()
+                result = agent.execute_task(item["query"], on_chunk=discard_chunk if stream else None)
+                record(samples, "wall", elapsed_ms(started))
+                if not result.get("success"):
+                    print(f"  agent failed on {item['query']!r}: {result.get('error')}")
+                    continue
+                for stage, value in result.get("metrics", {}).get("timings_ms", {}).items():
+                    record(samples, stage, value)
+                record(samples, "plan_prompt_eval_saved",
+                       result.get("metrics", {}).get("plan", {}).get("prompt_eval", {}).get("saved_ms"))
+    finally:
+        agent.shutdown()
+    return samples
+
+
+def bench_chat(queries: List[Dict], iterations: int, stream: bool = True) -> Dict[str, List[float]]:
+    from src.chat.chat_manager import ChatManager
+
+    manager = ChatManager()
+    samples: Dict[str, List[float]] = {}
+    try:
+        for _ in range(iterations):
+            conversation_id = manager.start_new_conversation()
+            for item in queries:
+                started = time.perf_counter()
+                result = manager.process_message(item["query"], conversation_id,
+                                                 on_chunk=discard_chunk if stream else None)
+                record(samples, f"{item['kind']}_wall", elapsed_ms(started))
+                for stage, value in result.get("metadata", {}).get("timings_ms", {}).items():
+                    record(samples, f"{item['kind']}_{stage}", value)
+                record(samples, f"{item['kind']}_prompt_eval_saved",
+                       result.get("metadata", {}).get("prompt_eval", {}).get("saved_ms"))
+    finally:
+        manager.agent.shutdown()
+    return samples
+
+
+def bench_console(queries: List[Dict], iterations: int, stream: bool = True) -> Dict[str, List[float]]:
+    """The console always streams; ``stream`` is accepted for a uniform signature"""
+    from rich.console import Console
+    from chat_console import ConsoleChat
+
+    chat = ConsoleChat()
+    chat.console = Console(file=io.StringIO(), width=100)
+    samples: Dict[str, List[float]] = {}
+    try:
+        for _ in range(iterations):
+            chat.current_conv_id = chat.chat_manager.start_new_conversation()
+            for item in queries:
+                started = time.perf_counter()
+                chat.send_message(item["query"])
+                record(samples, f"{item['kind']}_total", elapsed_ms(started))
+    finally:
+        chat.chat_manager.agent.shutdown()
+    return samples
+
+
+BENCHES = {"agent": bench_agent, "chat": bench_chat, "console": bench_console}
+
+
+def print_report(report: Dict[str, Dict[str, Dict[str, float]]], baseline: Dict = None):
+    for pipeline, stages in report.items():
+        print(f"\n{pipeline}")
+        print(f"  {'stage':<24}{'p50':>10}{'p95':>10}{'p99':>10}{'n':>6}{'Δp50':>10}")
+        for stage, stats in stages.items():
+            delta = ""
+            base = (baseline or {}).get(pipeline, {}).get(stage)
+            if base and base.get("p50"):
+                delta = f"{(stats['p50'] - base['p50']) / base['p50'] * 100:+.1f}%"
+            print(f"  {stage:<24}{stats['p50']:>10}{stats['p95']:>10}{stats['p99']:>10}{stats['n']:>6}{delta:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end latency benchmark")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--llm-latency", type=int, default=200, help="Fake Ollama time to first token (ms)")
+    parser.add_argument("--page-latency", type=int, default=0, help="Fixture site latency per request (ms)")
+    parser.add_argument("--pipelines", default=",".join(PIPELINES))
+    parser.add_argument("--queries", default=DEFAULT_QUERIES)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--with-cache", action="store_true", help="Leave the page and plan caches enabled")
+    parser.add_argument("--with-rules", action="store_true", help="Enable intent rules (plans hit live sites)")
+    parser.add_argument("--no-stream", action="store_true", help="Request whole responses instead of streaming")
+    parser.add_argument("--token-latency", type=int, default=5, help="Fake Ollama delay per streamed chunk (ms)")
+    parser.add_argument("--ollama-backends", type=int, default=1, help="Fake Ollama servers to route across")
+    args = parser.parse_args()
+
+    with open(args.queries, 'r', encoding='utf-8') as f:
+        queries = json.load(f)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    report = {}
+    with contextlib.ExitStack() as stack:
+        servers = [
+            stack.enter_context(FixtureServer(args.llm_latency, args.page_latency, token_ms=args.token_latency))
+            for _ in range(max(1, args.ollama_backends))
+        ]
+        server = servers[0]
+        work_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        configure(server, work_dir, args.with_cache, args.with_rules, [s.url for s in servers])
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            for name in args.pipelines.split(","):
+                name = name.strip()
+                if name not in BENCHES:
+                    parser.error(f"Unknown pipeline: {name}")
+                print(f"Running {name} x{args.iterations}...")
+                report[name] = summarize(BENCHES[name](queries, args.iterations, not args.no_stream))
+        finally:
+            os.chdir(cwd)
+        calls = {s.url: dict(s.ollama.calls) for s in servers}
+
+    print_report(report, baseline)
+    print(f"\nFake Ollama calls: {calls}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
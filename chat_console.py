@@ -3,6 +3,7 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.markdown import Markdown
 from rich.prompt import Prompt
+from rich.live import Live
 from rich import print as rprint
 from src.chat.chat_manager import ChatManager
 import sys
@@ -88,21 +89,7 @@ I combine AI chat with web browsing capabilities. I can search the web for you a
                     continue
                 
                 # Process the message
-                self.display_message("user", user_input, is_markdown=False)
-                
-                # Show typing indicator
-                with self.console.status("[bold green]Thinking...", spinner="dots"):
-                    result = self.chat_manager.process_message(user_input, self.current_conv_id)
-                
-                # Display response
-                self.display_message("assistant", result["response"])
-                
-                # Show metadata if available
-                if result.get("type") == "web_navigation":
-                    if result.get("success"):
-                        self.console.print(f"[green]✓ Web search completed successfully[/green]")
-                    else:
-                        self.console.print(f"[red]✗ Web search failed[/red]")
+                self.send_message(user_input)
                 
             except KeyboardInterrupt:
                 self.console.print("\n[yellow]👋 Goodbye![/yellow]")
@@ -110,6 +97,55 @@ I combine AI chat with web browsing capabilities. I can search the web for you a
             except Exception as e:
                 self.console.print(f"[red]Error: {e}[/red]")
     
+    def _assistant_panel(self, content: str) -> Panel:
+        return Panel(
+            Markdown(content),
+            title="[b]🤖 Assistant[/b]",
+            title_align="left",
+            style="cyan",
+            border_style="cyan"
+        )
+    
+    def send_message(self, user_input: str) -> dict:
+        """Process one user message and render the response as it streams"""
+        self.display_message("user", user_input, is_markdown=False)
+        
+        streamed = []
+        live = None
+        
+        # Show typing indicator until the first chunk arrives
+        status = self.console.status("[bold green]Thinking...", spinner="dots")
+        status.start()
+        
+        def render_chunk(chunk: str):
+            nonlocal live
+            if live is None:
+                status.stop()
+                live = Live(self._assistant_panel(""), console=self.console, refresh_per_second=10)
+                live.start()
+            streamed.append(chunk)
+            live.update(self._assistant_panel("".join(streamed)))
+        
+        try:
+            result = self.chat_manager.process_message(user_input, self.current_conv_id, on_chunk=render_chunk)
+        finally:
+            status.stop()
+            if live is not None:
+                live.stop()
+        
+        # Display response (unless it was already rendered live)
+        if "".join(streamed) != result["response"]:
+            self.display_message("assistant", result["response"])
+        
+        # Show metadata if available
+        if result.get("type") == "web_navigation":
+            if result.get("success"):
+                self.console.print(f"[green]✓ Web search completed successfully[/green]")
+            else:
+                self.console.print(f"[red]✗ Web search failed[/red]")
+        
+        return result
+    
     def _show_conversations(self):
         """Show list of conversations"""
         conversations = self.chat_manager.get_conversation_list()
@@ -9,5 +9,128 @@ class Settings:
     BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "True").lower() == "true"
     DEFAULT_TIMEOUT = int(os.getenv("DEFAULT_TIMEOUT", "30000"))
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+
+    # Keep-alive connection pool shared by every OllamaClient (timeout in seconds)
+    OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "8"))
+    OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT", "120"))
+
+    # Several Ollama servers, comma-separated (empty means just OLLAMA_BASE_URL).
+    # Requests go to the least-loaded admitted server; one failing OLLAMA_EJECT_AFTER
+    # times in a row is ejected until a health probe passes OLLAMA_EJECT_SECONDS later.
+    OLLAMA_BASE_URLS = [u.strip() for u in os.getenv("OLLAMA_BASE_URLS", "").split(",") if u.strip()]
+    OLLAMA_HEALTH_INTERVAL = int(os.getenv("OLLAMA_HEALTH_INTERVAL", "15"))
+    OLLAMA_PROBE_TIMEOUT = int(os.getenv("OLLAMA_PROBE_TIMEOUT", "3"))
+    OLLAMA_EJECT_AFTER = int(os.getenv("OLLAMA_EJECT_AFTER", "3"))
+    OLLAMA_EJECT_SECONDS = int(os.getenv("OLLAMA_EJECT_SECONDS", "30"))
+    OLLAMA_LATENCY_EWMA_ALPHA = float(os.getenv("OLLAMA_LATENCY_EWMA_ALPHA", "0.3"))
+    OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "True").lower() == "true"
+
+    # Generation budgets. Every call (and the warm-up) uses the same num_ctx, since
+    # Ollama reloads a model whenever it changes; it must fit the largest prompt,
+    # the summary reduce over SUMMARY_SINGLE_PASS_TOKENS of notes
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+    OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+    OLLAMA_DEFAULT_MAX_TOKENS = int(os.getenv("OLLAMA_DEFAULT_MAX_TOKENS", "512"))
+    PLANNER_MAX_TOKENS = int(os.getenv("PLANNER_MAX_TOKENS", "400"))
+    CHAT_MAX_TOKENS = int(os.getenv("CHAT_MAX_TOKENS", "400"))
+
+    # Per-stage models. MODEL_POLICY gives each stage SMALL_MODEL or LARGE_MODEL
+    # (latency, balanced or quality; both default to OLLAMA_MODEL) and a stage's
+    # own *_MODEL pins it. Output failing validation is retried on LARGE_MODEL.
+    MODEL_POLICY = os.getenv("MODEL_POLICY", "balanced")
+    SMALL_MODEL = os.getenv("SMALL_MODEL", "")
+    LARGE_MODEL = os.getenv("LARGE_MODEL", "")
+    PLANNER_MODEL = os.getenv("PLANNER_MODEL", "")
+    CHAT_MODEL = os.getenv("CHAT_MODEL", "")
+    SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "")
+    MAP_MODEL = os.getenv("MAP_MODEL", "")
+    EXPORT_MODEL = os.getenv("EXPORT_MODEL", "")
+
+    # Boilerplate stripping and near-duplicate removal (MinHash similarity) before summarizing
+    TEXT_CLEANING_ENABLED = os.getenv("TEXT_CLEANING_ENABLED", "True").lower() == "true"
+    CLEAN_DEDUPE_THRESHOLD = float(os.getenv("CLEAN_DEDUPE_THRESHOLD", "0.8"))
+
+    # File exports built from regex-extracted records; the LLM only fills missing required fields
+    HEURISTIC_EXPORT_ENABLED = os.getenv("HEURISTIC_EXPORT_ENABLED", "True").lower() == "true"
+    HEURISTIC_EXPORT_LLM_FILL = os.getenv("HEURISTIC_EXPORT_LLM_FILL", "True").lower() == "true"
+
+    # Structured summaries kept for re-rendering as chat text or any file format (TTL in seconds)
+    STRUCTURED_RESULT_TTL = int(os.getenv("STRUCTURED_RESULT_TTL", "3600"))
+    STRUCTURED_RESULT_MAX_ENTRIES = int(os.getenv("STRUCTURED_RESULT_MAX_ENTRIES", "64"))
+
+    # Map-reduce summarization for extractions over SUMMARY_SINGLE_PASS_TOKENS:
+    # chunks are condensed SUMMARY_MAP_CONCURRENCY at a time, and the notes are
+    # mapped again until they fit one call
+    SUMMARY_SINGLE_PASS_TOKENS = int(os.getenv("SUMMARY_SINGLE_PASS_TOKENS", "1500"))
+    SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "1000"))
+    SUMMARY_MAX_CHUNKS = int(os.getenv("SUMMARY_MAX_CHUNKS", "8"))
+    SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+    SUMMARY_MAP_MAX_TOKENS = int(os.getenv("SUMMARY_MAP_MAX_TOKENS", "200"))
+
+    # BM25 ranking of extracted results against the query, packed into this many
+    # tokens (by default the SUMMARY_MAX_CHUNKS chunks the map stage takes)
+    RANKING_ENABLED = os.getenv("RANKING_ENABLED", "True").lower() == "true"
+    RANK_TOKEN_BUDGET = int(os.getenv("RANK_TOKEN_BUDGET", str(SUMMARY_CHUNK_TOKENS * SUMMARY_MAX_CHUNKS)))
+
+    # Warm browser pool (0 disables pooling and launches a browser per task)
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    BROWSER_POOL_MAX_TASKS = int(os.getenv("BROWSER_POOL_MAX_TASKS", "50"))
+    BROWSER_POOL_MAX_RSS_GROWTH_MB = int(os.getenv("BROWSER_POOL_MAX_RSS_GROWTH_MB", "512"))
+    BROWSER_POOL_ACQUIRE_TIMEOUT = int(os.getenv("BROWSER_POOL_ACQUIRE_TIMEOUT", "60000"))
+
+    # Local state (readiness timings, caches, learned statistics)
+    CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+    # Event-driven waits: a page is ready once the DOM and network are quiet this long
+    READINESS_QUIET_MS = int(os.getenv("READINESS_QUIET_MS", "500"))
+    EXTRACT_READY_TIMEOUT = int(os.getenv("EXTRACT_READY_TIMEOUT", "3000"))
+
+    # Lean page-load profile, applied when a plan has no screenshot step
+    LEAN_PROFILE_ENABLED = os.getenv("LEAN_PROFILE_ENABLED", "True").lower() == "true"
+    LEAN_BLOCKED_RESOURCE_TYPES = [
+        t.strip() for t in os.getenv("LEAN_BLOCKED_RESOURCE_TYPES", "image,media,font").split(",") if t.strip()
+    ]
+    LEAN_BLOCKED_HOSTS = [
+        h.strip() for h in os.getenv(
+            "LEAN_BLOCKED_HOSTS",
+            "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,"
+            "adservice.google.com,facebook.net,connect.facebook.net,hotjar.com,scorecardresearch.com"
+        ).split(",") if h.strip()
+    ]
+
+    # Plain HTTP + BeautifulSoup for plans that don't need a browser
+    HTTP_FAST_PATH_ENABLED = os.getenv("HTTP_FAST_PATH_ENABLED", "True").lower() == "true"
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+    HTTP_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "10000"))
+
+    # Extracted page text cache (TTL in seconds; evicted entries spill to disk)
+    PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "True").lower() == "true"
+    PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", "900"))
+    PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "256"))
+    PAGE_CACHE_DISK = os.getenv("PAGE_CACHE_DISK", "True").lower() == "true"
+
+    # Learned per-domain extract selector ordering
+    SELECTOR_STATS_HALF_LIFE_DAYS = float(os.getenv("SELECTOR_STATS_HALF_LIFE_DAYS", "7"))
+
+    # HAR record/replay for offline, repeatable runs: off, record or replay
+    HAR_MODE = os.getenv("HAR_MODE", "off")
+    HAR_DIR = os.getenv("HAR_DIR", "hars")
+
+    # Rule-based planning for common intents before the LLM is asked
+    INTENT_RULES_ENABLED = os.getenv("INTENT_RULES_ENABLED", "True").lower() == "true"
+
+    # Macros learned from successful runs; demoted below this smoothed success rate
+    MACROS_ENABLED = os.getenv("MACROS_ENABLED", "True").lower() == "true"
+    MACRO_MIN_SCORE = float(os.getenv("MACRO_MIN_SCORE", "0.6"))
+
+    # Plan cache in front of the planner: exact query match, then embedding similarity
+    PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "True").lower() == "true"
+    PLAN_CACHE_TTL = int(os.getenv("PLAN_CACHE_TTL", "86400"))
+    PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "512"))
+    PLAN_CACHE_SIMILARITY = float(os.getenv("PLAN_CACHE_SIMILARITY", "0.9"))
+    OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+
+    # Concurrent contexts per event loop for the asyncio browser engine
+    ASYNC_MAX_CONCURRENT_TASKS = int(os.getenv("ASYNC_MAX_CONCURRENT_TASKS", "32"))
     
 settings = Settings()
\ No newline at end of file
@@ -1 +1,47 @@
- 
+"""Browser action vocabulary shared by the sync and async controllers"""
+
+ACTION_TYPES = ("navigate", "type", "click", "wait", "extract", "scroll")
+
+# Actions that need the page fully rendered (images, fonts, media)
+VISUAL_ACTION_TYPES = ("screenshot",)
+
+DEFAULT_TYPE_SELECTOR = "textarea[name='q'], input[name='q']"
+DEFAULT_CLICK_SELECTOR = "input[value='Google Search'], button[type='submit']"
+DEFAULT_EXTRACT_SELECTOR = ".g, .rc, .tF2Cxc, .MjjYud, .sh-dlr__content"
+
+# Fallback selectors tried in order when the planned extract selector misses
+COMMON_RESULT_SELECTORS = [
+    ".g", ".rc", ".tF2Cxc", ".MjjYud",  # Organic results
+    ".sh-dlr__content", ".pla-unit",    # Shopping results
+    ".i0X6df", ".KZmu8e",              # More shopping
+    "[data-sokoban-container]",         # Google container
+    ".hlcw0c", ".yuRUbf"               # Additional containers
+]
+
+# Main content areas used for the visible-text fallback
+CONTENT_SELECTORS = ["#search", "#rso", "#center_col", "main", "body"]
+
+SCROLL_TO_BOTTOM_JS = "window.scrollTo(0, document.body.scrollHeight)"
+
+# Extract results that mean the plan did not reach the data
+FAILED_EXTRACTION_MARKERS = (
+    "No data found", "No extractable content found", "Extraction error",
+    "Error executing", "Selector error", "unusual traffic"
+)
+
+
+def normalize_navigation_url(url: str) -> str:
+    """Add a scheme to bare hostnames like 'google.com'"""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+
+def needs_full_page_load(actions) -> bool:
+    """True if any planned action depends on how the page looks"""
+    return any(action.get("action") in VISUAL_ACTION_TYPES for action in actions)
+
+
+def extraction_failed(extracted_data: str) -> bool:
+    """True if an extract result is empty or one of the failure messages"""
+    return not extracted_data or any(m in extracted_data for m in FAILED_EXTRACTION_MARKERS)
@@ -0,0 +1,195 @@
+import asyncio
+from typing import Dict, Any, Optional
+from playwright.async_api import async_playwright
+from config.settings import settings
+from src.browser.actions import (
+    DEFAULT_TYPE_SELECTOR, DEFAULT_CLICK_SELECTOR, DEFAULT_EXTRACT_SELECTOR,
+    SCROLL_TO_BOTTOM_JS, normalize_navigation_url
+)
+from src.browser.batch_extractor import BatchExtractor, BATCH_EXTRACT_JS
+from src.browser.readiness import ReadinessEngine
+from src.browser.resource_blocking import ResourceBlocker
+from src.browser.selector_stats import SelectorStats
+from src.browser.har import HarSession
+from src.browser.playwright_controller import CONTEXT_OPTIONS
+
+
+class AsyncBrowserEngine:
+    """One async Chromium shared by many concurrent tasks on a single event loop.
+
+    Each task gets its own BrowserContext; ``max_concurrency`` bounds how many
+    contexts are open at once.
+    """
+
+    def __init__(self, max_concurrency: int = None):
+        self.max_concurrency = max_concurrency or settings.ASYNC_MAX_CONCURRENT_TASKS
+        self.playwright = None
+        self.browser = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    async def start(self):
+        """Start Playwright and launch the shared browser (idempotent)"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._start_lock:
+            if self.browser and self.browser.is_connected():
+                return
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=settings.BROWSER_HEADLESS
+            )
+
+    async def new_context(self, **context_options):
+        """Wait for a free concurrency slot and open a fresh context"""
+        await self.start()
+        await self._semaphore.acquire()
+        try:
+            return await self.browser.new_context(**(context_options or CONTEXT_OPTIONS))
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    async def release_context(self, context):
+        try:
+            await context.close()
+        except Exception:
+            pass
+        finally:
+            self._semaphore.release()
+
+    async def close(self):
+        """Close the shared browser and stop Playwright"""
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+
+class AsyncPlaywrightController:
+    """asyncio counterpart of PlaywrightController with the same action vocabulary"""
+
+    def __init__(self, engine: AsyncBrowserEngine = None, readiness: ReadinessEngine = None,
+                 selector_stats: SelectorStats = None):
+        self.engine = engine
+        self._owns_engine = engine is None
+        self.context = None
+        self.page = None
+        self.extractor = BatchExtractor(stats=selector_stats)
+        self.readiness = readiness or ReadinessEngine()
+        self.blocker = None
+
+    async def start_browser(self, lean: bool = False, har: HarSession = None):
+        """Open an isolated context (and page) on the shared browser"""
+        if self.engine is None:
+            self.engine = AsyncBrowserEngine(max_concurrency=1)
+        context_options = dict(CONTEXT_OPTIONS, **(har.context_options() if har else {}))
+        self.context = await self.engine.new_context(**context_options)
+        try:
+            # HAR replay first; the lean profile is matched before it and falls back
+            if har:
+                await har.apply_async(self.context)
+            if lean:
+                self.blocker = ResourceBlocker()
+                await self.blocker.apply_async(self.context)
+            self.page = await self.context.new_page()
+        except Exception:
+            await self.close()
+            raise
+
+    async def execute_action(self, action: Dict[str, Any]) -> str:
+        """Execute a single browser action with proper error handling"""
+        action_type = action["action"]
+        result = ""
+
+        try:
+            if action_type == "navigate":
+                url = normalize_navigation_url(action["value"])
+                await self.page.goto(url, wait_until="domcontentloaded")
+                result = f"Navigated to {url}"
+
+            elif action_type == "type":
+                selector = action.get("selector", DEFAULT_TYPE_SELECTOR)
+                value = action.get("value", "")
+                await self.page.fill(selector, value)
+                result = f"Typed '{value}' into {selector}"
+
+            elif action_type == "click":
+                selector = action.get("selector", DEFAULT_CLICK_SELECTOR)
+                await self.page.click(selector)
+                result = f"Clicked on {selector}"
+
+            elif action_type == "wait":
+                # The planned value is an upper bound; stop as soon as the page is ready
+                wait_time = int(action.get("value", "2000"))
+                readiness = await self.readiness.wait_async(self.page, wait_time, action.get("selector"))
+                result = f"Waited {readiness['elapsed_ms']}ms for {readiness['condition']} (max {wait_time}ms)"
+
+            elif action_type == "extract":
+                selector = action.get("selector", DEFAULT_EXTRACT_SELECTOR)
+                result = await self.extract_google_results(selector)
+
+            elif action_type == "scroll":
+                await self.page.evaluate(SCROLL_TO_BOTTOM_JS)
+                result = "Scrolled to bottom"
+
+            else:
+                result = f"Unknown action: {action_type}"
+
+        except Exception as e:
+            result = f"Error executing {action_type}: {str(e)}"
+
+        return result
+
+    async def extract_google_results(self, selector: str = None) -> str:
+        """Extract Google search results with multiple fallback strategies"""
+        try:
+            url = self.page.url
+            selectors = self.extractor.candidate_selectors(selector, url)
+
+            # Wait until any result container appears (or the page settles)
+            await self.readiness.wait_async(self.page, settings.EXTRACT_READY_TIMEOUT, ", ".join(selectors))
+
+            # Every strategy (planned selector, common selectors, visible text)
+            # is evaluated in one page round trip; fallback order is unchanged
+            payload = await self.page.evaluate(BATCH_EXTRACT_JS, self.extractor.script_args(selectors))
+            self.extractor.record(payload, url)
+            return self.extractor.select_result(payload, selector)
+
+        except Exception as e:
+            return f"Extraction error: {str(e)}"
+
+    async def _extract_with_selector(self, selector: str) -> str:
+        """Extract data using a specific CSS selector"""
+        try:
+            payload = await self.page.evaluate(
+                BATCH_EXTRACT_JS, self.extractor.script_args([selector], include_visible_text=False)
+            )
+            return self.extractor.format_hit(payload["hits"][0])
+
+        except Exception as e:
+            return f"Selector error: {str(e)}"
+
+    async def _extract_visible_text(self) -> str:
+        """Extract visible text from the main content area"""
+        try:
+            payload = await self.page.evaluate(BATCH_EXTRACT_JS, self.extractor.script_args([]))
+            return self.extractor.format_visible_text(payload.get("visibleText"))
+
+        except Exception as e:
+            return f"Visible text extraction error: {str(e)}"
+
+    async def close(self):
+        """Close this task's context; the shared browser stays up"""
+        if self.context:
+            await self.engine.release_context(self.context)
+            self.context = None
+            self.page = None
+        if self._owns_engine and self.engine:
+            await self.engine.close()
+            self.engine = None
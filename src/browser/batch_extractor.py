@@ -0,0 +1,118 @@
+from typing import Dict, Any, List, Optional
+from src.browser.actions import COMMON_RESULT_SELECTORS, CONTENT_SELECTORS
+from src.browser.selector_stats import SelectorStats
+
+# Evaluated in the page: runs every candidate selector (plus the visible-text
+# fallback) in a single round trip instead of one IPC call per element.
+BATCH_EXTRACT_JS = """
+({selectors, contentSelectors, limit, minLength, minContentLength, minLineLength, maxLines}) => {
+    const hits = selectors.map((selector) => {
+        let elements;
+        try {
+            elements = Array.from(document.querySelectorAll(selector));
+        } catch (e) {
+            return {selector, error: String(e), count: 0, results: []};
+        }
+        const results = [];
+        elements.slice(0, limit).forEach((element, i) => {
+            const text = (element.innerText || "").trim();
+            if (text && text.length > minLength) {
+                results.push({index: i + 1, text});
+            }
+        });
+        return {selector, count: elements.length, results};
+    });
+
+    let visibleText = null;
+    for (const selector of contentSelectors) {
+        const element = document.querySelector(selector);
+        if (!element) continue;
+        const text = (element.innerText || "").trim();
+        if (text.length > minContentLength) {
+            visibleText = text.split("\\n")
+                .map((line) => line.trim())
+                .filter((line) => line.length > minLineLength)
+                .slice(0, maxLines);
+            break;
+        }
+    }
+
+    return {hits, visibleText};
+}
+"""
+
+
+class BatchExtractor:
+    """Builds the in-page batch extraction call and renders its payload.
+
+    Output text matches the per-element extractor exactly: ``Result N: ...``
+    lines for the first selector that produced data, in fallback order. With
+    ``stats`` the fallback selectors are ordered by their hit rate on the
+    page's domain, and every batch outcome is recorded back.
+    """
+
+    def __init__(self, common_selectors: List[str] = None, content_selectors: List[str] = None,
+                 limit: int = 10, min_length: int = 20, stats: SelectorStats = None):
+        self.common_selectors = common_selectors if common_selectors is not None else COMMON_RESULT_SELECTORS
+        self.content_selectors = content_selectors if content_selectors is not None else CONTENT_SELECTORS
+        self.limit = limit
+        self.min_length = min_length
+        self.stats = stats
+
+    def candidate_selectors(self, selector: str = None, url: str = None) -> List[str]:
+        """Planned selector first, then the common fallbacks (without repeats)"""
+        candidates = []
+        if selector and selector.strip():
+            candidates.append(selector)
+        fallbacks = self.common_selectors
+        if self.stats and url:
+            fallbacks = self.stats.rank(url, fallbacks)
+        for sel in fallbacks:
+            if sel not in candidates:
+                candidates.append(sel)
+        return candidates
+
+    def script_args(self, selectors: List[str], include_visible_text: bool = True) -> Dict[str, Any]:
+        return {
+            "selectors": selectors,
+            "contentSelectors": self.content_selectors if include_visible_text else [],
+            "limit": self.limit,
+            "minLength": self.min_length,
+            "minContentLength": 100,
+            "minLineLength": 30,
+            "maxLines": 15
+        }
+
+    def format_hit(self, hit: Dict[str, Any]) -> str:
+        """Render one selector's hits like _extract_with_selector does"""
+        if hit.get("error"):
+            return f"Selector error: {hit['error']}"
+        lines = [f"Result {item['index']}: {item['text']}" for item in hit.get("results", [])]
+        return "\n".join(lines) if lines else "No data found"
+
+    def format_visible_text(self, visible_text: Optional[List[str]]) -> str:
+        if visible_text is None:
+            return "No extractable content found"
+        return "Visible text content:\n" + "\n".join(visible_text)
+
+    def record(self, payload: Dict[str, Any], url: str):
+        """Feed which selectors produced data on this page into the stats"""
+        if not self.stats or not url:
+            return
+        for hit in payload.get("hits", []):
+            if not hit.get("error"):
+                self.stats.record(url, hit["selector"], bool(hit.get("results")))
+
+    def select_result(self, payload: Dict[str, Any], selector: str = None) -> str:
+        """Apply the fallback order to a batch payload"""
+        primary = selector if selector and selector.strip() else None
+
+        for hit in payload.get("hits", []):
+            if not hit.get("results"):
+                continue
+            result = self.format_hit(hit)
+            if hit["selector"] == primary:
+                return result
+            return f"Found with selector '{hit['selector']}':\n{result}"
+
+        return self.format_visible_text(payload.get("visibleText"))
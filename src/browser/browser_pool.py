@@ -0,0 +1,277 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, Optional
+from playwright.sync_api import sync_playwright
+from config.settings import settings
+
+
+class _BrowserSlot:
+    """One warm Chromium instance owned by a dedicated worker thread.
+
+    The sync Playwright API is bound to the thread that started it, so every
+    call that touches this slot's browser is marshalled onto its worker.
+    """
+
+    def __init__(self, index: int, launch_options: Dict[str, Any]):
+        self.index = index
+        self.launch_options = launch_options
+        self.browser = None
+        self.busy = False
+        self.tasks_served = 0
+        self.baseline_rss = None
+        self._playwright = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name=f"browser-pool-{index}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            fn, args, kwargs, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queue a call on the worker thread without waiting for it"""
+        future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def run(self, fn, *args, **kwargs):
+        """Run a call on the worker thread and return its result"""
+        if threading.current_thread() is self._thread:
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def is_ready(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+    def launch(self):
+        """Launch (or relaunch) the browser. Must run on the worker thread."""
+        self.close_browser()
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        self.browser = self._playwright.chromium.launch(**self.launch_options)
+        self.tasks_served = 0
+        self.baseline_rss = self.measure_rss()
+
+    def close_browser(self):
+        if self.browser:
+            try:
+                self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+
+    def stop(self):
+        """Close the browser, stop Playwright and end the worker thread"""
+        def _stop():
+            self.close_browser()
+            if self._playwright:
+                self._playwright.stop()
+                self._playwright = None
+
+        try:
+            self.run(_stop)
+        finally:
+            self._queue.put(None)
+
+    def measure_rss(self) -> Optional[int]:
+        """Total resident memory in bytes of this browser's processes (Linux only)"""
+        if not self.browser:
+            return None
+        try:
+            session = self.browser.new_browser_cdp_session()
+            info = session.send("SystemInfo.getProcessInfo")
+            session.detach()
+        except Exception:
+            return None
+
+        page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        total = 0
+        for process in info.get("processInfo", []):
+            try:
+                with open(f"/proc/{process['id']}/statm") as f:
+                    total += int(f.read().split()[1]) * page_size
+            except (OSError, ValueError, IndexError, KeyError):
+                continue
+        return total or None
+
+
+class BrowserLease:
+    """A fresh browser context handed out by the pool for a single task"""
+
+    def __init__(self, slot: _BrowserSlot, context, wait_ms: float):
+        self.slot = slot
+        self.context = context
+        self.wait_ms = wait_ms
+
+    def run(self, fn, *args, **kwargs):
+        """Run a call against this lease's browser on its owning thread"""
+        return self.slot.run(fn, *args, **kwargs)
+
+
+class BrowserPool:
+    """Keeps N Chromium browsers warm and hands out isolated contexts per task.
+
+    Browsers are recycled after serving ``max_tasks_per_browser`` tasks or when
+    their resident memory grows by more than ``max_rss_growth_mb`` since launch.
+    """
+
+    def __init__(self, size: int = None, max_tasks_per_browser: int = None,
+                 max_rss_growth_mb: int = None, acquire_timeout: int = None):
+        self.size = size or settings.BROWSER_POOL_SIZE
+        self.max_tasks_per_browser = max_tasks_per_browser or settings.BROWSER_POOL_MAX_TASKS
+        self.max_rss_growth_mb = (
+            max_rss_growth_mb if max_rss_growth_mb is not None
+            else settings.BROWSER_POOL_MAX_RSS_GROWTH_MB
+        )
+        self.acquire_timeout = (acquire_timeout or settings.BROWSER_POOL_ACQUIRE_TIMEOUT) / 1000
+
+        launch_options = {"headless": settings.BROWSER_HEADLESS}
+        self._slots = [_BrowserSlot(i, launch_options) for i in range(self.size)]
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # Metrics
+        self._created_at = time.monotonic()
+        self._busy_since: Dict[int, float] = {}
+        self._busy_seconds = 0.0
+        self._acquisitions = 0
+        self._total_wait_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._launches = 0
+        self._recycles = 0
+
+        atexit.register(self.shutdown)
+
+    def warm_up(self):
+        """Launch every browser up front instead of on first use"""
+        futures = [slot.submit(self._ensure_launched, slot) for slot in self._slots]
+        for future in futures:
+            future.result()
+
+    def acquire(self, context_options: Dict[str, Any] = None) -> BrowserLease:
+        """Wait for an idle browser and open a fresh context on it"""
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is shut down")
+                slot = next((s for s in self._slots if not s.busy), None)
+                if slot:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise TimeoutError(f"No browser available after {self.acquire_timeout:.0f}s")
+            slot.busy = True
+            self._busy_since[slot.index] = time.monotonic()
+
+        try:
+            context = slot.run(self._open_context, slot, context_options or {})
+        except Exception:
+            self._mark_idle(slot)
+            raise
+
+        wait_ms = (time.monotonic() - started) * 1000
+        with self._condition:
+            self._acquisitions += 1
+            self._total_wait_ms += wait_ms
+            self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+
+        return BrowserLease(slot, context, wait_ms)
+
+    def release(self, lease: BrowserLease):
+        """Close the task's context and return its browser to the pool"""
+        slot = lease.slot
+        try:
+            slot.run(self._close_context, lease.context)
+            slot.tasks_served += 1
+            if slot.run(self._needs_recycle, slot):
+                with self._condition:
+                    self._recycles += 1
+                # Relaunch in the background; the slot's queue is FIFO, so the
+                # next task on this slot will simply wait for the new browser.
+                slot.submit(self._ensure_launched, slot, True)
+        finally:
+            self._mark_idle(slot)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool wait time and utilization since the pool was created"""
+        with self._condition:
+            now = time.monotonic()
+            busy_seconds = self._busy_seconds + sum(now - t for t in self._busy_since.values())
+            elapsed = max(now - self._created_at, 1e-9)
+            return {
+                "size": self.size,
+                "busy": len(self._busy_since),
+                "acquisitions": self._acquisitions,
+                "avg_wait_ms": round(self._total_wait_ms / self._acquisitions, 1) if self._acquisitions else 0.0,
+                "max_wait_ms": round(self._max_wait_ms, 1),
+                "utilization": round(busy_seconds / (elapsed * self.size), 3),
+                "launches": self._launches,
+                "recycles": self._recycles
+            }
+
+    def shutdown(self):
+        """Close all browsers and stop the worker threads"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        for slot in self._slots:
+            try:
+                slot.stop()
+            except Exception:
+                pass
+
+    # The following helpers run on the slot's worker thread
+
+    def _ensure_launched(self, slot: _BrowserSlot, force: bool = False):
+        if force or not slot.is_ready():
+            slot.launch()
+            with self._condition:
+                self._launches += 1
+
+    def _open_context(self, slot: _BrowserSlot, context_options: Dict[str, Any]):
+        self._ensure_launched(slot)
+        return slot.browser.new_context(**context_options)
+
+    def _close_context(self, context):
+        try:
+            context.close()
+        except Exception:
+            pass
+
+    def _needs_recycle(self, slot: _BrowserSlot) -> bool:
+        if slot.tasks_served >= self.max_tasks_per_browser:
+            return True
+        if self.max_rss_growth_mb and slot.baseline_rss:
+            rss = slot.measure_rss()
+            if rss and (rss - slot.baseline_rss) > self.max_rss_growth_mb * 1024 * 1024:
+                return True
+        return False
+
+    def _mark_idle(self, slot: _BrowserSlot):
+        with self._condition:
+            since = self._busy_since.pop(slot.index, None)
+            if since is not None:
+                self._busy_seconds += time.monotonic() - since
+            slot.busy = False
+            self._condition.notify()
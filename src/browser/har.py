@@ -0,0 +1,67 @@
+import json
+import os
+import re
+from typing import Dict, Any, List, Optional
+from config.settings import settings
+
+HAR_MODES = ("off", "record", "replay")
+
+
+class HarSession:
+    """Record a task's network traffic to a HAR file, or replay it offline.
+
+    Files are named after the query, so replaying the same query finds the
+    recording. The plan is stored next to the HAR because replay only covers
+    the URLs that were actually visited while recording.
+    """
+
+    def __init__(self, mode: str, name: str, har_dir: str = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown HAR mode: {mode}")
+        self.mode = mode
+        self.har_dir = har_dir or settings.HAR_DIR
+        slug = re.sub(r'[^\w\s-]', '', name.lower()).strip().replace(' ', '_')[:80] or "task"
+        self.path = os.path.join(self.har_dir, f"{slug}.har")
+        self.plan_path = os.path.join(self.har_dir, f"{slug}.plan.json")
+
+    @classmethod
+    def for_task(cls, user_input: str, mode: str = None) -> Optional["HarSession"]:
+        """HarSession for the given (or configured) mode, None when off"""
+        mode = (mode or settings.HAR_MODE).lower()
+        if mode not in HAR_MODES:
+            raise ValueError(f"HAR mode must be one of {', '.join(HAR_MODES)}")
+        return cls(mode, user_input) if mode != "off" else None
+
+    def load_plan(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            with open(self.plan_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_plan(self, actions: List[Dict[str, Any]]):
+        os.makedirs(self.har_dir, exist_ok=True)
+        with open(self.plan_path, 'w', encoding='utf-8') as f:
+            json.dump(actions, f, indent=2, ensure_ascii=False)
+
+    def context_options(self) -> Dict[str, Any]:
+        """Extra new_context() options (recording is finalized on context.close())"""
+        if self.mode == "record":
+            os.makedirs(self.har_dir, exist_ok=True)
+            return {"record_har_path": self.path}
+        return {}
+
+    def _check_recording(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No HAR recording to replay: {self.path}")
+
+    def apply(self, context):
+        """Serve the recording to a sync context; unrecorded requests are aborted"""
+        if self.mode == "replay":
+            self._check_recording()
+            context.route_from_har(self.path, not_found="abort")
+
+    async def apply_async(self, context):
+        if self.mode == "replay":
+            self._check_recording()
+            await context.route_from_har(self.path, not_found="abort")
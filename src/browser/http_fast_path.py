@@ -0,0 +1,168 @@
+import time
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse, quote_plus
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from config.settings import settings
+from src.browser.actions import DEFAULT_EXTRACT_SELECTOR, normalize_navigation_url
+from src.browser.batch_extractor import BatchExtractor
+from src.browser.selector_stats import SelectorStats
+
+# Sites whose search form is a plain GET and whose results render on the server.
+# A navigate + type + click plan on one of these becomes a single request.
+SERVER_RENDERED_SEARCH = {
+    "en.wikipedia.org": "https://en.wikipedia.org/w/index.php?search={query}&fulltext=1",
+    "wikipedia.org": "https://en.wikipedia.org/w/index.php?search={query}&fulltext=1",
+    "duckduckgo.com": "https://html.duckduckgo.com/html/?q={query}",
+    "html.duckduckgo.com": "https://html.duckduckgo.com/html/?q={query}",
+    "pypi.org": "https://pypi.org/search/?q={query}"
+}
+
+# Actions that have no effect on a static HTML fetch
+_IGNORED_ACTIONS = ("wait", "scroll")
+
+_JS_SHELL_MARKERS = (
+    "enable javascript", "requires javascript", "javascript is disabled",
+    "please turn on javascript", "you need to enable javascript"
+)
+
+
+class HttpFastPath:
+    """Runs navigate + extract plans as a pooled HTTP GET and BeautifulSoup parse.
+
+    Returns None whenever the page looks like a client-rendered shell or no
+    result selector matches, so the caller can fall back to the browser.
+    """
+
+    def __init__(self, pool_size: int = None, timeout: int = None, selector_stats: SelectorStats = None):
+        pool_size = pool_size or settings.HTTP_POOL_SIZE
+        self.timeout = (timeout or settings.HTTP_TIMEOUT) / 1000
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "en-US,en;q=0.9"
+        })
+        self.extractor = BatchExtractor(stats=selector_stats)
+
+    def plan_request(self, actions: List[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+        """Map a plan to ``{"url", "selector"}`` if it can run without a browser"""
+        steps = [a for a in actions if a.get("action") not in _IGNORED_ACTIONS]
+        kinds = [a.get("action") for a in steps]
+
+        if kinds == ["navigate", "extract"]:
+            url = normalize_navigation_url(steps[0].get("value", ""))
+            return {"url": url, "selector": steps[1].get("selector", DEFAULT_EXTRACT_SELECTOR)}
+
+        if kinds in (["navigate", "type", "click", "extract"], ["navigate", "type", "extract"]):
+            host = urlparse(normalize_navigation_url(steps[0].get("value", ""))).netloc.lower()
+            template = SERVER_RENDERED_SEARCH.get(host) or SERVER_RENDERED_SEARCH.get(host.replace("www.", "", 1))
+            if template:
+                query = quote_plus(steps[1].get("value", ""))
+                return {"url": template.format(query=query), "selector": steps[-1].get("selector", DEFAULT_EXTRACT_SELECTOR)}
+
+        return None
+
+    def can_handle(self, actions: List[Dict[str, Any]]) -> bool:
+        return self.plan_request(actions) is not None
+
+    def run(self, actions: List[Dict[str, Any]], execution_log: List[Dict[str, Any]]) -> Optional[str]:
+        """Fetch and extract; returns the extracted text or None to fall back"""
+        request = self.plan_request(actions)
+        if not request:
+            return None
+
+        started = time.monotonic()
+        try:
+            response = self.session.get(request["url"], timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"HTTP fast path error: {e}")
+            return None
+
+        if "html" not in response.headers.get("Content-Type", "html"):
+            return None
+
+        soup = BeautifulSoup(response.text, "html.parser")
+        if self.looks_like_js_shell(soup):
+            return None
+
+        # Only a matched result selector counts; visible body text alone is as
+        # likely a captcha, consent wall or JS shell, so the browser runs instead
+        payload = self.collect(soup, request["selector"], response.url)
+        if not any(hit["results"] for hit in payload["hits"]):
+            return None
+        extracted = self.extractor.select_result(payload, request["selector"])
+
+        elapsed_ms = round((time.monotonic() - started) * 1000)
+        execution_log.append({
+            "action": {"action": "navigate", "value": request["url"], "description": "HTTP GET (fast path)"},
+            "result": f"Fetched {response.url} in {elapsed_ms}ms"
+        })
+        execution_log.append({
+            "action": {"action": "extract", "selector": request["selector"], "description": "Extract from static HTML"},
+            "result": extracted
+        })
+        return extracted
+
+    def extract(self, soup: BeautifulSoup, selector: str = None, url: str = None) -> str:
+        """Same fallback order and text format as the in-browser batch extractor"""
+        return self.extractor.select_result(self.collect(soup, selector, url), selector)
+
+    def collect(self, soup: BeautifulSoup, selector: str = None, url: str = None) -> Dict[str, Any]:
+        """Batch payload (selector hits and visible text) for a parsed page"""
+        for tag in soup(["script", "style", "noscript", "template"]):
+            tag.decompose()
+
+        hits = []
+        for sel in self.extractor.candidate_selectors(selector, url):
+            try:
+                elements = soup.select(sel)
+            except Exception as e:
+                hits.append({"selector": sel, "error": str(e), "count": 0, "results": []})
+                continue
+            results = []
+            for i, element in enumerate(elements[:self.extractor.limit]):
+                text = element.get_text("\n", strip=True)
+                if text and len(text) > self.extractor.min_length:
+                    results.append({"index": i + 1, "text": text})
+            hits.append({"selector": sel, "count": len(elements), "results": results})
+
+        visible_text = None
+        for sel in self.extractor.content_selectors:
+            element = soup.select_one(sel)
+            if not element:
+                continue
+            text = element.get_text("\n", strip=True)
+            if len(text) > 100:
+                lines = [line.strip() for line in text.split("\n") if len(line.strip()) > 30]
+                visible_text = lines[:15]
+                break
+
+        payload = {"hits": hits, "visibleText": visible_text}
+        self.extractor.record(payload, url)
+        return payload
+
+    def looks_like_js_shell(self, soup: BeautifulSoup) -> bool:
+        """Heuristic for client-rendered pages whose HTML carries no content"""
+        body = soup.body
+        if body is None:
+            return True
+
+        text = body.get_text(" ", strip=True)
+        lowered = text.lower()
+        if any(marker in lowered for marker in _JS_SHELL_MARKERS) and len(text) < 2000:
+            return True
+
+        # Empty SPA mount points (React, Next.js, Vue, Angular)
+        for mount in ("#root", "#app", "#__next", "#__nuxt", "app-root"):
+            node = soup.select_one(mount)
+            if node is not None and not node.get_text(strip=True):
+                return True
+
+        scripts = len(soup.find_all("script"))
+        return len(text) < 200 and scripts > 0
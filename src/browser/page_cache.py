@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from config.settings import settings
+from src.browser.actions import DEFAULT_EXTRACT_SELECTOR, extraction_failed, normalize_navigation_url
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme/host, drop fragments and default ports, sort query params"""
+    parts = urlsplit(normalize_navigation_url(url.strip()))
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+def _normalize_text(value: str) -> str:
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+
+class PageCache:
+    """TTL'd LRU of extracted page text, keyed by where a plan lands.
+
+    The key is the normalized navigate URL plus the typed values and clicked
+    selectors (which together determine the result page) and the extract
+    selector. Entries evicted from memory spill to an optional SQLite file.
+    """
+
+    def __init__(self, ttl: int = None, max_entries: int = None, disk_path: str = None,
+                 use_disk: bool = None):
+        self.ttl = ttl or settings.PAGE_CACHE_TTL
+        self.max_entries = max_entries or settings.PAGE_CACHE_MAX_ENTRIES
+        use_disk = settings.PAGE_CACHE_DISK if use_disk is None else use_disk
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if use_disk:
+            self._open_disk(disk_path or os.path.join(settings.CACHE_DIR, "page_cache.sqlite3"))
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _open_disk(self, path: str):
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Page cache disk store unavailable: {e}")
+            self._db = None
+
+    def key_for(self, actions: List[Dict[str, Any]]) -> Optional[str]:
+        """Cache key for a plan, or None if the plan has no navigate/extract pair"""
+        url = None
+        steps = []
+        extract_selector = None
+        for action in actions:
+            kind = action.get("action")
+            if kind == "navigate":
+                url = normalize_url(action.get("value", ""))
+                steps = []
+            elif kind == "type":
+                steps.append(("type", action.get("selector", ""), _normalize_text(action.get("value", ""))))
+            elif kind == "click":
+                steps.append(("click", action.get("selector", "")))
+            elif kind == "extract":
+                extract_selector = action.get("selector", DEFAULT_EXTRACT_SELECTOR)
+        if not url or extract_selector is None:
+            return None
+        raw = json.dumps([url, steps, extract_selector])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, extracted_data: str) -> bool:
+        return not extraction_failed(extracted_data)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            if entry:
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires FROM pages WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.disk_hits += 1
+                    return value
+                if row:
+                    self._db.execute("DELETE FROM pages WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires, value)
+
+    def _remember(self, key: str, expires: float, value: Dict[str, Any]):
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            old_key, (old_expires, old_value) = self._memory.popitem(last=False)
+            self._spill(old_key, old_expires, old_value)
+
+    def _spill(self, key: str, expires: float, value: Dict[str, Any]):
+        if self._db is None or expires <= time.time():
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (key, value, expires) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires)
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Page cache spill failed: {e}")
+
+    def flush(self):
+        """Write all live in-memory entries to the disk store"""
+        with self._lock:
+            for key, (expires, value) in self._memory.items():
+                self._spill(key, expires, value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+            }
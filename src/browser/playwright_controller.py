@@ -1,63 +1,116 @@
 from playwright.sync_api import sync_playwright
 import json
-import time
 from typing import List, Dict, Any
 from config.settings import settings
+from src.browser.browser_pool import BrowserPool
+from src.browser.actions import (
+    DEFAULT_TYPE_SELECTOR, DEFAULT_CLICK_SELECTOR, DEFAULT_EXTRACT_SELECTOR,
+    SCROLL_TO_BOTTOM_JS, normalize_navigation_url
+)
+from src.browser.batch_extractor import BatchExtractor, BATCH_EXTRACT_JS
+from src.browser.readiness import ReadinessEngine
+from src.browser.resource_blocking import ResourceBlocker
+from src.browser.selector_stats import SelectorStats
+from src.browser.har import HarSession
+
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1920, "height": 1080},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
 
 class PlaywrightController:
-    def __init__(self):
+    def __init__(self, pool: BrowserPool = None, readiness: ReadinessEngine = None,
+                 selector_stats: SelectorStats = None):
         self.playwright = None
         self.browser = None
         self.page = None
         self.context = None
+        self.pool = pool
+        self.lease = None
+        self.extractor = BatchExtractor(stats=selector_stats)
+        self.readiness = readiness or ReadinessEngine()
+        self.blocker = None
     
-    def start_browser(self):
-        """Start the browser instance"""
+    def start_browser(self, lean: bool = False, har: HarSession = None):
+        """Start the browser instance, or lease a warm one from the pool.
+        
+        With ``lean`` the context blocks images, fonts, media and trackers.
+        With ``har`` it records traffic to, or replays it from, a HAR file.
+        """
+        context_options = dict(CONTEXT_OPTIONS, **(har.context_options() if har else {}))
+        
+        if self.pool:
+            self.lease = self.pool.acquire(context_options)
+            self.context = self.lease.context
+            try:
+                self.page = self.lease.run(self._prepare_context, lean, har)
+            except Exception:
+                self.close()
+                raise
+            return
+        
         self.playwright = sync_playwright().start()
         self.browser = self.playwright.chromium.launch(
             headless=settings.BROWSER_HEADLESS
         )
-        self.context = self.browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        )
-        self.page = self.context.new_page()
+        self.context = self.browser.new_context(**context_options)
+        try:
+            self.page = self._prepare_context(lean, har)
+        except Exception:
+            self.close()
+            raise
+    
+    def _prepare_context(self, lean: bool, har: HarSession = None):
+        """Install routes and open the task's page"""
+        # Routes registered later are matched first, so the lean profile sees
+        # requests before HAR replay and falls back to it for anything it keeps
+        if har:
+            har.apply(self.context)
+        if lean:
+            self.blocker = ResourceBlocker()
+            self.blocker.apply(self.context)
+        return self.context.new_page()
     
     def execute_action(self, action: Dict[str, Any]) -> str:
+        """Execute a single browser action on the thread that owns the page"""
+        if self.lease:
+            return self.lease.run(self._execute_action, action)
+        return self._execute_action(action)
+    
+    def _execute_action(self, action: Dict[str, Any]) -> str:
         """Execute a single browser action with proper error handling"""
         action_type = action["action"]
         result = ""
         
         try:
             if action_type == "navigate":
-                url = action["value"]
-                if not url.startswith(('http://', 'https://')):
-                    url = 'https://' + url
+                url = normalize_navigation_url(action["value"])
                 self.page.goto(url, wait_until="domcontentloaded")
                 result = f"Navigated to {url}"
             
             elif action_type == "type":
-                selector = action.get("selector", "textarea[name='q'], input[name='q']")
+                selector = action.get("selector", DEFAULT_TYPE_SELECTOR)
                 value = action.get("value", "")
                 self.page.fill(selector, value)
                 result = f"Typed '{value}' into {selector}"
             
             elif action_type == "click":
-                selector = action.get("selector", "input[value='Google Search'], button[type='submit']")
+                selector = action.get("selector", DEFAULT_CLICK_SELECTOR)
                 self.page.click(selector)
                 result = f"Clicked on {selector}"
             
             elif action_type == "wait":
+                # The planned value is an upper bound; stop as soon as the page is ready
                 wait_time = int(action.get("value", "2000"))
-                time.sleep(wait_time / 1000)
-                result = f"Waited for {wait_time}ms"
+                readiness = self.readiness.wait(self.page, wait_time, action.get("selector"))
+                result = f"Waited {readiness['elapsed_ms']}ms for {readiness['condition']} (max {wait_time}ms)"
             
             elif action_type == "extract":
-                selector = action.get("selector", ".g, .rc, .tF2Cxc, .MjjYud, .sh-dlr__content")
+                selector = action.get("selector", DEFAULT_EXTRACT_SELECTOR)
                 result = self.extract_google_results(selector)
             
             elif action_type == "scroll":
-                self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                self.page.evaluate(SCROLL_TO_BOTTOM_JS)
                 result = "Scrolled to bottom"
             
             else:
@@ -71,31 +124,17 @@ class PlaywrightController:
     def extract_google_results(self, selector: str = None) -> str:
         """Extract Google search results with multiple fallback strategies"""
         try:
-            # Wait for results to load
-            self.page.wait_for_timeout(3000)
-            
-            # Strategy 1: Try the provided selector
-            if selector and selector.strip():
-                result = self._extract_with_selector(selector)
-                if result and "No data found" not in result:
-                    return result
+            url = self.page.url
+            selectors = self.extractor.candidate_selectors(selector, url)
             
-            # Strategy 2: Try common Google result selectors
-            common_selectors = [
-                ".g", ".rc", ".tF2Cxc", ".MjjYud",  # Organic results
-                ".sh-dlr__content", ".pla-unit",    # Shopping results
-                ".i0X6df", ".KZmu8e",              # More shopping
-                "[data-sokoban-container]",         # Google container
-                ".hlcw0c", ".yuRUbf"               # Additional containers
-            ]
+            # Wait until any result container appears (or the page settles)
+            self.readiness.wait(self.page, settings.EXTRACT_READY_TIMEOUT, ", ".join(selectors))
             
-            for sel in common_selectors:
-                result = self._extract_with_selector(sel)
-                if result and "No data found" not in result:
-                    return f"Found with selector '{sel}':\n{result}"
-            
-            # Strategy 3: Extract visible text from main content
-            return self._extract_visible_text()
+            # Every strategy (planned selector, common selectors, visible text)
+            # is evaluated in one page round trip; fallback order is unchanged
+            payload = self.page.evaluate(BATCH_EXTRACT_JS, self.extractor.script_args(selectors))
+            self.extractor.record(payload, url)
+            return self.extractor.select_result(payload, selector)
             
         except Exception as e:
             return f"Extraction error: {str(e)}"
@@ -103,49 +142,40 @@ class PlaywrightController:
     def _extract_with_selector(self, selector: str) -> str:
         """Extract data using a specific CSS selector"""
         try:
-            elements = self.page.query_selector_all(selector)
-            if not elements:
-                return "No data found"
-            
-            extracted_data = []
-            for i, element in enumerate(elements[:10]):  # Limit to first 10 elements
-                try:
-                    text = element.inner_text().strip()
-                    if text and len(text) > 20:  # Filter out very short texts
-                        extracted_data.append(f"Result {i+1}: {text}")
-                except:
-                    continue
+            payload = self.page.evaluate(
+                BATCH_EXTRACT_JS, self.extractor.script_args([selector], include_visible_text=False)
+            )
+            return self.extractor.format_hit(payload["hits"][0])
             
-            return "\n".join(extracted_data) if extracted_data else "No data found"
-        
         except Exception as e:
             return f"Selector error: {str(e)}"
     
     def _extract_visible_text(self) -> str:
         """Extract visible text from the main content area"""
         try:
-            # Try to get text from main content areas
-            content_selectors = ["#search", "#rso", "#center_col", "main", "body"]
+            payload = self.page.evaluate(BATCH_EXTRACT_JS, self.extractor.script_args([]))
+            return self.extractor.format_visible_text(payload.get("visibleText"))
             
-            for selector in content_selectors:
-                element = self.page.query_selector(selector)
-                if element:
-                    text = element.inner_text().strip()
-                    if len(text) > 100:  # Meaningful content
-                        # Clean up the text
-                        lines = [line.strip() for line in text.split('\n') if len(line.strip()) > 30]
-                        return "Visible text content:\n" + "\n".join(lines[:15])
-            
-            return "No extractable content found"
-        
         except Exception as e:
             return f"Visible text extraction error: {str(e)}"
     
     def close(self):
         """Close browser resources"""
+        if self.lease:
+            # The pool closes the context and keeps the browser warm
+            self.pool.release(self.lease)
+            self.lease = None
+            self.context = None
+            self.page = None
+            return
+        
         if self.context:
             self.context.close()
         if self.browser:
             self.browser.close()
         if self.playwright:
-            self.playwright.stop()
\ No newline at end of file
+            self.playwright.stop()
+        self.context = None
+        self.browser = None
+        self.playwright = None
+        self.page = None
\ No newline at end of file
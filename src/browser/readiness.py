@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+from config.settings import settings
+
+# Evaluated in the page: resolves as soon as the selector matches, or once the
+# document is complete and neither the DOM nor the network has changed for
+# ``quietMs``. ``maxMs`` is an upper bound, not a fixed sleep.
+READINESS_JS = """
+async ({selector, maxMs, quietMs}) => {
+    const start = performance.now();
+    let lastMutation = start;
+    let lastNetwork = start;
+    let resourceCount = performance.getEntriesByType("resource").length;
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document.documentElement || document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    try {
+        while (true) {
+            const now = performance.now();
+            if (selector) {
+                try {
+                    if (document.querySelector(selector)) {
+                        return {condition: "selector", elapsed: now - start};
+                    }
+                } catch (e) {
+                    selector = null;
+                }
+            }
+            const count = performance.getEntriesByType("resource").length;
+            if (count !== resourceCount) {
+                resourceCount = count;
+                lastNetwork = now;
+            }
+            if (document.readyState === "complete"
+                    && now - lastMutation >= quietMs && now - lastNetwork >= quietMs) {
+                return {condition: "quiet", elapsed: now - start};
+            }
+            if (now - start >= maxMs) {
+                return {condition: "timeout", elapsed: now - start};
+            }
+            await new Promise((resolve) => setTimeout(resolve, 50));
+        }
+    } finally {
+        observer.disconnect();
+    }
+}
+"""
+
+
+def _domain(url: str) -> str:
+    return urlparse(url or "").netloc.lower() or "unknown"
+
+
+class ReadinessStats:
+    """Per-domain record of how long pages took to become ready.
+
+    Kept as a small JSON file so later runs can tighten wait caps for domains
+    that are consistently fast.
+    """
+
+    def __init__(self, path: str = None, min_samples: int = 5):
+        self.path = path or os.path.join(settings.CACHE_DIR, "readiness_stats.json")
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._domains: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._domains = json.load(f)
+        except (OSError, ValueError):
+            self._domains = {}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._domains, indent=2)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Could not save readiness stats: {e}")
+
+    def record(self, url: str, condition: str, elapsed_ms: float, alpha: float = 0.2):
+        domain = _domain(url)
+        with self._lock:
+            entry = self._domains.setdefault(domain, {
+                "samples": 0, "ewma_ms": elapsed_ms, "max_ms": 0.0, "timeouts": 0
+            })
+            entry["samples"] += 1
+            entry["ewma_ms"] = round(alpha * elapsed_ms + (1 - alpha) * entry["ewma_ms"], 1)
+            entry["max_ms"] = round(max(entry["max_ms"], elapsed_ms), 1)
+            if condition == "timeout":
+                entry["timeouts"] += 1
+
+    def tuned_cap(self, url: str, planned_ms: int) -> int:
+        """Planned cap, tightened for domains with enough fast, timeout-free samples"""
+        with self._lock:
+            entry = self._domains.get(_domain(url))
+        if not entry or entry["samples"] < self.min_samples or entry["timeouts"]:
+            return planned_ms
+        return int(min(planned_ms, max(entry["ewma_ms"] * 3, entry["max_ms"], 1000)))
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {domain: dict(entry) for domain, entry in self._domains.items()}
+
+
+class ReadinessEngine:
+    """Event-driven replacement for fixed sleeps before reading a page"""
+
+    def __init__(self, stats: ReadinessStats = None, quiet_ms: int = None):
+        self.stats = stats or ReadinessStats()
+        self.quiet_ms = quiet_ms or settings.READINESS_QUIET_MS
+
+    def _script_args(self, page, max_ms: int, selector: Optional[str]) -> Dict[str, Any]:
+        return {
+            "selector": selector,
+            "maxMs": self.stats.tuned_cap(page.url, max_ms),
+            "quietMs": self.quiet_ms
+        }
+
+    def _finish(self, page, outcome: Dict[str, Any], started: float) -> Dict[str, Any]:
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.stats.record(page.url, outcome["condition"], elapsed_ms)
+        return {"condition": outcome["condition"], "elapsed_ms": round(elapsed_ms)}
+
+    def wait(self, page, max_ms: int, selector: str = None) -> Dict[str, Any]:
+        """Block until the page is ready or ``max_ms`` has passed"""
+        started = time.monotonic()
+        outcome = {"condition": "timeout"}
+        # A click may still be navigating; retry once on the new document
+        for _ in range(2):
+            remaining = max_ms - (time.monotonic() - started) * 1000
+            if remaining <= 0:
+                break
+            try:
+                page.wait_for_load_state("domcontentloaded", timeout=remaining)
+                outcome = page.evaluate(READINESS_JS, self._script_args(page, remaining, selector))
+                break
+            except Exception:
+                continue
+        return self._finish(page, outcome, started)
+
+    async def wait_async(self, page, max_ms: int, selector: str = None) -> Dict[str, Any]:
+        """asyncio counterpart of ``wait``"""
+        started = time.monotonic()
+        outcome = {"condition": "timeout"}
+        for _ in range(2):
+            remaining = max_ms - (time.monotonic() - started) * 1000
+            if remaining <= 0:
+                break
+            try:
+                await page.wait_for_load_state("domcontentloaded", timeout=remaining)
+                outcome = await page.evaluate(READINESS_JS, self._script_args(page, remaining, selector))
+                break
+            except Exception:
+                continue
+        return self._finish(page, outcome, started)
@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List
+from urllib.parse import urlparse
+from config.settings import settings
+from src.browser.actions import normalize_navigation_url
+
+
+def domain_of(url: str) -> str:
+    host = (urlparse(normalize_navigation_url(url or "")).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host or "unknown"
+
+
+class SelectorStats:
+    """Per-domain record of which extract selectors actually produced data.
+
+    Counts decay with a half-life so the ordering follows sites as they change
+    their markup; selectors never seen on a domain keep their default order.
+    """
+
+    def __init__(self, path: str = None, half_life_days: float = None):
+        self.path = path or os.path.join(settings.CACHE_DIR, "selector_stats.json")
+        self.half_life = (half_life_days or settings.SELECTOR_STATS_HALF_LIFE_DAYS) * 86400
+        self._lock = threading.Lock()
+        self._domains: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._domains = json.load(f)
+        except (OSError, ValueError):
+            self._domains = {}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._domains, indent=2)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Could not save selector stats: {e}")
+
+    def _decayed(self, entry: Dict[str, float], now: float) -> Dict[str, float]:
+        factor = 0.5 ** ((now - entry["updated"]) / self.half_life)
+        return {"hits": entry["hits"] * factor, "attempts": entry["attempts"] * factor, "updated": now}
+
+    def record(self, url: str, selector: str, hit: bool):
+        now = time.time()
+        with self._lock:
+            selectors = self._domains.setdefault(domain_of(url), {})
+            entry = selectors.get(selector)
+            entry = self._decayed(entry, now) if entry else {"hits": 0.0, "attempts": 0.0, "updated": now}
+            entry["attempts"] += 1
+            if hit:
+                entry["hits"] += 1
+            selectors[selector] = {k: round(v, 4) for k, v in entry.items()}
+
+    def hit_rate(self, url: str, selector: str) -> float:
+        """Smoothed hit rate; 0.5 for selectors with no history on this domain"""
+        with self._lock:
+            entry = self._domains.get(domain_of(url), {}).get(selector)
+        if not entry:
+            return 0.5
+        entry = self._decayed(entry, time.time())
+        return (entry["hits"] + 1) / (entry["attempts"] + 2)
+
+    def rank(self, url: str, selectors: List[str]) -> List[str]:
+        """Selectors ordered by hit rate (stable, so ties keep the given order)"""
+        return sorted(selectors, key=lambda sel: -self.hit_rate(url, sel))
+
+    def best_selectors(self, url: str, limit: int = 4) -> List[str]:
+        """Selectors that have produced data on this domain, best first"""
+        with self._lock:
+            known = list(self._domains.get(domain_of(url), {}).keys())
+        ranked = [sel for sel in self.rank(url, known) if self.hit_rate(url, sel) > 0.5]
+        return ranked[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {domain: len(selectors) for domain, selectors in self._domains.items()}
@@ -1,12 +1,33 @@
-from typing import Dict, List, Optional
+import os
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from config.settings import settings
 from src.orchestrator.agent import WebNavigatorAgent
 from src.chat.conversation import Conversation
-from src.llm.ollama_client import OllamaClient
+from src.utils.helpers import elapsed_ms, time_first_chunk
+
+# Follow-ups that refer back to the results already shown ("save that as csv")
+_BACK_REFERENCE = re.compile(r"\b(?:that|this|these|those|them|it|above|results?)\b", re.IGNORECASE)
+# Words an export-only follow-up is made of; anything else is a request of its own
+_EXPORT_WORDS = re.compile(
+    r"\b(?:that|this|these|those|them|it|above|results?|same|last|previous|data|list|"
+    r"save|export|download|write|put|give|send|convert|json|csv|pdf|txt|text|file|format|"
+    r"please|can|could|you|me|now|also|just|and|the|a|an|as|to|in|into|of|for)\b",
+    re.IGNORECASE
+)
 
 class ChatManager:
+    CHAT_SYSTEM_PROMPT = (
+        "You are a helpful AI assistant that can also browse the web. "
+        "Respond helpfully. If the user seems to want information that might require web search, "
+        "suggest searching for them.\nKeep responses concise and friendly."
+    )
+    
     def __init__(self):
         self.agent = WebNavigatorAgent()
-        self.llm = OllamaClient()
+        self.models = self.agent.models
+        self.llm = self.models.client_for("chat")
         self.conversations: Dict[str, Conversation] = {}
         self.current_conversation_id: Optional[str] = None
     
@@ -36,8 +57,13 @@ Just tell me what you'd like me to search for!"""
             return self.conversations[self.current_conversation_id]
         return None
     
-    def process_message(self, user_input: str, conversation_id: str = None) -> Dict[str, any]:
-        """Process a user message and return the response"""
+    def process_message(self, user_input: str, conversation_id: str = None,
+                        on_chunk: Callable[[str], None] = None) -> Dict[str, any]:
+        """Process a user message and return the response.
+
+        ``on_chunk`` receives the reply text as it streams from the LLM; the
+        returned dict still carries the complete response.
+        """
         # Get or create conversation
         if conversation_id and conversation_id in self.conversations:
             conversation = self.conversations[conversation_id]
@@ -49,11 +75,18 @@ Just tell me what you'd like me to search for!"""
         # Add user message to conversation
         conversation.add_user_message(user_input)
         
+        # Exporting results already shown re-renders them without searching again
+        result_key = self._export_follow_up(user_input, conversation)
+        if result_key:
+            export = self._handle_export(user_input, result_key, conversation)
+            if export:
+                return export
+        
         # Determine if this is a web navigation request
         if self._is_web_navigation_request(user_input):
-            return self._handle_web_navigation(user_input, conversation)
+            return self._handle_web_navigation(user_input, conversation, on_chunk)
         else:
-            return self._handle_chat_message(user_input, conversation)
+            return self._handle_chat_message(user_input, conversation, on_chunk)
     
     def _is_web_navigation_request(self, user_input: str) -> bool:
         """Determine if the user wants web navigation"""
@@ -66,6 +99,68 @@ Just tell me what you'd like me to search for!"""
         user_input_lower = user_input.lower()
         return any(keyword in user_input_lower for keyword in navigation_keywords)
     
+    def _export_follow_up(self, user_input: str, conversation: Conversation) -> Optional[str]:
+        """Key of the last search's structured result if the user only asks to export it.
+
+        A message with anything besides export, format and reference words
+        ("find phones and export it to json") is a new request, not a follow-up.
+        """
+        if self.agent.summarizer._detect_output_format(user_input) == 'text' or not _BACK_REFERENCE.search(user_input):
+            return None
+        if re.sub(r"[\W_]+", "", _EXPORT_WORDS.sub("", user_input)):
+            return None
+        for message in reversed(conversation.messages[:-1]):
+            metadata = message.get("metadata") or {}
+            if metadata.get("result_key"):
+                return metadata["result_key"]
+        return None
+    
+    def _handle_export(self, user_input: str, result_key: str,
+                       conversation: Conversation) -> Optional[Dict[str, any]]:
+        """Save the last search's results in the requested format, without another LLM call.
+
+        Returns None when the stored result has expired.
+        """
+        format_type = self.agent.summarizer._detect_output_format(user_input)
+        try:
+            result = self.agent.summarizer.export_result(result_key, format_type)
+        except Exception as e:
+            error_response = f"❌ **Error**\n\nSorry, I couldn't save the results: {str(e)}"
+            conversation.add_assistant_message(error_response, {"type": "error"})
+            
+            return {
+                "conversation_id": conversation.conversation_id,
+                "response": error_response,
+                "type": "error",
+                "success": False,
+                "metadata": {"type": "error"}
+            }
+        if not result:
+            return None
+        
+        metadata = {
+            "type": "export",
+            "success": True,
+            "result_key": result_key,
+            "file_created": True,
+            "file_path": result["file_path"],
+            "file_name": os.path.basename(result["file_path"]),
+            "output_format": result["format"]
+        }
+        conversation.add_assistant_message(result["text"], metadata)
+        
+        return {
+            "conversation_id": conversation.conversation_id,
+            "response": result["text"],
+            "type": "export",
+            "success": True,
+            "metadata": metadata,
+            "file_created": True,
+            "file_path": metadata["file_path"],
+            "file_name": metadata["file_name"],
+            "output_format": metadata["output_format"]
+        }
+    
     # def _handle_web_navigation(self, user_input: str, conversation: Conversation) -> Dict[str, any]:
     #     """Handle web navigation requests"""
     #     try:
@@ -115,7 +210,8 @@ Just tell me what you'd like me to search for!"""
     #         }
     # Add this method to the ChatManager class
 
-    def _handle_web_navigation(self, user_input: str, conversation: Conversation) -> Dict[str, any]:
+    def _handle_web_navigation(self, user_input: str, conversation: Conversation,
+                               on_chunk: Callable[[str], None] = None) -> Dict[str, any]:
         """Handle web navigation requests with file output support"""
         try:
             # Show typing indicator
@@ -123,7 +219,7 @@ Just tell me what you'd like me to search for!"""
             conversation.add_assistant_message(thinking_msg)
             
             # Execute the web navigation task
-            result = self.agent.execute_task(user_input)
+            result = self.agent.execute_task(user_input, on_chunk=on_chunk)
             
             if result["success"]:
                 # Build response message
@@ -136,7 +232,10 @@ Just tell me what you'd like me to search for!"""
                     "actions_count": result.get("actions_executed", 0),
                     "has_data": "No data" not in result.get("extracted_data", ""),
                     "file_created": result.get("file_created", False),
-                    "output_format": result.get("output_format", "text")
+                    "output_format": result.get("output_format", "text"),
+                    "timings_ms": result.get("metrics", {}).get("timings_ms", {}),
+                    "models": result.get("metrics", {}).get("models", {}),
+                    "result_key": result.get("result_key")
                 }
                 
                 # Add file information if file was created
@@ -183,23 +282,29 @@ Just tell me what you'd like me to search for!"""
                 "metadata": {"type": "error"}
             }
     
-    def _handle_chat_message(self, user_input: str, conversation: Conversation) -> Dict[str, any]:
+    def _handle_chat_message(self, user_input: str, conversation: Conversation,
+                             on_chunk: Callable[[str], None] = None) -> Dict[str, any]:
         """Handle regular chat messages"""
+        timings = {}
+        started = time.perf_counter()
         try:
-            # Create context from conversation history
-            context = self._create_chat_context(conversation)
+            # Send the history as chat messages: earlier turns are an
+            # unchanged prefix of this call, so Ollama reuses their KV cache
+            messages = self._create_chat_messages(conversation)
+            usage = {}
             
-            prompt = f"""You are a helpful AI assistant that can also browse the web. 
+            options = {"max_tokens": settings.CHAT_MAX_TOKENS, "usage": usage}
+            on_chunk = time_first_chunk(on_chunk, started, timings)
             
-Current conversation context:
-{context}
-
-User's latest message: {user_input}
-
-Respond helpfully. If the user seems to want information that might require web search, suggest searching for them.
-Keep responses concise and friendly."""
-
-            response = self.llm.generate(prompt)
+            def reply(llm) -> str:
+                if on_chunk:
+                    return "".join(self._stream_chunks(llm.chat_stream(messages, **options), on_chunk))
+                return llm.chat(messages, **options)
+            
+            # An empty reply is retried on the larger model
+            model = {}
+            response = self.models.run("chat", reply, lambda text: bool(text.strip()), model)
+            timings["total"] = elapsed_ms(started)
             
             conversation.add_assistant_message(response, {"type": "chat"})
             
@@ -208,7 +313,8 @@ Keep responses concise and friendly."""
                 "response": response,
                 "type": "chat",
                 "success": True,
-                "metadata": {"type": "chat"}
+                "metadata": {"type": "chat", "timings_ms": timings, "prompt_eval": usage,
+                             "models": {"chat": model}}
             }
             
         except Exception as e:
@@ -222,16 +328,28 @@ Keep responses concise and friendly."""
                 "success": False
             }
     
-    def _create_chat_context(self, conversation: Conversation, max_messages: int = 6) -> str:
-        """Create context from conversation history"""
-        messages = conversation.get_conversation_history(max_messages)
-        context = []
+    def _stream_chunks(self, chunks: Iterable[str], on_chunk: Callable[[str], None]) -> Iterable[str]:
+        """Pass each chunk to the callback as it arrives"""
+        for chunk in chunks:
+            on_chunk(chunk)
+            yield chunk
+    
+    def _create_chat_messages(self, conversation: Conversation, max_messages: int = 6) -> List[Dict[str, str]]:
+        """System prompt plus recent history, ending with the latest user message.
+
+        The window start only moves in steps of ``max_messages``, so between
+        steps each call's messages extend the previous call's unchanged.
+        """
+        messages = conversation.get_conversation_history()
+        earlier = len(messages) - 1
+        start = max(0, (earlier - max_messages) // max_messages * max_messages)
         
-        for msg in messages:
-            role = "User" if msg["role"] == "user" else "Assistant"
-            context.append(f"{role}: {msg['content']}")
+        chat_messages = [{"role": "system", "content": self.CHAT_SYSTEM_PROMPT}]
+        for msg in messages[start:]:
+            role = "user" if msg["role"] == "user" else "assistant"
+            chat_messages.append({"role": role, "content": msg["content"]})
         
-        return "\n".join(context)
+        return chat_messages
     
     def get_conversation_list(self) -> List[Dict]:
         """Get list of all conversations"""
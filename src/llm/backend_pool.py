@@ -0,0 +1,260 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import settings
+
+_sessions: Dict[tuple, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+_pools: Dict[tuple, "OllamaBackendPool"] = {}
+_pools_lock = threading.Lock()
+
+# Failures worth retrying on another backend: the request never reached a
+# model (refused connection, proxy error, or Ollama's queue is full)
+_RETRY_STATUS = (502, 503)
+
+
+def get_session(base_url: str, pool_size: int = None) -> requests.Session:
+    """Keep-alive session shared by every client talking to the same Ollama server"""
+    pool_size = pool_size or settings.OLLAMA_POOL_SIZE
+    key = (base_url, pool_size)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+        return session
+
+
+def get_backend_pool(base_urls: List[str], pool_size: int = None) -> "OllamaBackendPool":
+    """Backend pool shared by every client talking to the same set of servers"""
+    pool_size = pool_size or settings.OLLAMA_POOL_SIZE
+    key = (tuple(base_urls), pool_size)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = OllamaBackendPool(base_urls, pool_size)
+            _pools[key] = pool
+        return pool
+
+
+def is_backend_failure(error: Exception) -> bool:
+    """True if the error says the server is unhealthy rather than the request being bad"""
+    if isinstance(error, requests.HTTPError):
+        return error.response is None or error.response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def is_retryable(error: Exception) -> bool:
+    """True if the request can safely be sent to another backend"""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in _RETRY_STATUS
+    return isinstance(error, requests.ConnectionError) and not isinstance(error, requests.Timeout)
+
+
+class _Backend:
+    """One Ollama server and its routing state (guarded by the pool's lock)"""
+
+    def __init__(self, url: str, session: requests.Session):
+        self.url = url.rstrip("/")
+        self.session = session
+        self.in_flight = 0
+        self.ewma_ms: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until: Optional[float] = None
+        self.ejections = 0
+        self.installed: set = set()
+        self.loaded: set = set()
+        self.warmed: set = set()
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until is not None
+
+
+class OllamaBackendPool:
+    """Routes Ollama requests across one or more servers.
+
+    Each request goes to the admitted backend with the fewest requests in
+    flight, preferring one that already has the model loaded and then the
+    lowest latency EWMA. A backend is ejected after ``eject_after``
+    consecutive failures and re-admitted once a health probe succeeds after
+    ``eject_seconds``. A daemon thread probes every backend's installed and
+    loaded models each ``health_interval`` seconds; ``warm_up`` loads a model
+    on every backend that doesn't have it loaded yet.
+    """
+
+    def __init__(self, base_urls: List[str], pool_size: int = None, health_interval: int = None,
+                 eject_after: int = None, eject_seconds: int = None, ewma_alpha: float = None,
+                 start: bool = True):
+        self.pool_size = pool_size or settings.OLLAMA_POOL_SIZE
+        self.health_interval = health_interval or settings.OLLAMA_HEALTH_INTERVAL
+        self.eject_after = eject_after or settings.OLLAMA_EJECT_AFTER
+        self.eject_seconds = eject_seconds or settings.OLLAMA_EJECT_SECONDS
+        self.ewma_alpha = ewma_alpha or settings.OLLAMA_LATENCY_EWMA_ALPHA
+        self._backends = [_Backend(url, get_session(url, self.pool_size)) for url in base_urls]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if start:
+            self._thread = threading.Thread(target=self._health_loop, name="ollama-health", daemon=True)
+            self._thread.start()
+
+    @property
+    def size(self) -> int:
+        return len(self._backends)
+
+    @property
+    def urls(self) -> List[str]:
+        return [b.url for b in self._backends]
+
+    def acquire(self, model: str = None, exclude: List[_Backend] = None) -> _Backend:
+        """Pick a backend for one request and count it as in flight"""
+        with self._lock:
+            candidates = [b for b in self._backends if b not in (exclude or [])] or list(self._backends)
+            # With every backend ejected, trying one beats failing outright
+            candidates = [b for b in candidates if not b.ejected] or candidates
+            if model:
+                # Unprobed backends (nothing installed known yet) stay eligible
+                candidates = [b for b in candidates if not b.installed or model in b.installed] or candidates
+            backend = min(candidates, key=lambda b: (
+                b.in_flight, model not in b.loaded, b.ewma_ms if b.ewma_ms is not None else 0.0
+            ))
+            backend.in_flight += 1
+            backend.requests += 1
+            return backend
+
+    def release(self, backend: _Backend, latency_ms: float, failed: bool = False, model: str = None):
+        """Finish a request: update the latency EWMA, or count a failure and maybe eject"""
+        with self._lock:
+            backend.in_flight -= 1
+            if failed:
+                backend.failures += 1
+                backend.consecutive_failures += 1
+                if backend.consecutive_failures >= self.eject_after and not backend.ejected:
+                    self._eject(backend)
+                return
+
+            backend.consecutive_failures = 0
+            if backend.ewma_ms is None:
+                backend.ewma_ms = latency_ms
+            else:
+                backend.ewma_ms += self.ewma_alpha * (latency_ms - backend.ewma_ms)
+            if model:
+                backend.loaded.add(model)
+
+    def _eject(self, backend: _Backend):
+        backend.ejected_until = time.monotonic() + self.eject_seconds
+        backend.ejections += 1
+        backend.loaded.clear()
+        print(f"Ollama backend {backend.url} ejected after {backend.consecutive_failures} failures")
+
+    def probe(self, backend: _Backend) -> bool:
+        """Refresh a backend's installed and loaded models; re-admit or eject it"""
+        timeout = settings.OLLAMA_PROBE_TIMEOUT
+        try:
+            response = backend.session.get(f"{backend.url}/api/tags", timeout=timeout)
+            response.raise_for_status()
+            installed = {m.get("name") for m in response.json().get("models", [])}
+            loaded = set()
+            try:
+                # Older servers have no /api/ps; routing then learns loaded models from traffic
+                response = backend.session.get(f"{backend.url}/api/ps", timeout=timeout)
+                if response.ok:
+                    loaded = {m.get("name") for m in response.json().get("models", [])}
+            except requests.RequestException:
+                pass
+        except (requests.RequestException, ValueError):
+            with self._lock:
+                if backend.ejected:
+                    backend.ejected_until = time.monotonic() + self.eject_seconds
+                else:
+                    backend.consecutive_failures = max(backend.consecutive_failures, self.eject_after)
+                    self._eject(backend)
+            return False
+
+        with self._lock:
+            backend.installed = installed
+            backend.loaded = loaded or backend.loaded
+            if backend.ejected and time.monotonic() >= backend.ejected_until:
+                backend.ejected_until = None
+                backend.consecutive_failures = 0
+                print(f"Ollama backend {backend.url} re-admitted")
+        return True
+
+    def probe_all(self):
+        for backend in list(self._backends):
+            self.probe(backend)
+
+    def warm_up(self, model: str, keep_alive: str = None, wait: bool = False):
+        """Load ``model`` on every admitted backend that hasn't loaded it yet.
+
+        A generate call without a prompt makes Ollama load the model and
+        return immediately. Runs in the background unless ``wait`` is set.
+        """
+        with self._lock:
+            targets = [b for b in self._backends
+                       if not b.ejected and model not in b.loaded and model not in b.warmed]
+            for backend in targets:
+                backend.warmed.add(model)
+
+        threads = [
+            threading.Thread(target=self._load_model, args=(b, model, keep_alive),
+                             name="ollama-warmup", daemon=True)
+            for b in targets
+        ]
+        for thread in threads:
+            thread.start()
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _load_model(self, backend: _Backend, model: str, keep_alive: str = None):
+        # Load with the context every call uses, or the first call reloads it
+        payload = {"model": model, "keep_alive": keep_alive or settings.OLLAMA_KEEP_ALIVE,
+                   "options": {"num_ctx": settings.OLLAMA_NUM_CTX}}
+        try:
+            response = backend.session.post(f"{backend.url}/api/generate", json=payload,
+                                            timeout=settings.OLLAMA_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Could not warm up {model} on {backend.url}: {e}")
+            with self._lock:
+                backend.warmed.discard(model)
+            return
+        with self._lock:
+            backend.loaded.add(model)
+
+    def _health_loop(self):
+        while not self._stop.is_set():
+            self.probe_all()
+            self._stop.wait(self.health_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backends": [
+                    {
+                        "url": b.url,
+                        "admitted": not b.ejected,
+                        "in_flight": b.in_flight,
+                        "requests": b.requests,
+                        "failures": b.failures,
+                        "ejections": b.ejections,
+                        "ewma_ms": round(b.ewma_ms, 1) if b.ewma_ms is not None else None,
+                        "loaded": sorted(b.loaded)
+                    }
+                    for b in self._backends
+                ],
+                "admitted": sum(1 for b in self._backends if not b.ejected)
+            }
+
+    def close(self):
+        self._stop.set()
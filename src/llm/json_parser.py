@@ -0,0 +1,171 @@
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_CLOSERS = {"[": "]", "{": "}"}
+
+
+class IncrementalJsonParser:
+    """Tolerant JSON parser that can be fed a response chunk by chunk.
+
+    Text before the first opening bracket is skipped, and trailing commas are
+    dropped. ``feed`` returns True once the root value is closed, so a
+    streaming caller can stop reading there.
+
+    If the output is cut off (for example by the token budget), ``value()``
+    still returns the longest prefix that ends on a complete element, with
+    its brackets closed. Elements are those of the root, or of arrays held
+    directly by it; a cut never falls inside an object that is an array
+    element, so a half-built action is dropped rather than returned. The
+    text is scanned once; no regex pass and no re-parse per chunk.
+    """
+
+    def __init__(self, root: str = None, max_repairs: int = 8):
+        if root not in (None, "[", "{"):
+            raise ValueError("root must be '[', '{' or None")
+        self.root = root
+        self.max_repairs = max_repairs
+        self.complete = False
+        self._buf: List[str] = []
+        self._stack: List[str] = []
+        self._cuts: List[Tuple[int, Tuple[str, ...]]] = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+
+    def _drop_trailing_comma(self):
+        while self._buf and self._buf[-1].isspace():
+            self._buf.pop()
+        if self._buf and self._buf[-1] == ",":
+            self._buf.pop()
+
+    def _record_cut(self):
+        """Mark the current position as a repair point if no object below the root is open"""
+        if "{" not in self._stack[1:]:
+            self._cuts.append((len(self._buf), tuple(self._stack)))
+
+    def feed(self, text: str) -> bool:
+        for ch in text:
+            if self.complete:
+                break
+            if not self._started:
+                if ch == self.root or (self.root is None and ch in _CLOSERS):
+                    self._started = True
+                    self._stack.append(ch)
+                    self._buf.append(ch)
+                continue
+
+            if self._in_string:
+                self._buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+                self._buf.append(ch)
+            elif ch in _CLOSERS:
+                self._stack.append(ch)
+                self._buf.append(ch)
+            elif ch in "]}":
+                self._drop_trailing_comma()
+                # A mismatched closer still closes the innermost open container
+                self._buf.append(_CLOSERS[self._stack.pop()])
+                if not self._stack:
+                    self.complete = True
+                else:
+                    self._record_cut()
+            elif ch == ",":
+                self._record_cut()
+                self._buf.append(ch)
+            else:
+                self._buf.append(ch)
+        return self.complete
+
+    def value(self) -> Optional[Any]:
+        """Parsed root value, repaired from the last complete element if truncated"""
+        if not self._started:
+            return None
+        text = "".join(self._buf)
+        if self.complete:
+            try:
+                return json.loads(text)
+            except ValueError:
+                pass
+
+        for cut, stack in reversed(self._cuts[-self.max_repairs:]):
+            repaired = text[:cut].rstrip().rstrip(",") + "".join(_CLOSERS[c] for c in reversed(stack))
+            try:
+                return json.loads(repaired)
+            except ValueError:
+                continue
+
+        # Nothing complete inside the root yet
+        try:
+            return json.loads(self._buf[0] + _CLOSERS[self._buf[0]])
+        except ValueError:
+            return None
+
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+
+class JsonFieldStreamer:
+    """Decoded text of one string field, chunk by chunk, as a JSON object streams in.
+
+    ``feed`` returns the part of the field's value that the new text
+    completes, so a caller can show the field while the rest of the object is
+    still being generated. The first occurrence of the key is used.
+    """
+
+    def __init__(self, key: str):
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(key))
+        self._pending = ""
+        self._escape = ""
+        self.started = False
+        self.done = False
+
+    def feed(self, text: str) -> str:
+        if self.done:
+            return ""
+        if not self.started:
+            self._pending += text
+            match = self._start.search(self._pending)
+            if not match:
+                # Keep enough of the tail to match a key split across chunks
+                self._pending = self._pending[-64:]
+                return ""
+            self.started = True
+            text, self._pending = self._pending[match.end():], ""
+
+        out = []
+        for ch in text:
+            if self._escape:
+                self._escape += ch
+                if self._escape[1] == "u":
+                    if len(self._escape) < 6:
+                        continue
+                    try:
+                        out.append(chr(int(self._escape[2:], 16)))
+                    except ValueError:
+                        pass
+                else:
+                    out.append(_ESCAPES.get(ch, ch))
+                self._escape = ""
+            elif ch == "\\":
+                self._escape = ch
+            elif ch == '"':
+                self.done = True
+                break
+            else:
+                out.append(ch)
+        return "".join(out)
+
+
+def parse_json(text: str, root: str = None) -> Optional[Any]:
+    """Parse the first JSON array/object in ``text``, tolerating truncation and surrounding prose"""
+    parser = IncrementalJsonParser(root)
+    parser.feed(text or "")
+    return parser.value()
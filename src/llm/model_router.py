@@ -0,0 +1,90 @@
+import threading
+import time
+from typing import Callable, Dict, Any, TypeVar
+from config.settings import settings
+from src.llm.ollama_client import OllamaClient
+from src.utils.helpers import elapsed_ms
+
+T = TypeVar("T")
+
+STAGES = ("planner", "chat", "map", "summary", "export")
+
+# Which model size each policy gives each stage. Planning, chat and the map
+# step of map-reduce summaries produce short outputs, so "balanced" keeps
+# them on the small model.
+POLICIES = {
+    "latency": {"planner": "small", "chat": "small", "map": "small", "summary": "small", "export": "small"},
+    "balanced": {"planner": "small", "chat": "small", "map": "small", "summary": "large", "export": "large"},
+    "quality": {"planner": "large", "chat": "large", "map": "large", "summary": "large", "export": "large"}
+}
+
+
+class ModelRouter:
+    """Chooses the Ollama model for each pipeline stage.
+
+    Settings.MODEL_POLICY maps every stage to SMALL_MODEL or LARGE_MODEL (both
+    default to OLLAMA_MODEL), and a ``<STAGE>_MODEL`` setting pins one stage to
+    a model. ``run`` retries once on the large model when the stage's output
+    fails validation; errors are not retried.
+    """
+
+    def __init__(self, policy: str = None):
+        self.policy_name = policy or settings.MODEL_POLICY
+        self.policy = POLICIES.get(self.policy_name, POLICIES["balanced"])
+        self._clients: Dict[str, OllamaClient] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def small_model(self) -> str:
+        return settings.SMALL_MODEL or settings.OLLAMA_MODEL
+
+    @property
+    def large_model(self) -> str:
+        return settings.LARGE_MODEL or settings.OLLAMA_MODEL
+
+    def model_for(self, stage: str) -> str:
+        pinned = getattr(settings, f"{stage.upper()}_MODEL", "")
+        if pinned:
+            return pinned
+        return self.large_model if self.policy.get(stage) == "large" else self.small_model
+
+    def client(self, model: str) -> OllamaClient:
+        """Client for ``model``; created (and warmed up) on first use"""
+        with self._lock:
+            if model not in self._clients:
+                self._clients[model] = OllamaClient(model=model)
+            return self._clients[model]
+
+    def client_for(self, stage: str) -> OllamaClient:
+        return self.client(self.model_for(stage))
+
+    def run(self, stage: str, call: Callable[[OllamaClient], T], validate: Callable[[T], bool] = None,
+            record: Dict[str, Any] = None) -> T:
+        """Run ``call`` with the stage's model, retrying on the large model if ``validate`` rejects it.
+
+        ``record``, if given, is filled with the stage, the model whose output
+        was used, the total latency and each attempt.
+        """
+        models = [self.model_for(stage)]
+        if self.large_model not in models:
+            models.append(self.large_model)
+
+        attempts = []
+        started = time.perf_counter()
+        for model in models:
+            attempt_start = time.perf_counter()
+            result = call(self.client(model))
+            valid = validate(result) if validate else True
+            attempts.append({"model": model, "latency_ms": elapsed_ms(attempt_start), "valid": valid})
+            if valid:
+                break
+            print(f"{stage} output from {model} failed validation")
+
+        if record is not None:
+            record.update({
+                "stage": stage,
+                "model": model,
+                "latency_ms": elapsed_ms(started),
+                "attempts": attempts
+            })
+        return result
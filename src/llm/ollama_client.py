@@ -1,50 +1,282 @@
+import threading
+import time
 import requests
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator, Tuple, Union
 from config.settings import settings
+from src.llm.backend_pool import get_backend_pool, is_backend_failure, is_retryable
+from src.utils.helpers import elapsed_ms, estimate_tokens
+
+def _prompt_text(payload: Dict[str, Any]) -> str:
+    parts = [payload.get("system", ""), payload.get("prompt", "")]
+    parts += [m.get("content", "") for m in payload.get("messages", [])]
+    return "\n".join(p for p in parts if p)
+
+
+class PromptEvalStats:
+    """Prompt-eval accounting from the counters Ollama returns with each reply.
+
+    Ollama skips a prompt prefix it still holds in the KV cache, so
+    ``prompt_eval_count`` only covers the new tokens. Reused tokens are the
+    estimated prompt length minus that count; the time saved is those tokens
+    at the prompt-eval rate measured so far.
+    """
 
-class OllamaClient:
     def __init__(self):
-        self.base_url = settings.OLLAMA_BASE_URL
-        self.model = settings.OLLAMA_MODEL
-    
-    def generate(self, prompt: str, system_prompt: str = None) -> str:
-        """Generate response from Ollama LLM"""
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.evaluated_tokens = 0
+        self.prompt_eval_ns = 0
+
+    def _ns_per_token(self) -> float:
+        return self.prompt_eval_ns / self.evaluated_tokens if self.evaluated_tokens else 0.0
+
+    def record(self, prompt_text: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add one reply's counters; returns that call's usage"""
+        evaluated = int(data.get("prompt_eval_count") or 0)
+        eval_ns = int(data.get("prompt_eval_duration") or 0)
+        prompt_tokens = max(estimate_tokens(prompt_text), evaluated)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.evaluated_tokens += evaluated
+            self.prompt_eval_ns += eval_ns
+            ns_per_token = self._ns_per_token()
+
+        reused = prompt_tokens - evaluated
+        return {
+            "prompt_tokens": prompt_tokens,
+            "evaluated_tokens": evaluated,
+            "reused_tokens": reused,
+            "prompt_eval_ms": round(eval_ns / 1e6, 1),
+            "saved_ms": round(reused * ns_per_token / 1e6, 1)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = self.prompt_tokens - self.evaluated_tokens
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "evaluated_tokens": self.evaluated_tokens,
+                "reused_tokens": reused,
+                "reuse_rate": round(reused / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+                "prompt_eval_ms": round(self.prompt_eval_ns / 1e6, 1),
+                "saved_ms": round(reused * self._ns_per_token() / 1e6, 1)
+            }
+
+
+class OllamaClient:
+    """Ollama API client.
+
+    Every call accepts the same generation options:
+
+    - ``max_tokens`` caps the output (Ollama's ``num_predict``)
+    - ``num_ctx`` defaults to Settings.OLLAMA_NUM_CTX for every call, so the
+      model loaded by the warm-up is never reloaded for a new context size
+    - ``temperature`` and ``stop`` are passed through when given
+    - ``keep_alive`` keeps the model loaded between calls (Settings.OLLAMA_KEEP_ALIVE)
+    - ``format`` is "json" or a JSON schema the output must match
+    - ``usage``, if given, is filled with the call's prompt-eval counters
+      (see PromptEvalStats); keep prompts' static parts first so Ollama can
+      reuse their KV cache from the previous call
+
+    Requests are routed through an OllamaBackendPool over ``base_urls``
+    (Settings.OLLAMA_BASE_URLS, or just ``base_url``), failing over to another
+    backend when one is unreachable.
+    """
+
+    def __init__(self, base_url: str = None, model: str = None, pool_size: int = None, timeout: int = None,
+                 base_urls: List[str] = None):
+        urls = base_urls or ([base_url] if base_url else None) or settings.OLLAMA_BASE_URLS or [settings.OLLAMA_BASE_URL]
+        self.base_url = urls[0]
+        self.model = model or settings.OLLAMA_MODEL
+        self.pool_size = pool_size or settings.OLLAMA_POOL_SIZE
+        self.timeout = timeout or settings.OLLAMA_TIMEOUT
+        self.backends = get_backend_pool(urls, self.pool_size)
+        self.prompt_stats = PromptEvalStats()
+        if settings.OLLAMA_WARMUP:
+            self.backends.warm_up(self.model)
+
+    def _options(self, prompt_text: str, max_tokens: int = None, temperature: float = None,
+                 stop: List[str] = None, num_ctx: int = None) -> Dict[str, Any]:
+        options = {
+            "num_ctx": num_ctx or settings.OLLAMA_NUM_CTX,
+            "num_predict": max_tokens or settings.OLLAMA_DEFAULT_MAX_TOKENS
+        }
+        needed = estimate_tokens(prompt_text) + options["num_predict"]
+        if needed > options["num_ctx"]:
+            print(f"Prompt needs ~{needed} tokens but num_ctx is {options['num_ctx']}; Ollama will truncate it")
+        if temperature is not None:
+            options["temperature"] = temperature
+        if stop:
+            options["stop"] = list(stop)
+        return options
+
+    def _generate_payload(self, prompt: str, system_prompt: str, stream: bool, keep_alive: str = None,
+                          format: Union[str, Dict[str, Any]] = None, **options) -> Dict[str, Any]:
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False
+            "stream": stream,
+            "keep_alive": keep_alive or settings.OLLAMA_KEEP_ALIVE,
+            "options": self._options((system_prompt or "") + prompt, **options)
         }
-        
+
         if system_prompt:
             payload["system"] = system_prompt
-        
+        if format:
+            payload["format"] = format
+        return payload
+
+    def _chat_payload(self, messages: List[Dict[str, str]], stream: bool, keep_alive: str = None,
+                      format: Union[str, Dict[str, Any]] = None, **options) -> Dict[str, Any]:
+        prompt_text = "\n".join(m.get("content", "") for m in messages)
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": keep_alive or settings.OLLAMA_KEEP_ALIVE,
+            "options": self._options(prompt_text, **options)
+        }
+        if format:
+            payload["format"] = format
+        return payload
+
+    def _record_usage(self, payload: Dict[str, Any], data: Dict[str, Any], usage: Dict[str, Any] = None):
+        call_usage = self.prompt_stats.record(_prompt_text(payload), data)
+        if usage is not None:
+            usage.update(call_usage)
+
+    def _open(self, endpoint: str, payload: Dict[str, Any], stream: bool = False) -> Tuple[Any, requests.Response, float]:
+        """POST to the least-loaded backend, failing over while the request can be retried.
+
+        Returns the backend, its response and the start time; the caller
+        must hand the backend back with ``self.backends.release``.
+        """
+        model = payload.get("model")
+        tried = []
+        while True:
+            backend = self.backends.acquire(model, exclude=tried)
+            started = time.perf_counter()
+            try:
+                response = backend.session.post(
+                    f"{backend.url}{endpoint}",
+                    json=payload,
+                    timeout=self.timeout,
+                    stream=stream
+                )
+                response.raise_for_status()
+                return backend, response, started
+            except requests.RequestException as e:
+                self.backends.release(backend, elapsed_ms(started), is_backend_failure(e))
+                tried.append(backend)
+                if not is_retryable(e) or len(tried) >= self.backends.size:
+                    raise
+
+    def _post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        backend, response, started = self._open(endpoint, payload)
+        self.backends.release(backend, elapsed_ms(started), model=payload.get("model"))
+        return response.json()
+
+    def generate(self, prompt: str, system_prompt: str = None, max_tokens: int = None,
+                 temperature: float = None, stop: List[str] = None, keep_alive: str = None,
+                 num_ctx: int = None, format: Union[str, Dict[str, Any]] = None,
+                 usage: Dict[str, Any] = None) -> str:
+        """Generate response from Ollama LLM"""
+        payload = self._generate_payload(
+            prompt, system_prompt, False, keep_alive, format,
+            max_tokens=max_tokens, temperature=temperature, stop=stop, num_ctx=num_ctx
+        )
+
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=120
-            )
-            response.raise_for_status()
-            return response.json()["response"]
+            data = self._post("/api/generate", payload)
+            self._record_usage(payload, data, usage)
+            return data["response"]
         except Exception as e:
             raise Exception(f"Ollama API error: {str(e)}")
-    
-    def chat(self, messages: List[Dict[str, str]]) -> str:
+
+    def chat(self, messages: List[Dict[str, str]], max_tokens: int = None, temperature: float = None,
+             stop: List[str] = None, keep_alive: str = None, num_ctx: int = None,
+             format: Union[str, Dict[str, Any]] = None, usage: Dict[str, Any] = None) -> str:
         """Chat completion with Ollama"""
+        payload = self._chat_payload(
+            messages, False, keep_alive, format,
+            max_tokens=max_tokens, temperature=temperature, stop=stop, num_ctx=num_ctx
+        )
+
+        try:
+            data = self._post("/api/chat", payload)
+            self._record_usage(payload, data, usage)
+            return data["message"]["content"]
+        except Exception as e:
+            raise Exception(f"Ollama chat error: {str(e)}")
+
+    def embed(self, text: str, model: str = None) -> List[float]:
+        """Embedding vector for ``text`` (Settings.OLLAMA_EMBED_MODEL by default)"""
         payload = {
-            "model": self.model,
-            "messages": messages,
-            "stream": False
+            "model": model or settings.OLLAMA_EMBED_MODEL,
+            "prompt": text,
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE
         }
-        
+
         try:
-            response = requests.post(
-                f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=120
-            )
-            response.raise_for_status()
-            return response.json()["message"]["content"]
+            return self._post("/api/embeddings", payload)["embedding"]
         except Exception as e:
-            raise Exception(f"Ollama chat error: {str(e)}")
+            raise Exception(f"Ollama embeddings error: {str(e)}")
+
+    def _stream(self, endpoint: str, payload: Dict[str, Any], error_label: str) -> Iterator[Dict[str, Any]]:
+        """Yield the NDJSON objects of a streaming response as they arrive"""
+        try:
+            backend, response, started = self._open(endpoint, payload, stream=True)
+            failed = False
+            try:
+                with response:
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        data = json.loads(line)
+                        if data.get("error"):
+                            raise Exception(data["error"])
+                        yield data
+            except requests.RequestException as e:
+                failed = is_backend_failure(e)
+                raise
+            finally:
+                self.backends.release(backend, elapsed_ms(started), failed, payload.get("model"))
+        except Exception as e:
+            raise Exception(f"{error_label}: {str(e)}")
+
+    def generate_stream(self, prompt: str, system_prompt: str = None, max_tokens: int = None,
+                        temperature: float = None, stop: List[str] = None, keep_alive: str = None,
+                        num_ctx: int = None, format: Union[str, Dict[str, Any]] = None,
+                        usage: Dict[str, Any] = None) -> Iterator[str]:
+        """Generate a response from Ollama, yielding text chunks as they are produced"""
+        payload = self._generate_payload(
+            prompt, system_prompt, True, keep_alive, format,
+            max_tokens=max_tokens, temperature=temperature, stop=stop, num_ctx=num_ctx
+        )
+
+        for data in self._stream("/api/generate", payload, "Ollama API error"):
+            if data.get("done"):
+                self._record_usage(payload, data, usage)
+            if data.get("response"):
+                yield data["response"]
+
+    def chat_stream(self, messages: List[Dict[str, str]], max_tokens: int = None, temperature: float = None,
+                    stop: List[str] = None, keep_alive: str = None, num_ctx: int = None,
+                    format: Union[str, Dict[str, Any]] = None, usage: Dict[str, Any] = None) -> Iterator[str]:
+        """Chat completion with Ollama, yielding text chunks as they are produced"""
+        payload = self._chat_payload(
+            messages, True, keep_alive, format,
+            max_tokens=max_tokens, temperature=temperature, stop=stop, num_ctx=num_ctx
+        )
+
+        for data in self._stream("/api/chat", payload, "Ollama chat error"):
+            if data.get("done"):
+                self._record_usage(payload, data, usage)
+            content = data.get("message", {}).get("content")
+            if content:
+                yield content
+
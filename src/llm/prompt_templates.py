@@ -1,9 +1,8 @@
 class PromptTemplates:
-    @staticmethod
-    def get_planning_prompt(user_input: str) -> str:
-        return f"""
+    # Static planning instructions, sent as the system prompt so every planning
+    # call starts with the same tokens and Ollama can reuse their KV cache
+    PLANNING_INSTRUCTIONS = """
         Analyze the user's web navigation request and break it down into specific browser actions.
-        User Request: "{user_input}"
         
         Return a JSON array of actions. Each action MUST have:
         - "action": type of action (navigate, click, type, wait, extract, scroll)
@@ -12,40 +11,54 @@ class PromptTemplates:
         - "description": human-readable description
         
         IMPORTANT: For extract actions, ALWAYS include a valid CSS selector.
+        For wait actions, "value" is the MAXIMUM wait in milliseconds; the wait ends
+        as soon as the page is ready.
         
         Example for "search for laptops under 50k":
         [
-            {{
+            {
                 "action": "navigate",
                 "value": "https://www.google.com",
                 "description": "Navigate to Google search"
-            }},
-            {{
+            },
+            {
                 "action": "type",
                 "selector": "textarea[name='q'], input[name='q']",
                 "value": "laptops under 50000",
                 "description": "Type search query"
-            }},
-            {{
+            },
+            {
                 "action": "click",
                 "selector": "input[value='Google Search'], button[type='submit']",
                 "description": "Click search button"
-            }},
-            {{
+            },
+            {
                 "action": "wait",
                 "value": "5000",
+                "selector": ".g, .rc, .tF2Cxc",
                 "description": "Wait for results to load"
-            }},
-            {{
+            },
+            {
                 "action": "extract",
                 "selector": ".g, .rc, .tF2Cxc",
                 "description": "Extract search results"
-            }}
+            }
         ]
+        """
+
+    @staticmethod
+    def get_planning_request(user_input: str) -> str:
+        return f"""
+        User Request: "{user_input}"
         
         Return only valid JSON:
         """
 
+    @staticmethod
+    def get_planning_prompt(user_input: str) -> str:
+        """Instructions and request as one prompt, the request last"""
+        return PromptTemplates.PLANNING_INSTRUCTIONS + PromptTemplates.get_planning_request(user_input)
+
     @staticmethod
     def get_summarization_prompt(data: str, original_query: str) -> str:
         return f"""
@@ -0,0 +1,67 @@
+from src.browser.actions import ACTION_TYPES
+
+# JSON schemas passed as Ollama's ``format`` field, so the model can only emit
+# output of this shape. Properties are generated in the order listed, so the
+# export schemas put "summary" first, where it can be streamed to the user.
+
+ACTION_LIST_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "action": {"type": "string", "enum": list(ACTION_TYPES)},
+            "selector": {"type": "string"},
+            "value": {"type": "string"},
+            "description": {"type": "string"}
+        },
+        "required": ["action", "description"]
+    },
+    "minItems": 1
+}
+
+PRODUCT_EXPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "query": {"type": "string"},
+        "products": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "price": {"type": "string"},
+                    "rating": {"type": "string"},
+                    "store": {"type": "string"},
+                    "specifications": {"type": "string"}
+                },
+                "required": ["name", "price", "rating", "store", "specifications"]
+            },
+            "maxItems": 5
+        }
+    },
+    "required": ["summary", "query", "products"]
+}
+
+RESULT_EXPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "query": {"type": "string"},
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "source": {"type": "string"},
+                    "relevance": {"type": "string"}
+                },
+                "required": ["title", "description", "source", "relevance"]
+            }
+        },
+        "key_findings": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["summary", "query", "results", "key_findings"]
+}
@@ -63,41 +63,219 @@
 #             self.browser.close()
 #             print("Browser closed.")
 
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional
 import os
+import time
+from config.settings import settings
+from src.browser.browser_pool import BrowserPool
 from src.browser.playwright_controller import PlaywrightController
+from src.browser.actions import extraction_failed, needs_full_page_load
+from src.browser.har import HarSession
+from src.browser.http_fast_path import HttpFastPath
+from src.browser.page_cache import PageCache
+from src.browser.readiness import ReadinessEngine
+from src.browser.selector_stats import SelectorStats
+from src.llm.model_router import ModelRouter
+from src.orchestrator.intent_rules import IntentRules
+from src.orchestrator.macros import MacroLibrary
+from src.orchestrator.plan_cache import PlanCache
 from src.orchestrator.task_planner import TaskPlanner
+from src.processing.data_extractor import TextCleaner
 from src.processing.summarizer import Summarizer
+from src.utils.helpers import elapsed_ms, time_first_chunk
 
 class WebNavigatorAgent:
-    def __init__(self, output_dir: str = "outputs"):
-        self.planner = TaskPlanner()
-        self.browser = PlaywrightController()
-        self.summarizer = Summarizer(output_dir)
+    def __init__(self, output_dir: str = "outputs", use_browser_pool: bool = True):
+        self.selector_stats = SelectorStats()
+        self.models = ModelRouter()
+        self.planner = TaskPlanner(
+            self.selector_stats,
+            plan_cache=PlanCache(llm=self.models.client_for("planner")) if settings.PLAN_CACHE_ENABLED else None,
+            intent_rules=IntentRules() if settings.INTENT_RULES_ENABLED else None,
+            macros=MacroLibrary() if settings.MACROS_ENABLED else None,
+            models=self.models
+        )
+        self.browser_pool = BrowserPool() if use_browser_pool and settings.BROWSER_POOL_SIZE > 0 else None
+        self.readiness = ReadinessEngine()
+        self.http_fast_path = HttpFastPath(selector_stats=self.selector_stats) if settings.HTTP_FAST_PATH_ENABLED else None
+        self.page_cache = PageCache() if settings.PAGE_CACHE_ENABLED else None
+        self.text_cleaner = TextCleaner() if settings.TEXT_CLEANING_ENABLED else None
+        self.summarizer = Summarizer(output_dir, self.models)
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def execute_task(self, user_input: str) -> Dict[str, Any]:
-        """Main method to execute complete web navigation task"""
+    def execute_task(self, user_input: str, har_mode: str = None,
+                     on_chunk: Callable[[str], None] = None) -> Dict[str, Any]:
+        """Main method to execute complete web navigation task.
+        
+        ``har_mode`` ("record", "replay" or "off") overrides Settings.HAR_MODE.
+        ``on_chunk`` receives the text summary as it streams from the LLM.
+        """
         print(f"Processing: {user_input}")
+        har = HarSession.for_task(user_input, har_mode)
+        timings = {}
+        execution_log = []
+        metrics = {"timings_ms": timings}
+        started = time.perf_counter()
         
-        # Step 1: Plan the actions
-        print("Planning actions...")
-        actions = self.planner.parse_user_instruction(user_input)
+        # Step 1: Plan the actions (a replay reuses the recorded plan)
+        actions = self._plan_actions(user_input, har, metrics)
+        timings["plan"] = elapsed_ms(started)
         print(f"Planned {len(actions)} actions")
         
-        # Step 2: Initialize browser
+        try:
+            # Step 2: Execute the plan (static HTTP fetch when possible, else the browser)
+            stage_start = time.perf_counter()
+            extracted_data = self._run_actions(actions, execution_log, metrics, har)
+            timings["execute"] = elapsed_ms(stage_start)
+            self._update_macros(user_input, actions, execution_log, extracted_data, metrics)
+            
+            # Step 3: Process and summarize results
+            print("Summarizing results...")
+            stage_start = time.perf_counter()
+            summary_input = self._clean_extraction(extracted_data, metrics)
+            timings["clean"] = elapsed_ms(stage_start)
+            stage_start = time.perf_counter()
+            summary_result = self.summarizer.summarize_results(
+                summary_input, user_input, time_first_chunk(on_chunk, started, timings)
+            )
+            timings["summarize"] = elapsed_ms(stage_start)
+            timings["total"] = elapsed_ms(started)
+            
+            return self._build_response(
+                user_input, actions, extracted_data, summary_result, execution_log, metrics
+            )
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "execution_log": execution_log,
+                "file_created": False
+            }
+    
+    def _plan_actions(self, user_input: str, har: HarSession = None,
+                      metrics: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        metrics = metrics if metrics is not None else {}
+        if har and har.mode == "replay":
+            actions = har.load_plan()
+            if actions is not None:
+                print("Replaying recorded plan")
+                metrics["plan"] = {"source": "har"}
+                return actions
+        
+        print("Planning actions...")
+        actions, metrics["plan"] = self.planner.plan(user_input)
+        if self.planner.intent_rules:
+            metrics["intent_rules"] = self.planner.intent_rules.get_stats()
+        if self.planner.plan_cache:
+            metrics["plan_cache"] = self.planner.plan_cache.get_stats()
+        metrics["ollama_backends"] = self.planner.llm.backends.get_stats()
+        if har and har.mode == "record":
+            har.save_plan(actions)
+        return actions
+    
+    def _update_macros(self, user_input: str, actions: List[Dict[str, Any]], execution_log: List[Dict[str, Any]],
+                       extracted_data: str, metrics: Dict[str, Any]):
+        """Learn a macro from a freshly planned run, or score a macro replay"""
+        macros = self.planner.macros
+        plan = metrics.get("plan", {})
+        if not macros or plan.get("source") not in ("llm", "macro"):
+            return
+        if plan["source"] == "macro":
+            macros.record_outcome(plan["macro_id"], extracted_data)
+        else:
+            macros.learn(user_input, actions, execution_log, extracted_data)
+        macros.save()
+        metrics["macros"] = macros.get_stats()
+    
+    def _clean_extraction(self, extracted_data: str, metrics: Dict[str, Any]) -> str:
+        """Denser copy of the extraction for the summarizer (the response keeps the original)"""
+        if not self.text_cleaner or not extracted_data or extraction_failed(extracted_data):
+            return extracted_data
+        cleaned, metrics["text_cleaning"] = self.text_cleaner.clean(extracted_data)
+        return cleaned or extracted_data
+    
+    def _run_actions(self, actions: List[Dict[str, Any]], execution_log: List[Dict[str, Any]],
+                     metrics: Dict[str, Any], har: HarSession = None) -> str:
+        """Run the plan and return the extracted data, skipping the browser on a cache hit"""
+        if har:
+            # Recording and replay must see every request, so always use the browser
+            print(f"HAR {har.mode}: {har.path}")
+            metrics["execution_path"] = "browser"
+            metrics["har"] = {"mode": har.mode, "path": har.path}
+            return self._run_browser_actions(actions, execution_log, metrics, har)
+        
+        cached = self._cached_extraction(actions, execution_log, metrics)
+        if cached is not None:
+            return cached
+        
+        extracted_data = self._execute_plan(actions, execution_log, metrics)
+        self.selector_stats.save()
+        self._store_extraction(actions, extracted_data, metrics)
+        return extracted_data
+    
+    def _cached_extraction(self, actions: List[Dict[str, Any]], execution_log: List[Dict[str, Any]],
+                           metrics: Dict[str, Any]) -> Optional[str]:
+        """Extracted data from the page cache, or None on a miss"""
+        if not self.page_cache:
+            return None
+        
+        cache_key = self.page_cache.key_for(actions)
+        cached = self.page_cache.get(cache_key) if cache_key else None
+        metrics["page_cache"] = self.page_cache.get_stats()
+        if not cached:
+            return None
+        
+        print("Serving results from page cache")
+        metrics["execution_path"] = "cache"
+        execution_log.append({
+            "action": {"action": "extract", "selector": cached.get("selector"), "description": "Served from page cache"},
+            "result": cached["extracted_data"]
+        })
+        return cached["extracted_data"]
+    
+    def _store_extraction(self, actions: List[Dict[str, Any]], extracted_data: str, metrics: Dict[str, Any]):
+        if not self.page_cache or not self.page_cache.is_cacheable(extracted_data):
+            return
+        cache_key = self.page_cache.key_for(actions)
+        if cache_key:
+            selector = next((a.get("selector") for a in actions if a["action"] == "extract"), None)
+            self.page_cache.put(cache_key, {"extracted_data": extracted_data, "selector": selector})
+            metrics["page_cache"] = self.page_cache.get_stats()
+    
+    def _execute_plan(self, actions: List[Dict[str, Any]], execution_log: List[Dict[str, Any]],
+                      metrics: Dict[str, Any]) -> str:
+        """Static HTTP fetch when possible, else the browser"""
+        if self.http_fast_path and self.http_fast_path.can_handle(actions):
+            print("Trying HTTP fast path...")
+            extracted_data = self.http_fast_path.run(actions, execution_log)
+            if extracted_data is not None:
+                metrics["execution_path"] = "http"
+                return extracted_data
+            print("Static page had no usable content, falling back to the browser")
+        
+        metrics["execution_path"] = "browser"
+        return self._run_browser_actions(actions, execution_log, metrics)
+    
+    def _run_browser_actions(self, actions: List[Dict[str, Any]], execution_log: List[Dict[str, Any]],
+                             metrics: Dict[str, Any], har: HarSession = None) -> str:
+        """Execute the plan in a browser context (a warm browser if pooled)"""
         print("Starting browser...")
-        self.browser.start_browser()
+        browser = PlaywrightController(self.browser_pool, self.readiness, self.selector_stats)
+        browser.start_browser(
+            lean=settings.LEAN_PROFILE_ENABLED and not needs_full_page_load(actions), har=har
+        )
         
-        execution_log = []
         extracted_data = ""
+        if browser.lease:
+            metrics["pool_wait_ms"] = round(browser.lease.wait_ms, 1)
+            print(f"Browser leased from pool in {browser.lease.wait_ms:.0f}ms")
         
         try:
-            # Step 3: Execute browser actions
             for i, action in enumerate(actions):
                 print(f"Executing action {i+1}: {action['description']}")
-                result = self.browser.execute_action(action)
+                result = browser.execute_action(action)
                 execution_log.append({
                     "action": action,
                     "result": result
@@ -107,38 +285,54 @@ class WebNavigatorAgent:
                 if action["action"] == "extract":
                     extracted_data = result
             
-            # Step 4: Process and summarize results
-            print("Summarizing results...")
-            summary_result = self.summarizer.summarize_results(extracted_data, user_input)
-            
-            response = {
-                "success": True,
-                "original_query": user_input,
-                "actions_executed": len(actions),
-                "extracted_data": extracted_data,
-                "final_summary": summary_result["text"],
-                "output_format": summary_result["format"],
-                "execution_log": execution_log
-            }
-            
-            # Add file information if file was created
-            if summary_result["file_path"]:
-                response["file_path"] = summary_result["file_path"]
-                response["file_created"] = True
-                response["file_name"] = os.path.basename(summary_result["file_path"])
-            else:
-                response["file_created"] = False
-            
-            return response
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "execution_log": execution_log,
-                "file_created": False
-            }
+            return extracted_data
         finally:
-            # Step 5: Cleanup
-            self.browser.close()
-            print("Browser closed.")
\ No newline at end of file
+            # Hand the browser back before the (slow) summarization step
+            browser.close()
+            self.readiness.stats.save()
+            if browser.blocker:
+                metrics["resources_blocked"] = browser.blocker.get_stats()
+            if self.browser_pool:
+                metrics["browser_pool"] = self.browser_pool.get_stats()
+            print("Browser closed.")
+    
+    def _build_response(self, user_input: str, actions: List[Dict[str, Any]], extracted_data: str,
+                        summary_result: Dict[str, Any], execution_log: List[Dict[str, Any]],
+                        metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Assemble the task result returned to callers"""
+        # Model and latency per LLM stage
+        stages = (metrics.get("plan", {}).get("model"), summary_result.get("model"))
+        metrics["models"] = {record["stage"]: record for record in stages if record}
+        metrics["summary"] = summary_result.get("phases", {})
+        
+        response = {
+            "success": True,
+            "original_query": user_input,
+            "actions_executed": len(actions),
+            "extracted_data": extracted_data,
+            "final_summary": summary_result["text"],
+            "output_format": summary_result["format"],
+            "execution_log": execution_log,
+            "metrics": metrics
+        }
+        
+        # Key of the stored structured result, for re-exports without the LLM
+        if summary_result.get("result_key"):
+            response["result_key"] = summary_result["result_key"]
+        
+        # Add file information if file was created
+        if summary_result["file_path"]:
+            response["file_path"] = summary_result["file_path"]
+            response["file_created"] = True
+            response["file_name"] = os.path.basename(summary_result["file_path"])
+        else:
+            response["file_created"] = False
+        
+        return response
+    
+    def shutdown(self):
+        """Close any warm browsers held by the pool and persist the page cache"""
+        if self.page_cache:
+            self.page_cache.flush()
+        if self.browser_pool:
+            self.browser_pool.shutdown()
\ No newline at end of file
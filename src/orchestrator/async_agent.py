@@ -0,0 +1,143 @@
+import asyncio
+import time
+from typing import Callable, Dict, Any, List
+from config.settings import settings
+from src.browser.async_playwright_controller import AsyncBrowserEngine, AsyncPlaywrightController
+from src.browser.actions import needs_full_page_load
+from src.browser.har import HarSession
+from src.orchestrator.agent import WebNavigatorAgent
+from src.utils.helpers import elapsed_ms, time_first_chunk
+
+class AsyncWebNavigatorAgent(WebNavigatorAgent):
+    """Runs many navigation tasks concurrently on one event loop.
+
+    All tasks share a single async browser, each in its own context. Planning
+    and summarization still use the blocking LLM client, so they run in the
+    loop's default executor instead of stalling other tasks.
+    """
+
+    def __init__(self, output_dir: str = "outputs", engine: AsyncBrowserEngine = None):
+        # The shared async browser replaces the sync agent's browser pool
+        super().__init__(output_dir, use_browser_pool=False)
+        self.engine = engine or AsyncBrowserEngine()
+    
+    async def execute_task(self, user_input: str, har_mode: str = None,
+                           on_chunk: Callable[[str], None] = None) -> Dict[str, Any]:
+        """Main method to execute complete web navigation task.
+
+        ``on_chunk`` is called from an executor thread as the summary streams.
+        """
+        loop = asyncio.get_running_loop()
+        print(f"Processing: {user_input}")
+        har = HarSession.for_task(user_input, har_mode)
+        timings = {}
+        execution_log = []
+        metrics = {"timings_ms": timings}
+        started = time.perf_counter()
+
+        # Step 1: Plan the actions (a replay reuses the recorded plan)
+        actions = await loop.run_in_executor(None, self._plan_actions, user_input, har, metrics)
+        timings["plan"] = elapsed_ms(started)
+        print(f"Planned {len(actions)} actions")
+
+        try:
+            # Step 2: Execute the plan (static HTTP fetch when possible, else the browser)
+            stage_start = time.perf_counter()
+            extracted_data = await self._run_actions_async(actions, execution_log, metrics, har)
+            timings["execute"] = elapsed_ms(stage_start)
+            await loop.run_in_executor(
+                None, self._update_macros, user_input, actions, execution_log, extracted_data, metrics
+            )
+
+            # Step 3: Process and summarize results
+            stage_start = time.perf_counter()
+            summary_input = await loop.run_in_executor(None, self._clean_extraction, extracted_data, metrics)
+            timings["clean"] = elapsed_ms(stage_start)
+            stage_start = time.perf_counter()
+            summary_result = await loop.run_in_executor(
+                None, self.summarizer.summarize_results, summary_input, user_input,
+                time_first_chunk(on_chunk, started, timings)
+            )
+            timings["summarize"] = elapsed_ms(stage_start)
+            timings["total"] = elapsed_ms(started)
+
+            return self._build_response(
+                user_input, actions, extracted_data, summary_result, execution_log, metrics
+            )
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "execution_log": execution_log,
+                "file_created": False
+            }
+
+    async def _run_actions_async(self, actions: List[Dict[str, Any]], execution_log: List[Dict[str, Any]],
+                                 metrics: Dict[str, Any], har: HarSession = None) -> str:
+        """Run the plan and return the extracted data, skipping the browser on a cache hit"""
+        if har:
+            metrics["execution_path"] = "browser"
+            metrics["har"] = {"mode": har.mode, "path": har.path}
+            return await self._run_browser_actions_async(actions, execution_log, metrics, har)
+
+        cached = self._cached_extraction(actions, execution_log, metrics)
+        if cached is not None:
+            return cached
+
+        extracted_data = await self._execute_plan_async(actions, execution_log, metrics)
+        await asyncio.get_running_loop().run_in_executor(None, self.selector_stats.save)
+        self._store_extraction(actions, extracted_data, metrics)
+        return extracted_data
+
+    async def _execute_plan_async(self, actions: List[Dict[str, Any]], execution_log: List[Dict[str, Any]],
+                                  metrics: Dict[str, Any]) -> str:
+        """Static HTTP fetch when possible, else the browser"""
+        if self.http_fast_path and self.http_fast_path.can_handle(actions):
+            loop = asyncio.get_running_loop()
+            extracted_data = await loop.run_in_executor(None, self.http_fast_path.run, actions, execution_log)
+            if extracted_data is not None:
+                metrics["execution_path"] = "http"
+                return extracted_data
+
+        metrics["execution_path"] = "browser"
+        return await self._run_browser_actions_async(actions, execution_log, metrics)
+
+    async def _run_browser_actions_async(self, actions: List[Dict[str, Any]],
+                                         execution_log: List[Dict[str, Any]],
+                                         metrics: Dict[str, Any], har: HarSession = None) -> str:
+        """Execute the plan in an isolated context on the shared browser"""
+        browser = AsyncPlaywrightController(self.engine, self.readiness, self.selector_stats)
+        await browser.start_browser(
+            lean=settings.LEAN_PROFILE_ENABLED and not needs_full_page_load(actions), har=har
+        )
+
+        extracted_data = ""
+        try:
+            for i, action in enumerate(actions):
+                print(f"Executing action {i+1}: {action['description']}")
+                result = await browser.execute_action(action)
+                execution_log.append({
+                    "action": action,
+                    "result": result
+                })
+
+                if action["action"] == "extract":
+                    extracted_data = result
+
+            return extracted_data
+        finally:
+            await browser.close()
+            if browser.blocker:
+                metrics["resources_blocked"] = browser.blocker.get_stats()
+            await asyncio.get_running_loop().run_in_executor(None, self.readiness.stats.save)
+
+    async def execute_tasks(self, user_inputs: List[str]) -> List[Dict[str, Any]]:
+        """Run several tasks concurrently and return results in input order"""
+        return await asyncio.gather(*(self.execute_task(text) for text in user_inputs))
+
+    async def shutdown(self):
+        """Close the shared browser and persist the page cache"""
+        if self.page_cache:
+            self.page_cache.flush()
+        await self.engine.close()
@@ -0,0 +1,191 @@
+import re
+import threading
+from typing import Dict, Any, List, Optional
+from urllib.parse import quote_plus
+from src.browser.actions import DEFAULT_TYPE_SELECTOR, DEFAULT_CLICK_SELECTOR
+
+# Result-page templates for sites the rules know how to search. Sites with a
+# "search_url" are planned as navigate + wait + extract on the results page;
+# Google keeps the type/click form of TaskPlanner's fallback plan.
+SITE_TEMPLATES = {
+    "google": {
+        "aliases": ("google", "google.com"),
+        "home": "https://www.google.com",
+        "results": ".g, .rc, .tF2Cxc, .MjjYud"
+    },
+    "youtube": {
+        "aliases": ("youtube", "youtube.com", "yt"),
+        "search_url": "https://www.youtube.com/results?search_query={query}",
+        "results": "ytd-video-renderer"
+    },
+    "wikipedia": {
+        "aliases": ("wikipedia", "wikipedia.org", "wiki"),
+        "search_url": "https://en.wikipedia.org/w/index.php?search={query}&fulltext=1",
+        "results": ".mw-search-result"
+    },
+    "amazon": {
+        "aliases": ("amazon", "amazon.in", "amazon.com"),
+        "search_url": "https://www.amazon.in/s?k={query}",
+        "results": "[data-component-type='s-search-result']"
+    },
+    "flipkart": {
+        "aliases": ("flipkart", "flipkart.com"),
+        "search_url": "https://www.flipkart.com/search?q={query}",
+        "results": "div[data-id]"
+    },
+    "ebay": {
+        "aliases": ("ebay", "ebay.com"),
+        "search_url": "https://www.ebay.com/sch/i.html?_nkw={query}",
+        "results": ".s-item"
+    }
+}
+
+_SITE_BY_ALIAS = {alias: name for name, t in SITE_TEMPLATES.items() for alias in t["aliases"]}
+_SITE_ALT = "|".join(sorted((re.escape(a) for a in _SITE_BY_ALIAS), key=len, reverse=True))
+_SEARCH_VERB = r"(?:search(?:\s+for)?|find|look\s+up|lookup|show\s+me)"
+
+# Requests that need more than a single search: leave these to the LLM
+_COMPLEX_MARKERS = re.compile(
+    r"\b(?:and\s+then|then|compare|click|log\s*in|login|sign\s*in|fill|submit|screenshot|"
+    r"scroll|download|book|add\s+to\s+cart|checkout|each|every)\b"
+)
+# Export requests ("... and save as csv") don't change the plan
+_EXPORT_CLAUSE = re.compile(
+    r"(?:,?\s*(?:and\s+)?(?:save|export|download|give|return)\s+(?:it\s+|them\s+|the\s+results\s+)?"
+    r"(?:as|to|in)\s+(?:a\s+)?(?:json|csv|txt|text|pdf)(?:\s+file)?|\s+in\s+(?:json|csv)(?:\s+format)?)\s*$"
+)
+# Time-sensitive questions belong on a web search, not the encyclopedia
+_TIMELY = re.compile(r"\b(?:weather|price|prices|today|tonight|latest|news|now|current|score|rate|stock)\b")
+_POLITE_PREFIX = re.compile(r"^(?:please\s+|can\s+you\s+|could\s+you\s+|i\s+want\s+to\s+|help\s+me\s+)+")
+
+# (name, pattern): tried in order, first match wins
+RULES = [
+    ("open_site", re.compile(
+        r"^(?:go\s+to|open|visit|navigate\s+to)\s+(?P<url>(?:https?://)?[\w-]+(?:\.[\w-]+)+(?:/\S*)?)$"
+    )),
+    ("site_search", re.compile(
+        rf"^{_SEARCH_VERB}\s+(?P<query>.+?)\s+(?:on|in|from|at|using)\s+(?P<site>{_SITE_ALT})$"
+    )),
+    # A site only becomes the target when the request says so ("search amazon
+    # for ...", "amazon search ...", "on amazon, ..."); "amazon stock price"
+    # is about Amazon and goes to the LLM
+    ("site_search", re.compile(
+        rf"^search\s+(?P<site>{_SITE_ALT})\s+for\s+(?P<query>.+)$"
+    )),
+    ("site_search", re.compile(
+        rf"^(?P<site>{_SITE_ALT})\s+search\s+(?:for\s+)?(?P<query>.+)$"
+    )),
+    ("site_search", re.compile(
+        rf"^(?:on|in|from)\s+(?P<site>{_SITE_ALT})\s*,\s*(?:{_SEARCH_VERB}\s+)?(?P<query>.+)$"
+    )),
+    ("encyclopedia", re.compile(
+        r"^(?:who\s+(?:is|was)|what\s+(?:is|was|are)|history\s+of|tell\s+me\s+about)\s+(?P<query>.+)$"
+    )),
+    ("web_search", re.compile(
+        rf"^{_SEARCH_VERB}\s+(?:the\s+web\s+for\s+|online\s+for\s+)?(?P<query>.+)$"
+    ))
+]
+
+
+def normalize_request(user_input: str) -> str:
+    """Lowercased request without politeness or an export clause"""
+    text = re.sub(r"\s+", " ", user_input.strip().lower()).rstrip("?.! ")
+    text = _POLITE_PREFIX.sub("", text)
+    return _EXPORT_CLAUSE.sub("", text).strip()
+
+
+def is_multi_step(user_input: str) -> bool:
+    """True for requests that need more than a single search"""
+    return bool(_COMPLEX_MARKERS.search(normalize_request(user_input)))
+
+
+class IntentRules:
+    """Compiled intent grammar that plans common requests without the LLM.
+
+    A rule only answers when the whole request matches it and the request
+    has no multi-step markers; anything else returns None so the caller
+    falls through to the LLM.
+    """
+
+    def __init__(self, rules: List = None, sites: Dict[str, Dict[str, Any]] = None):
+        self.rules = rules if rules is not None else RULES
+        self.sites = sites if sites is not None else SITE_TEMPLATES
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses = 0
+
+    def match(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """``{"rule", "actions"}`` for a confident match, else None"""
+        text = normalize_request(user_input)
+        result = None
+        if text and not _COMPLEX_MARKERS.search(text):
+            for name, pattern in self.rules:
+                m = pattern.match(text)
+                if m:
+                    actions = self._build(name, m.groupdict(), text, user_input)
+                    if actions:
+                        result = {"rule": name, "actions": actions}
+                        break
+
+        with self._lock:
+            if result:
+                self.hits[result["rule"]] = self.hits.get(result["rule"], 0) + 1
+            else:
+                self.misses += 1
+        return result
+
+    def _build(self, rule: str, groups: Dict[str, str], text: str,
+               user_input: str) -> Optional[List[Dict[str, Any]]]:
+        if rule == "open_site":
+            # Rules match lowercased text; paths and query strings keep the user's case
+            original = re.search(re.escape(groups["url"]), user_input, re.IGNORECASE)
+            return self._open_site(original.group(0) if original else groups["url"])
+        query = (groups.get("query") or "").strip(" \"'")
+        if len(query) < 2:
+            return None
+        if rule == "site_search":
+            return self._site_search(_SITE_BY_ALIAS[groups["site"]], query)
+        if rule == "encyclopedia":
+            if _TIMELY.search(query):
+                return self._site_search("google", text)
+            return self._site_search("wikipedia", query)
+        return self._site_search("google", query)
+
+    def _open_site(self, url: str) -> List[Dict[str, Any]]:
+        return [
+            {"action": "navigate", "value": url, "description": f"Open {url}"},
+            {"action": "wait", "value": "3000", "selector": "main", "description": "Wait for the page to load"},
+            {"action": "extract", "selector": "main", "description": "Extract page content"}
+        ]
+
+    def _site_search(self, site: str, query: str) -> List[Dict[str, Any]]:
+        template = self.sites[site]
+        results = template["results"]
+        if "search_url" in template:
+            actions = [{
+                "action": "navigate",
+                "value": template["search_url"].format(query=quote_plus(query)),
+                "description": f"Search {site.title()} for: {query}"
+            }]
+        else:
+            actions = [
+                {"action": "navigate", "value": template["home"], "description": f"Navigate to {site.title()} search"},
+                {"action": "type", "selector": DEFAULT_TYPE_SELECTOR, "value": query,
+                 "description": f"Type search query: {query}"},
+                {"action": "click", "selector": DEFAULT_CLICK_SELECTOR, "description": "Execute search"}
+            ]
+        actions.append({"action": "wait", "value": "5000", "selector": results,
+                        "description": "Wait for results to load (up to 5s)"})
+        actions.append({"action": "extract", "selector": results, "description": "Extract search results"})
+        return actions
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(self.hits.values())
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "misses": self.misses,
+                "by_rule": dict(self.hits),
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+            }
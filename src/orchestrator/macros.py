@@ -0,0 +1,211 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote_plus
+from config.settings import settings
+from src.browser.actions import extraction_failed
+from src.browser.selector_stats import domain_of
+from src.orchestrator.intent_rules import is_multi_step, normalize_request
+from src.orchestrator.plan_cache import site_hints
+
+QUERY_SLOT = "{query}"
+
+# Coarse intents used to index macros; the first matching keyword wins
+INTENT_KEYWORDS = (
+    ("shopping", ("buy", "price", "prices", "cheap", "cheapest", "under", "deal", "laptop", "phone", "product")),
+    ("video", ("video", "videos", "youtube", "watch", "tutorial")),
+    ("news", ("news", "latest", "today", "headlines")),
+    ("reference", ("who", "what", "history", "define", "meaning", "wikipedia"))
+)
+
+
+# Words that shape a request around its query: the leading verb, and the
+# connectives that say where or how ("search X on Y" vs "X under Y")
+_LEADING_WORDS = frozenset("""
+search find look lookup show get buy watch open go visit list compare best top cheapest cheap latest
+who what when where which how why tell give
+""".split())
+_FRAME_WORDS = frozenset("on in from at for of under over below above between near vs versus with without".split())
+
+
+def classify_intent(user_input: str) -> str:
+    words = set(re.findall(r"\w+", user_input.lower()))
+    for intent, keywords in INTENT_KEYWORDS:
+        if words.intersection(keywords):
+            return intent
+    return "search"
+
+
+def request_shape(user_input: str) -> str:
+    """Leading verb and connectives: "search laptops on amazon" -> "search on" """
+    words = re.findall(r"\w+", normalize_request(user_input))
+    if not words:
+        return ""
+    verb = words[0] if words[0] in _LEADING_WORDS else "*"
+    return " ".join([verb] + [w for w in words[1:] if w in _FRAME_WORDS])
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"\w+", str(text).lower()))
+
+
+def _is_query_text(value: str, query_words: set) -> bool:
+    """True if most words of ``value`` come from the user's query"""
+    words = _words(value)
+    return bool(words) and len(words & query_words) / len(words) >= 0.5
+
+
+class MacroLibrary:
+    """Parameterized plans learned from successful runs, replayed instead of planning.
+
+    A macro is an action list whose typed query and query-carrying URL
+    parameters are replaced by ``{query}``. Macros are indexed by
+    ``intent|site|shape`` (the site named in the request, or ``*``, and the
+    request's verb and connectives), so a macro only replays for requests
+    phrased like the one it was learned from; multi-step requests are never
+    learned or replayed. Each replay
+    outcome updates the macro's success/failure counts, and a macro whose
+    smoothed success rate falls below ``min_score`` is demoted (kept, but no
+    longer replayed) until a later successful run promotes it again.
+    """
+
+    def __init__(self, path: str = None, min_score: float = None):
+        self.path = path or os.path.join(settings.CACHE_DIR, "macros.json")
+        self.min_score = min_score or settings.MACRO_MIN_SCORE
+        self._lock = threading.Lock()
+        self._macros: Dict[str, Dict[str, Any]] = {}
+        self.replays = 0
+        self.demotions = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._macros = json.load(f)
+        except (OSError, ValueError):
+            self._macros = {}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._macros, indent=2, ensure_ascii=False)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Could not save macros: {e}")
+
+    def index_key(self, user_input: str) -> str:
+        sites = sorted(site_hints(user_input))
+        return f"{classify_intent(user_input)}|{','.join(sites) or '*'}|{request_shape(user_input)}"
+
+    def _score(self, macro: Dict[str, Any]) -> float:
+        return (macro["successes"] + 1) / (macro["successes"] + macro["failures"] + 2)
+
+    def _parameterize_url(self, url: str, query_words: set) -> str:
+        parts = urlsplit(url)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        if not params:
+            return url
+        slotted = [(k, QUERY_SLOT if _is_query_text(v, query_words) else v) for k, v in params]
+        # Keep the slot unescaped so it can be filled with str.replace
+        query = urlencode(slotted).replace(quote_plus(QUERY_SLOT), QUERY_SLOT)
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, query, parts.fragment))
+
+    def parameterize(self, user_input: str, actions: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Template with the query text abstracted out, or None if nothing was query-specific"""
+        query_words = _words(user_input)
+        template = copy.deepcopy(actions)
+        slots = 0
+        for action in template:
+            value = action.get("value")
+            if not value:
+                continue
+            if action["action"] == "type" and _is_query_text(value, query_words):
+                action["value"] = QUERY_SLOT
+                action["description"] = f"Type search query: {QUERY_SLOT}"
+            elif action["action"] == "navigate":
+                action["value"] = self._parameterize_url(value, query_words)
+            slots += QUERY_SLOT in action["value"]
+        return template if slots else None
+
+    def learn(self, user_input: str, actions: List[Dict[str, Any]], execution_log: List[Dict[str, Any]],
+              extracted_data: str) -> Optional[str]:
+        """Store a successful run as a macro; returns its id"""
+        if extraction_failed(extracted_data) or is_multi_step(user_input):
+            return None
+        if any(str(entry.get("result", "")).startswith("Error executing") for entry in execution_log):
+            return None
+        template = self.parameterize(user_input, actions)
+        if not template:
+            return None
+
+        key = self.index_key(user_input)
+        macro_id = hashlib.sha1(json.dumps([key, template], sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        navigate = next((a.get("value", "") for a in template if a["action"] == "navigate"), "")
+        with self._lock:
+            macro = self._macros.setdefault(macro_id, {
+                "key": key,
+                "domain": domain_of(navigate),
+                "template": template,
+                "successes": 0,
+                "failures": 0,
+                "example": user_input
+            })
+            macro["successes"] += 1
+            macro["demoted"] = self._score(macro) < self.min_score
+            macro["updated"] = time.time()
+        return macro_id
+
+    def match(self, user_input: str, query: str) -> Optional[Dict[str, Any]]:
+        """Best live macro for the request, filled with ``query``"""
+        if is_multi_step(user_input):
+            return None
+        key = self.index_key(user_input)
+        with self._lock:
+            candidates = [(m_id, m) for m_id, m in self._macros.items() if m["key"] == key and not m.get("demoted")]
+            if not candidates:
+                return None
+            macro_id, macro = max(candidates, key=lambda item: (self._score(item[1]), item[1]["successes"]))
+            template = copy.deepcopy(macro["template"])
+            self.replays += 1
+
+        for action in template:
+            value = action.get("value")
+            if action["action"] == "navigate" and value:
+                action["value"] = value.replace(QUERY_SLOT, quote_plus(query))
+            for field in ("value", "description"):
+                if isinstance(action.get(field), str):
+                    action[field] = action[field].replace(QUERY_SLOT, query)
+        return {"macro_id": macro_id, "domain": macro["domain"], "actions": template}
+
+    def record_outcome(self, macro_id: str, extracted_data: str):
+        """Count a replay; a replay that extracted nothing may demote the macro"""
+        with self._lock:
+            macro = self._macros.get(macro_id)
+            if not macro:
+                return
+            if extraction_failed(extracted_data):
+                macro["failures"] += 1
+            else:
+                macro["successes"] += 1
+            was_demoted = macro.get("demoted", False)
+            macro["demoted"] = self._score(macro) < self.min_score
+            if macro["demoted"] and not was_demoted:
+                self.demotions += 1
+                print(f"Macro {macro_id} demoted after {macro['failures']} failed replays")
+            macro["updated"] = time.time()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "macros": len(self._macros),
+                "demoted": sum(1 for m in self._macros.values() if m.get("demoted")),
+                "replays": self.replays,
+                "demotions": self.demotions
+            }
@@ -0,0 +1,156 @@
+import copy
+import math
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from config.settings import settings
+from src.llm.ollama_client import OllamaClient
+
+# Sites named in a query decide where a plan navigates, so a similar query
+# naming a different site must not reuse the plan
+KNOWN_SITES = (
+    "google", "youtube", "wikipedia", "amazon", "flipkart", "ebay", "reddit",
+    "github", "twitter", "linkedin", "bing", "duckduckgo", "stackoverflow", "pypi"
+)
+
+# Seconds to skip similarity lookups after the embeddings endpoint fails
+_EMBED_RETRY_AFTER = 300
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s.]", " ", query.lower())).strip()
+
+
+def site_hints(query: str) -> frozenset:
+    words = normalize_query(query).split()
+    return frozenset(w for w in words if w in KNOWN_SITES or re.match(r"^[\w-]+\.[a-z]{2,}$", w))
+
+
+def _unit_vector(values: List[float]) -> Optional[array]:
+    norm = math.sqrt(sum(v * v for v in values))
+    return array("f", (v / norm for v in values)) if norm else None
+
+
+class PlanCache:
+    """TTL'd LRU of validated action plans keyed by the user's query.
+
+    Lookups try the normalized query first, then the nearest stored query
+    by embedding cosine similarity (a linear scan over unit float32 vectors,
+    which is cheap at the configured size). Plans are returned as deep copies
+    so callers can rewrite the typed query without touching the cache.
+    """
+
+    def __init__(self, ttl: int = None, max_entries: int = None, threshold: float = None,
+                 llm: OllamaClient = None):
+        self.ttl = ttl or settings.PLAN_CACHE_TTL
+        self.max_entries = max_entries or settings.PLAN_CACHE_MAX_ENTRIES
+        self.threshold = threshold or settings.PLAN_CACHE_SIMILARITY
+        self.llm = llm or OllamaClient()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._embed_disabled_until = 0.0
+
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.rejected_hits = 0
+        self.misses = 0
+
+    def _embed(self, query: str) -> Optional[array]:
+        if time.time() < self._embed_disabled_until:
+            return None
+        try:
+            return _unit_vector(self.llm.embed(normalize_query(query)))
+        except Exception as e:
+            print(f"Plan cache similarity lookups paused: {e}")
+            self._embed_disabled_until = time.time() + _EMBED_RETRY_AFTER
+            return None
+
+    def _evict_expired(self, now: float):
+        for key in [k for k, entry in self._entries.items() if entry["expires"] <= now]:
+            del self._entries[key]
+
+    def _nearest(self, vector: array, hints: frozenset) -> Tuple[Optional[str], float]:
+        best_key, best_score = None, -1.0
+        for key, entry in self._entries.items():
+            other = entry["vector"]
+            if other is None or len(other) != len(vector) or entry["sites"] != hints:
+                continue
+            score = sum(a * b for a, b in zip(vector, other))
+            if score > best_score:
+                best_key, best_score = key, score
+        return best_key, best_score
+
+    def lookup(self, query: str,
+               adapt: Callable[[List[Dict[str, Any]], str], Optional[List[Dict[str, Any]]]] = None
+               ) -> Optional[Dict[str, Any]]:
+        """``{"actions", "match", "similarity", "cached_query"}`` for a hit, else None.
+
+        ``adapt(actions, cached_query)`` rewrites a similar hit's plan for
+        ``query``; a hit it rejects (returns None) is counted as a miss.
+        """
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return {"actions": copy.deepcopy(entry["actions"]), "match": "exact",
+                        "similarity": 1.0, "cached_query": entry["query"]}
+            if not self._entries:
+                self.misses += 1
+                return None
+
+        # The embedding call and the caller's rewrite happen outside the lock
+        vector = self._embed(query)
+        hit = None
+        with self._lock:
+            if vector is not None:
+                best_key, score = self._nearest(vector, site_hints(query))
+                if best_key and score >= self.threshold:
+                    entry = self._entries[best_key]
+                    self._entries.move_to_end(best_key)
+                    hit = {"actions": copy.deepcopy(entry["actions"]), "match": "similar",
+                           "similarity": round(score, 4), "cached_query": entry["query"]}
+        if hit and adapt:
+            hit["actions"] = adapt(hit["actions"], hit["cached_query"])
+        with self._lock:
+            if hit and hit["actions"] is not None:
+                self.similar_hits += 1
+                return hit
+            if hit:
+                self.rejected_hits += 1
+            self.misses += 1
+            return None
+
+    def store(self, query: str, actions: List[Dict[str, Any]]):
+        vector = self._embed(query)
+        with self._lock:
+            key = normalize_query(query)
+            self._entries[key] = {
+                "query": query,
+                "actions": copy.deepcopy(actions),
+                "vector": vector,
+                "sites": site_hints(query),
+                "expires": time.time() + self.ttl
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.exact_hits + self.similar_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "rejected_hits": self.rejected_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.exact_hits + self.similar_hits) / lookups, 3) if lookups else 0.0
+            }
@@ -1,55 +1,180 @@
-import json
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import parse_qsl, unquote_plus, urlencode, urlsplit, urlunsplit
+from config.settings import settings
+from src.llm.json_parser import IncrementalJsonParser
+from src.llm.model_router import ModelRouter
 from src.llm.ollama_client import OllamaClient
 from src.llm.prompt_templates import PromptTemplates
+from src.llm.schemas import ACTION_LIST_SCHEMA
+from src.browser.selector_stats import SelectorStats
+from src.orchestrator.intent_rules import IntentRules
+from src.orchestrator.macros import MacroLibrary
+from src.orchestrator.plan_cache import PlanCache
+from src.processing.ranking import tokenize
+
+# Chunks still read after the plan's array closes, so the stream reaches the
+# final line carrying Ollama's prompt-eval counters
+_TRAILING_CHUNKS = 8
+
+# Query-string parameters that carry the search terms on common sites
+_SEARCH_PARAMS = frozenset(("q", "query", "search_query", "search", "k", "_nkw", "p", "text", "keyword", "keywords"))
 
 class TaskPlanner:
-    def __init__(self):
-        self.llm = OllamaClient()
+    def __init__(self, selector_stats: SelectorStats = None, plan_cache: PlanCache = None,
+                 intent_rules: IntentRules = None, macros: MacroLibrary = None, models: ModelRouter = None):
+        self.models = models or ModelRouter()
+        self.llm = self.models.client_for("planner")
+        self.selector_stats = selector_stats
+        self.plan_cache = plan_cache
+        self.intent_rules = intent_rules
+        self.macros = macros
     
     def parse_user_instruction(self, user_input: str) -> List[Dict[str, Any]]:
         """Parse natural language instruction into browser actions"""
-        planning_prompt = PromptTemplates.get_planning_prompt(user_input)
+        return self.plan(user_input)[0]
+    
+    def plan(self, user_input: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Actions for the instruction plus where they came from.
+
+        The info dict has ``source`` ("rule", "macro", "cache", "llm" or
+        "fallback"); rule hits name the rule, macro hits carry the macro id and
+        cache hits carry the match kind, similarity and the query that was cached.
+        LLM plans carry ``prompt_eval``, the call's prompt-eval counters, and
+        ``model``, the ModelRouter record of the model used and its latency.
+        """
+        if self.intent_rules:
+            matched = self.intent_rules.match(user_input)
+            if matched:
+                return matched["actions"], {"source": "rule", "rule": matched["rule"]}
+        
+        if self.macros:
+            macro = self.macros.match(user_input, self._clean_search_query(user_input))
+            if macro:
+                return macro["actions"], {"source": "macro", "macro_id": macro["macro_id"]}
         
+        if self.plan_cache:
+            hit = self.plan_cache.lookup(
+                user_input, lambda actions, cached_query: self._with_search_query(actions, user_input, cached_query)
+            )
+            if hit:
+                return hit.pop("actions"), dict(hit, source="cache")
+        
+        usage, model = {}, {}
+        actions = self._plan_with_llm(user_input, usage, model)
+        if actions is None:
+            # Fallback plan for common queries
+            return self._create_fallback_plan(user_input), {"source": "fallback", "model": model}
+        
+        if self.plan_cache:
+            self.plan_cache.store(user_input, actions)
+        return actions, {"source": "llm", "prompt_eval": usage, "model": model}
+    
+    def _plan_with_llm(self, user_input: str, usage: Dict[str, Any] = None,
+                       model: Dict[str, Any] = None) -> Optional[List[Dict[str, Any]]]:
         try:
-            # Get plan from LLM
-            plan_response = self.llm.generate(planning_prompt)
-            
-            # Extract JSON from response
-            json_match = re.search(r'\[.*\]', plan_response, re.DOTALL)
-            if json_match:
-                actions_json = json_match.group()
-                actions = json.loads(actions_json)
-                return self._validate_actions(actions)
-            else:
-                # Fallback plan for common queries
-                return self._create_fallback_plan(user_input)
+            # Get plan from LLM, retrying on the larger model if the small
+            # one produces no usable action
+            actions = self.models.run(
+                "planner",
+                lambda llm: self._stream_plan(llm, user_input, usage),
+                lambda actions: any(isinstance(a, dict) and "action" in a for a in actions or []),
+                model
+            )
+            # A plan with no usable action falls back, tagged as such, and is
+            # neither cached nor learned as a macro
+            validated = self._validate_actions(actions) if actions else []
+            return self._link_waits_to_extracts(validated) if validated else None
                 
         except Exception as e:
             print(f"Planning error: {e}")
-            return self._create_fallback_plan(user_input)
+            return None
+    
+    def _stream_plan(self, llm: OllamaClient, user_input: str, usage: Dict[str, Any] = None) -> Optional[list]:
+        # The instructions go in the system prompt, ahead of the request,
+        # so consecutive plans share a prompt prefix. The output is
+        # constrained to the action schema and parsed as it streams.
+        parser = IncrementalJsonParser("[")
+        complete, trailing = False, 0
+        for chunk in llm.generate_stream(
+            PromptTemplates.get_planning_request(user_input),
+            system_prompt=PromptTemplates.PLANNING_INSTRUCTIONS,
+            max_tokens=settings.PLANNER_MAX_TOKENS, temperature=0.1,
+            format=ACTION_LIST_SCHEMA, usage=usage
+        ):
+            if complete:
+                trailing += 1
+                if trailing > _TRAILING_CHUNKS:
+                    break
+                continue
+            complete = parser.feed(chunk)
+        return parser.value()
+    
+    def _with_search_query(self, actions: List[Dict[str, Any]], user_input: str,
+                           cached_query: str) -> Optional[List[Dict[str, Any]]]:
+        """Reuse a cached plan for a similar query by searching for the new query instead.
+
+        Typed values and search parameters of navigate URLs are replaced; if a
+        URL still carries the cached query (in its path, say), the plan is not
+        reused and None is returned.
+        """
+        search_query = self._clean_search_query(user_input)
+        stale_terms = set(tokenize(cached_query)) - set(tokenize(user_input))
+        for action in actions:
+            if action["action"] == "type":
+                action["value"] = search_query
+                action["description"] = f"Type search query: {search_query}"
+            elif action["action"] == "navigate" and action.get("value"):
+                action["value"] = self._with_url_query(action["value"], search_query)
+                if stale_terms & set(tokenize(unquote_plus(action["value"]))):
+                    return None
+        return actions
+    
+    def _with_url_query(self, url: str, search_query: str) -> str:
+        """``url`` with its search parameters set to ``search_query``"""
+        parts = urlsplit(url)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        if not any(key.lower() in _SEARCH_PARAMS for key, _ in params):
+            return url
+        params = [(key, search_query if key.lower() in _SEARCH_PARAMS else value) for key, value in params]
+        return urlunsplit(parts._replace(query=urlencode(params)))
     
     def _validate_actions(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Validate and fix action parameters"""
+        """Validate and fix action parameters, dropping malformed actions"""
         validated_actions = []
+        navigate_url = None
         
         for action in actions:
             # Ensure required fields exist
-            if "action" not in action:
+            if not isinstance(action, dict) or "action" not in action:
                 continue
                 
             # Add missing description
             if "description" not in action:
                 action["description"] = f"Perform {action['action']} action"
             
-            # Ensure extract actions have a selector
+            if action["action"] == "navigate":
+                navigate_url = action.get("value")
+            
+            # Ensure extract actions have a selector, preferring ones that
+            # have produced data on this domain before
             if action["action"] == "extract" and "selector" not in action:
-                action["selector"] = ".g, .rc, .tF2Cxc"
+                learned = self.selector_stats.best_selectors(navigate_url) if self.selector_stats and navigate_url else []
+                action["selector"] = ", ".join(learned) if learned else ".g, .rc, .tF2Cxc"
             
             validated_actions.append(action)
         
-        return validated_actions if validated_actions else self._create_fallback_plan("search")
+        return validated_actions
+    
+    def _link_waits_to_extracts(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Let each wait end as soon as the following extract's selector appears"""
+        for i, action in enumerate(actions):
+            if action["action"] != "wait" or action.get("selector"):
+                continue
+            next_extract = next((a for a in actions[i + 1:] if a["action"] == "extract"), None)
+            if next_extract and next_extract.get("selector"):
+                action["selector"] = next_extract["selector"]
+        return actions
     
     def _create_fallback_plan(self, user_input: str) -> List[Dict[str, Any]]:
         """Create a basic plan when LLM parsing fails"""
@@ -75,7 +200,8 @@ class TaskPlanner:
             {
                 "action": "wait",
                 "value": "5000",
-                "description": "Wait for results to load"
+                "selector": ".g, .rc, .tF2Cxc, .MjjYud",
+                "description": "Wait for results to load (up to 5s)"
             },
             {
                 "action": "extract",
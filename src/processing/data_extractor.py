@@ -1 +1,165 @@
- 
+import random
+import re
+import unicodedata
+import zlib
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from config.settings import settings
+from src.utils.helpers import estimate_tokens
+
+_RESULT_HEADER = re.compile(r"^(Result \d+:)\s*(.*)$")
+_INVISIBLE = re.compile(r"[\u200b-\u200f\u2060\ufeff\u00ad]")
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+")
+
+# Search-result breadcrumbs ("https://www.example.com › docs › page") keep only the domain
+_BREADCRUMB = re.compile(r"^(?:https?://)?(?:www\.)?([\w-]+(?:\.[\w-]+)*\.[a-z]{2,})(?:/\S*)?\s*(?:›|>|»).*$")
+
+# Whole lines that never carry an answer
+BOILERPLATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"^(?:people also (?:ask|search for)|related searches|searches related to .*|top stories|"
+    r"things to know|more results|more to ask|see more|show more|show less|read more|view all|"
+    r"feedback|cached|similar|translate this page|about this result|sponsored|ads?|"
+    r"skip to (?:main )?content|sign in|log in|accept all|reject all|cookie settings|"
+    r"privacy(?: policy)?|terms(?: of (?:service|use))?|all|images|videos|news|shopping|maps|books|"
+    r"tools|settings|next|previous|page \d+ of \d+)$",
+    r"^missing:.*$",
+    r"^(?:all|images|videos|news|shopping|maps|books|web|more)(?:\s+(?:all|images|videos|news|shopping|"
+    r"maps|books|web|more|tools)){2,}$",
+    r"^(?:home|menu)(?:\s*[›>»/|]\s*[\w\s-]+){1,}$",
+    r"^we use cookies.*$",
+    r"^[\W_]+$"
+)]
+
+# Follow-up questions listed under a "People also ask" heading
+_QUESTION = re.compile(r"^[^.!]{5,150}\?$")
+_ASK_HEADING = re.compile(r"^(?:people also ask|more to ask)$", re.IGNORECASE)
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_WORD = re.compile(r"\w+")
+_MERSENNE = (1 << 61) - 1
+
+
+def normalize_whitespace(line: str) -> str:
+    line = unicodedata.normalize("NFKC", _INVISIBLE.sub("", line))
+    return _SPACES.sub(" ", line).strip()
+
+
+class _MinHashIndex:
+    """Near-duplicate lookup over word shingles with MinHash and LSH banding.
+
+    Two lines count as near-duplicates when their estimated Jaccard
+    similarity reaches ``threshold`` and they contain the same numbers, so
+    listings that differ only in price or rating are kept apart.
+    """
+
+    def __init__(self, threshold: float, num_perm: int = 32, bands: int = 8, shingle_size: int = 3):
+        rng = random.Random(1)
+        self.threshold = threshold
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self._perms = [(rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE)) for _ in range(num_perm)]
+        self._buckets: Dict[Tuple, List[Tuple]] = {}
+        self._exact: set = set()
+
+    def _shingles(self, words: List[str]) -> set:
+        if len(words) < self.shingle_size:
+            return {" ".join(words)}
+        return {" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def _signature(self, shingles: set) -> Tuple[int, ...]:
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+        return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in self._perms)
+
+    def seen(self, text: str) -> bool:
+        """True if ``text`` duplicates an earlier line; otherwise remembers it"""
+        words = _WORD.findall(text.lower())
+        if len(words) < self.shingle_size + 2:
+            # Short lines (domains, prices, ratings) legitimately repeat across results
+            return False
+        key = " ".join(words)
+        if key in self._exact:
+            return True
+        self._exact.add(key)
+
+        numbers = tuple(sorted(set(_NUMBER.findall(text))))
+        signature = self._signature(self._shingles(words))
+        bands = [(i, signature[i * self.rows:(i + 1) * self.rows]) for i in range(self.bands)]
+        for band in bands:
+            for other_numbers, other in self._buckets.get(band, ()):
+                if other_numbers != numbers:
+                    continue
+                matches = sum(1 for a, b in zip(signature, other) if a == b)
+                if matches / len(signature) >= self.threshold:
+                    return True
+        for band in bands:
+            self._buckets.setdefault(band, []).append((numbers, signature))
+        return False
+
+
+class TextCleaner:
+    """Streaming cleanup of extracted page text before it reaches a prompt.
+
+    Lines are whitespace-normalized; boilerplate lines (navigation, "People
+    also ask" questions, cookie banners) are dropped; breadcrumbs shrink to
+    their domain; and near-duplicate lines are skipped. ``Result N:`` headers
+    are kept, moved onto the block's first surviving line, so the result
+    structure the summarizer relies on is preserved.
+    """
+
+    def __init__(self, threshold: float = None, patterns: List[re.Pattern] = None):
+        self.threshold = threshold or settings.CLEAN_DEDUPE_THRESHOLD
+        self.patterns = patterns if patterns is not None else BOILERPLATE_PATTERNS
+
+    def is_boilerplate(self, line: str) -> bool:
+        return any(pattern.match(line) for pattern in self.patterns)
+
+    def clean_lines(self, lines: Iterable[str], stats: Dict[str, Any] = None) -> Iterator[str]:
+        """Yield the cleaned lines as the input lines arrive"""
+        stats = stats if stats is not None else {}
+        stats.setdefault("boilerplate_lines", 0)
+        stats.setdefault("duplicate_lines", 0)
+        index = _MinHashIndex(self.threshold)
+        pending_header: Optional[str] = None
+        in_questions = False
+
+        for raw in lines:
+            line = normalize_whitespace(raw)
+            header = _RESULT_HEADER.match(line)
+            if header:
+                pending_header, line = header.group(1), header.group(2)
+                in_questions = False
+            if not line:
+                continue
+
+            if _ASK_HEADING.match(line):
+                in_questions = True
+                stats["boilerplate_lines"] += 1
+                continue
+            if in_questions and _QUESTION.match(line):
+                stats["boilerplate_lines"] += 1
+                continue
+            in_questions = False
+
+            crumb = _BREADCRUMB.match(line)
+            if crumb:
+                line = crumb.group(1)
+            elif self.is_boilerplate(line):
+                stats["boilerplate_lines"] += 1
+                continue
+
+            if index.seen(line):
+                stats["duplicate_lines"] += 1
+                continue
+
+            if pending_header:
+                line = f"{pending_header} {line}"
+                pending_header = None
+            yield line
+
+    def clean(self, text: str) -> Tuple[str, Dict[str, Any]]:
+        """Cleaned text plus the lines dropped and tokens saved"""
+        stats: Dict[str, Any] = {}
+        cleaned = "\n".join(self.clean_lines(text.splitlines(), stats))
+        before, after = estimate_tokens(text), estimate_tokens(cleaned)
+        stats.update(tokens_before=before, tokens_after=after, tokens_saved=before - after)
+        return cleaned, stats
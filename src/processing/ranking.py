@@ -0,0 +1,98 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+from config.settings import settings
+from src.utils.helpers import estimate_tokens
+
+_RESULT_START = re.compile(r"(?m)^(?=Result \d+:)")
+_TOKEN = re.compile(r"\w+")
+
+# Words that say what to do with results rather than what they are about
+STOPWORDS = frozenset("""
+a an and are as at be by for from how i in is it me my of on or show the to what when where which who why
+with search find look up get give list top best save export download file csv json txt pdf please results
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def split_blocks(text: str) -> Tuple[str, List[str]]:
+    """Header text before the first result, and the ``Result N:`` blocks.
+
+    Text without result blocks (visible page text) is split into lines.
+    """
+    parts = _RESULT_START.split(text)
+    if len(parts) > 1:
+        return parts[0], [p.rstrip("\n") for p in parts[1:] if p.strip()]
+    lines = text.splitlines()
+    if lines and lines[0].rstrip().endswith(":"):
+        return lines[0] + "\n", [line for line in lines[1:] if line.strip()]
+    return "", [line for line in lines if line.strip()]
+
+
+class BM25Index:
+    """Okapi BM25 over one extraction's blocks.
+
+    Term frequencies, document frequencies and lengths are computed once
+    when the index is built, so scoring a query only touches its own terms.
+    """
+
+    def __init__(self, blocks: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(block)) for block in blocks]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        doc_freqs = Counter(term for tf in self.term_freqs for term in tf)
+        n = len(blocks)
+        self.idf = {term: math.log((n - df + 0.5) / (df + 0.5) + 1) for term, df in doc_freqs.items()}
+
+    def scores(self, query: str) -> List[float]:
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        results = []
+        for tf, length in zip(self.term_freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            results.append(sum(
+                self.idf[t] * tf[t] * (self.k1 + 1) / (tf[t] + norm) for t in terms if tf[t]
+            ))
+        return results
+
+
+class ResultRanker:
+    """Keeps the results most relevant to the query within a token budget.
+
+    Blocks are ranked by BM25 against the query (ties keep page order) and
+    packed best-first until the budget is full; an extraction that already
+    fits is returned unchanged.
+    """
+
+    def __init__(self, token_budget: int = None):
+        self.token_budget = token_budget or settings.RANK_TOKEN_BUDGET
+
+    def pack(self, text: str, query: str) -> Tuple[str, Dict[str, Any]]:
+        tokens_before = estimate_tokens(text)
+        header, blocks = split_blocks(text)
+        stats = {"blocks": len(blocks), "kept": len(blocks), "tokens_before": tokens_before,
+                 "tokens_after": tokens_before}
+        if tokens_before <= self.token_budget or len(blocks) < 2:
+            return text, stats
+
+        scores = BM25Index(blocks).scores(query)
+        order = sorted(range(len(blocks)), key=lambda i: (-scores[i], i))
+        budget = self.token_budget - estimate_tokens(header)
+        kept = []
+        for i in order:
+            cost = estimate_tokens(blocks[i]) + 1
+            if cost <= budget:
+                kept.append(blocks[i])
+                budget -= cost
+        if not kept:
+            # Even the best block is over budget: keep its start
+            kept.append(blocks[order[0]][:max(budget, 0) * 4])
+
+        packed = header + "\n".join(kept)
+        stats.update(kept=len(kept), tokens_after=estimate_tokens(packed))
+        return packed, stats
@@ -0,0 +1,65 @@
+import copy
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from config.settings import settings
+
+# Words that only choose the output format; "laptops as csv" and "laptops"
+# over the same data share one structured result
+_FORMAT_WORDS = re.compile(
+    r"\b(?:json|csv|pdf|txt|text|file|export|download|save|format|as|to|in|into|a)\b"
+)
+
+
+def result_key(query: str, data: str) -> str:
+    """Key of the (query, extracted data) pair, ignoring output-format words"""
+    query = re.sub(r"[^\w\s.]", " ", query.lower())
+    query = re.sub(r"\s+", " ", _FORMAT_WORDS.sub(" ", query)).strip()
+    return hashlib.sha1(f"{query}\n{data}".encode("utf-8")).hexdigest()
+
+
+class StructuredResultStore:
+    """TTL'd LRU of canonical structured summaries, one per (query, data) pair.
+
+    Chat text and every file format are rendered from the stored result, so
+    a later export of the same results needs no LLM call. Each entry records
+    its source ("llm" or "heuristic"). Results are returned as deep copies so
+    rendering cannot modify the stored copy.
+    """
+
+    def __init__(self, ttl: int = None, max_entries: int = None):
+        self.ttl = ttl or settings.STRUCTURED_RESULT_TTL
+        self.max_entries = max_entries or settings.STRUCTURED_RESULT_MAX_ENTRIES
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """``{"query", "data", "source"}`` stored under ``key``, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or entry["expires"] <= now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return {"query": entry["query"], "data": copy.deepcopy(entry["data"]), "source": entry["source"]}
+
+    def put(self, key: str, query: str, data: Dict[str, Any], source: str = "llm"):
+        with self._lock:
+            self._entries[key] = {"query": query, "data": copy.deepcopy(data), "source": source,
+                                  "expires": time.time() + self.ttl}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,154 @@
+import re
+from typing import Dict, Any, List, Optional
+from src.processing.ranking import BM25Index, split_blocks
+
+_CURRENCY = r"(?:₹|Rs\.?\s?|INR\s?|\$|USD\s?|€|EUR\s?|£|GBP\s?)"
+_AMOUNT = r"(?:\d{1,3}(?:,\d{2,3})+|\d+)(?:\.\d{1,2})?"
+
+PRICE_RANGE = re.compile(rf"{_CURRENCY}\s?{_AMOUNT}\s*(?:-|–|to)\s*{_CURRENCY}?\s?{_AMOUNT}", re.IGNORECASE)
+PRICE = re.compile(rf"{_CURRENCY}\s?{_AMOUNT}", re.IGNORECASE)
+RATING = re.compile(
+    r"(?:rating|rated)\s*:?\s*(\d(?:\.\d)?)|(\d(?:\.\d)?)\s*(?:/\s*5|out of 5|stars?|★)",
+    re.IGNORECASE
+)
+URL = re.compile(r"https?://[^\s›>\"')]+")
+DOMAIN = re.compile(
+    r"\b(?:www\.)?((?:[a-z0-9-]+\.)+(?:com|in|org|net|io|co|uk|de|edu|gov|info|shop|store|tv|me|ai|dev))\b",
+    re.IGNORECASE
+)
+SPEC_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"\b\d+\s?(?:GB|TB)(?:\s+(?:RAM|SSD|HDD|ROM|storage))?\b",
+    r"\b\d+(?:\.\d+)?\s?(?:-?inch|in\b|\")",
+    r"\b(?:Intel\s+)?Core\s+(?:i\d|Ultra\s+\d)[\w-]*|\bRyzen\s+\d(?:\s+\d{4}\w*)?|\bSnapdragon\s+\w+"
+    r"|\bApple\s+M\d\w*|\bDimensity\s+\d+|\bHelio\s+\w+",
+    r"\b\d{4,5}\s?mAh\b",
+    r"\b\d+\s?MP\b",
+    r"\b\d+\s?Hz\b"
+)]
+_HEADER = re.compile(r"^Result \d+:\s*")
+_NAME_TAIL = re.compile(r"[\s,:|–-]*(?:\b(?:at|for|from|only|price)\b[\s:]*)*$", re.IGNORECASE)
+
+
+def _amount(price: str) -> Optional[float]:
+    number = re.search(_AMOUNT, price)
+    return float(number.group(0).replace(",", "")) if number else None
+
+
+def _domain(text: str) -> str:
+    url = URL.search(text)
+    match = DOMAIN.search(url.group(0) if url else text)
+    return match.group(1).lower() if match else ""
+
+
+class StructuredExtractor:
+    """Regex extraction of product and result records from ``Result N:`` text.
+
+    Every block is parsed in one pass with precompiled patterns for prices
+    and price ranges, ratings, URLs/domains, specifications and the title
+    line, producing the same records the export prompts ask the LLM for.
+    Missing fields are left empty for the caller to fill.
+    """
+
+    def _lines(self, block: str) -> List[str]:
+        return [line.strip() for line in _HEADER.sub("", block).splitlines() if line.strip()]
+
+    def _title(self, lines: List[str]) -> str:
+        for line in lines:
+            if URL.fullmatch(line) or DOMAIN.fullmatch(line) or PRICE.fullmatch(line):
+                continue
+            return line[:150]
+        return ""
+
+    def _name(self, title: str) -> str:
+        """The title up to any inline price ("Lenovo IdeaPad at Rs. 41,490")"""
+        price = PRICE.search(title)
+        if price and price.start() > 0:
+            title = _NAME_TAIL.sub("", title[:price.start()])
+        return title
+
+    def _rating(self, text: str) -> str:
+        match = RATING.search(text)
+        if not match:
+            return ""
+        value = match.group(1) or match.group(2)
+        return value if float(value) <= 5 else ""
+
+    def extract_products(self, text: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Records for blocks that mention a price, in block order"""
+        _, blocks = split_blocks(text)
+        products = []
+        for block in blocks:
+            price = PRICE_RANGE.search(block) or PRICE.search(block)
+            if not price:
+                continue
+            lines = self._lines(block)
+            specs = []
+            for pattern in SPEC_PATTERNS:
+                for match in pattern.finditer(block):
+                    spec = match.group(0).strip()
+                    if spec.lower() not in (s.lower() for s in specs):
+                        specs.append(spec)
+            products.append({
+                "name": self._name(self._title(lines)),
+                "price": price.group(0).strip(),
+                "rating": self._rating(block),
+                "store": _domain(block),
+                "specifications": ", ".join(specs[:5]),
+                "_block": block
+            })
+            if len(products) >= limit:
+                break
+        return products
+
+    def extract_results(self, text: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Records for every block, with relevance from BM25 against ``query``"""
+        _, blocks = split_blocks(text)
+        blocks = blocks[:limit]
+        if not blocks:
+            return []
+        scores = BM25Index(blocks).scores(query)
+        top = max(scores) or 1.0
+
+        results = []
+        for position, (block, score) in enumerate(zip(blocks, scores)):
+            lines = self._lines(block)
+            title = self._title(lines)
+            rest = [line for line in lines if line != title and not URL.fullmatch(line)
+                    and not DOMAIN.fullmatch(line)]
+            share = score / top if max(scores) else 1 - position / len(blocks)
+            results.append({
+                "title": title,
+                "description": " ".join(rest)[:300],
+                "source": _domain(block),
+                "relevance": "high" if share >= 0.66 else "medium" if share >= 0.33 else "low",
+                "_block": block
+            })
+        return results
+
+    def product_summary(self, products: List[Dict[str, Any]]) -> str:
+        # Ranges count by their ends: "₹45,000 - ₹49,990" spans 45,000 to 49,990
+        prices = [match.group(0) for p in products for match in PRICE.finditer(p["price"])]
+        sentence = f"Found {len(products)} products"
+        if prices:
+            low = min(prices, key=lambda price: _amount(price))
+            high = max(prices, key=lambda price: _amount(price))
+            sentence += f" priced from {low} to {high}" if low != high else f" at {low}"
+        rated = [p for p in products if p.get("rating")]
+        if rated:
+            best = max(rated, key=lambda p: float(p["rating"]))
+            sentence += f"; highest rated: {best['name']} ({best['rating']}/5)"
+        return sentence + "."
+
+    def result_summary(self, results: List[Dict[str, Any]], query: str) -> str:
+        titles = [r["title"] for r in results if r.get("title")][:3]
+        return f"Top results for \"{query}\": " + "; ".join(titles) + "." if titles else ""
+
+    def key_findings(self, results: List[Dict[str, Any]]) -> List[str]:
+        findings = []
+        for result in results:
+            sentence = re.split(r"(?<=[.!?])\s", result.get("description", ""), maxsplit=1)[0]
+            if len(sentence) > 20:
+                findings.append(sentence)
+            if len(findings) == 3:
+                break
+        return findings
@@ -71,17 +71,59 @@
 import os
 import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from src.llm.ollama_client import OllamaClient
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config.settings import settings
+from src.llm.json_parser import IncrementalJsonParser, JsonFieldStreamer, parse_json
+from src.llm.model_router import ModelRouter
+from src.llm.schemas import PRODUCT_EXPORT_SCHEMA, RESULT_EXPORT_SCHEMA
+from src.processing.ranking import ResultRanker, split_blocks
+from src.processing.result_store import StructuredResultStore, result_key
+from src.processing.structured_extractor import StructuredExtractor
+from src.utils.helpers import elapsed_ms, estimate_tokens
+
+# Export fields the LLM is asked for when the patterns miss them
+_REQUIRED_FIELDS = {"products": ("name", "price", "store"), "results": ("title", "source")}
 
 class Summarizer:
-    def __init__(self, output_dir: str = "outputs"):
-        self.llm = OllamaClient()
+    def __init__(self, output_dir: str = "outputs", models: ModelRouter = None):
+        self.models = models or ModelRouter()
+        self.llm = self.models.client_for("summary")
+        self.ranker = ResultRanker() if settings.RANKING_ENABLED else None
+        self.extractor = StructuredExtractor() if settings.HEURISTIC_EXPORT_ENABLED else None
+        self.results = StructuredResultStore()
         self.output_dir = output_dir
+        self._map_executor = ThreadPoolExecutor(
+            max_workers=settings.SUMMARY_MAP_CONCURRENCY, thread_name_prefix="summary-map"
+        )
         os.makedirs(self.output_dir, exist_ok=True)
     
-    def summarize_results(self, extracted_data: str, original_query: str) -> dict:
-        """Summarize extracted data and return both text and file info"""
+    def summarize_results(self, extracted_data: str, original_query: str,
+                          on_chunk: Optional[Callable[[str], None]] = None) -> dict:
+        """Summarize extracted data and return both text and file info.
+
+        One canonical structured result (products or results, a summary and
+        key findings) is produced per (query, data) pair and stored; the chat
+        text and every file format are rendered from it, so asking for the same
+        results in another format reuses it. ``result_key`` in the returned
+        dict lets ``export_result`` re-render it later. Results produced by the
+        LLM carry ``model``, the ModelRouter record of the model used and its
+        latency.
+
+        With ``on_chunk`` the summary field is streamed as the LLM writes it;
+        the rest of the rendered text follows once the structure is complete,
+        so the chunks add up to the returned text.
+
+        Results are first ranked against the query and packed into
+        Settings.RANK_TOKEN_BUDGET. File exports are built from regex-extracted
+        records ("heuristic" mode) when any are found; chat answers always come
+        from the LLM. Data still over SUMMARY_SINGLE_PASS_TOKENS is
+        map-reduced: every chunk is condensed concurrently, notes that still
+        don't fit are mapped again, then the structured prompt runs over them. Every result carries ``phases``: the mode,
+        the chunk count, the ranking stats and the time spent in each phase.
+        """
         if not extracted_data or "No results" in extracted_data:
             fallback_text = self._create_fallback_response(extracted_data, original_query)
             return {
@@ -93,13 +135,166 @@ class Summarizer:
         # Check if user requested file format
         output_format = self._detect_output_format(original_query)
         
-        # Use specialized prompts based on query type and format
-        if any(word in original_query.lower() for word in ['laptop', 'phone', 'buy', 'price', 'product']):
-            result = self._summarize_shopping_results(extracted_data, original_query, output_format)
+        streamed = []
+        def stream(chunk: str):
+            streamed.append(chunk)
+            on_chunk(chunk)
+        
+        phases = {"timings_ms": {}}
+        key = result_key(original_query, extracted_data)
+        stored = self.results.get(key)
+        model = {}
+        # A chat answer needs a summary written by the LLM, not the regex records of an export
+        if stored and (output_format != 'text' or stored["source"] == "llm"):
+            phases.update(mode="stored", chunks=0)
+            data = stored["data"]
         else:
-            result = self._summarize_general_results(extracted_data, original_query, output_format)
+            data, source = self._generate_structured(
+                extracted_data, original_query, output_format, phases, model,
+                stream if on_chunk and output_format == 'text' else None
+            )
+            if not data:
+                result = self._create_structured_fallback(extracted_data, original_query, output_format)
+                result["phases"] = phases
+                return result
+            self.results.put(key, original_query, data, source)
+        
+        try:
+            result = self._render_result(data, original_query, output_format)
+        except Exception as e:
+            print(f"File creation error: {e}")
+            result = self._render_result(data, original_query, 'text')
+        if on_chunk:
+            sent = "".join(streamed)
+            if result["text"].startswith(sent):
+                rest = result["text"][len(sent):]
+                if rest:
+                    on_chunk(rest)
+        result.update(result_key=key, phases=phases)
+        if model:
+            result["model"] = model
+        return result
+    
+    def export_result(self, key: str, format_type: str) -> Optional[dict]:
+        """Render a stored structured result as ``format_type`` without another LLM call"""
+        stored = self.results.get(key)
+        if not stored:
+            return None
+        result = self._render_result(stored["data"], stored["query"], format_type)
+        result["result_key"] = key
+        return result
+    
+    def _generate_structured(self, extracted_data: str, original_query: str, output_format: str,
+                             phases: Dict[str, Any], model: Dict[str, Any],
+                             on_chunk: Optional[Callable[[str], None]] = None) -> Tuple[Optional[dict], str]:
+        """The canonical structured result and its source ("heuristic" or "llm").
+
+        Regex-extracted records are used for file exports only; otherwise one
+        LLM generation produces the structure, streaming its summary through
+        ``on_chunk``.
+        """
+        shopping = any(word in original_query.lower() for word in ['laptop', 'phone', 'buy', 'price', 'product'])
+        ranked_data = self._rank_results(extracted_data, original_query, phases)
+        
+        if output_format != 'text' and self.extractor:
+            stage_start = time.perf_counter()
+            data = self._extract_heuristic_data(ranked_data, original_query, shopping, model)
+            phases["timings_ms"]["extract"] = elapsed_ms(stage_start)
+            if data:
+                phases.update(mode="heuristic", chunks=0)
+                return data, "heuristic"
+        
+        # Condense large extractions before the final prompt
+        prompt_data = self._prepare_prompt_data(ranked_data, original_query, phases)
+        
+        # Use specialized prompts based on query type
+        stage_start = time.perf_counter()
+        if shopping:
+            data = self._generate_shopping_data(prompt_data, original_query, model, on_chunk)
+        else:
+            data = self._generate_general_data(prompt_data, original_query, model, on_chunk)
+        phases["timings_ms"]["reduce" if phases["mode"] == "map_reduce" else "generate"] = elapsed_ms(stage_start)
+        return data, "llm"
+    
+    def _rank_results(self, extracted_data: str, original_query: str, phases: Dict[str, Any]) -> str:
+        """The results most relevant to the query, within the ranking token budget"""
+        if not self.ranker:
+            return extracted_data
+        started = time.perf_counter()
+        extracted_data, phases["ranking"] = self.ranker.pack(extracted_data, original_query)
+        phases["timings_ms"]["rank"] = elapsed_ms(started)
+        return extracted_data
+    
+    def _prepare_prompt_data(self, extracted_data: str, original_query: str, phases: Dict[str, Any]) -> str:
+        """The data for the final prompt, map-reduced if it doesn't fit"""
+        if estimate_tokens(extracted_data) <= settings.SUMMARY_SINGLE_PASS_TOKENS:
+            phases.update(mode="single_pass", chunks=1)
+            return extracted_data
+        
+        phases.update(mode="map_reduce", chunks=0, rounds=0)
+        data = extracted_data
+        started = time.perf_counter()
+        # Every chunk is mapped; notes still too long for one prompt get another
+        # round, as long as each round shrinks them
+        while estimate_tokens(data) > settings.SUMMARY_SINGLE_PASS_TOKENS and phases["rounds"] < 4:
+            chunks = self._split_chunks(data, settings.SUMMARY_CHUNK_TOKENS)
+            if phases["rounds"] and len(chunks) == 1:
+                break
+            notes = "\n\n".join(self._map_chunks(chunks, original_query))
+            phases["chunks"] += len(chunks)
+            phases["rounds"] += 1
+            if estimate_tokens(notes) >= estimate_tokens(data):
+                break
+            data = notes
+        tokens = estimate_tokens(data)
+        if tokens > settings.SUMMARY_SINGLE_PASS_TOKENS:
+            print(f"Map-reduce notes still {tokens} tokens after {phases['rounds']} rounds")
+            phases["over_budget_tokens"] = tokens
+        phases["timings_ms"]["map"] = elapsed_ms(started)
+        return data
+    
+    def _split_chunks(self, text: str, max_tokens: int) -> List[str]:
+        """Pack whole results (or lines) into chunks of at most ``max_tokens``"""
+        header, blocks = split_blocks(text)
+        blocks = [block + "\n" for block in ([header.rstrip("\n")] if header.strip() else []) + blocks]
+        max_chars = max_tokens * 4
+        
+        chunks, current = [], ""
+        for block in blocks:
+            # A single oversized block is cut at the character budget
+            pieces = [block[i:i + max_chars] for i in range(0, len(block), max_chars)]
+            for piece in pieces:
+                if current and estimate_tokens(current + piece) > max_tokens:
+                    chunks.append(current)
+                    current = ""
+                current += piece
+        if current.strip():
+            chunks.append(current)
+        return chunks
+    
+    def _map_chunks(self, chunks: List[str], original_query: str) -> List[str]:
+        """Condense each chunk to notes, at most SUMMARY_MAP_CONCURRENCY at a time"""
+        return list(self._map_executor.map(lambda chunk: self._map_chunk(chunk, original_query), chunks))
+    
+    def _map_chunk(self, chunk: str, original_query: str) -> str:
+        prompt = f"""Extract the facts relevant to: "{original_query}"
+
+Data:
+{chunk}
+
+List every relevant item with its key details (names, prices, ratings, specifications, sources, dates).
+Copy facts exactly, one item per line, no commentary:"""
         
-        return result if result else self._create_structured_fallback(extracted_data, original_query, output_format)
+        try:
+            return self.models.run(
+                "map",
+                lambda llm: llm.generate(prompt, max_tokens=settings.SUMMARY_MAP_MAX_TOKENS, temperature=0.1),
+                lambda notes: bool(notes.strip())
+            )
+        except Exception as e:
+            print(f"Chunk summarization error: {e}")
+            # Keep the start of the chunk rather than losing it entirely
+            return chunk[:settings.SUMMARY_MAP_MAX_TOKENS * 4]
     
     def _detect_output_format(self, query: str) -> str:
         """Detect if user wants output in specific file format"""
@@ -119,70 +314,50 @@ class Summarizer:
         
         return 'text'  # plain text output
     
-    def _summarize_shopping_results(self, extracted_data: str, original_query: str, output_format: str) -> dict:
-        """Specialized summarization for shopping results"""
-        if output_format == 'text':
-            prompt = f"""Analyze these product search results for: "{original_query}"
+    def _generate_structured_data(self, prompt: str, list_key: str, model: Dict[str, Any] = None,
+                                  stage: str = "summary", on_chunk: Optional[Callable[[str], None]] = None,
+                                  **options) -> Optional[dict]:
+        """Structured data, retried on the larger model unless ``list_key`` holds items.
 
-Extracted data:
-{extracted_data[:2000]}
-
-Please provide a structured summary with:
-1. Top 5 products found
-2. Prices for each product
-3. Key specifications if available
-4. Where to buy (store/source)
-5. Ratings if available
-
-Format the response clearly with product rankings:"""
-            
-            try:
-                summary_text = self.llm.generate(prompt, max_tokens=800)
-                return {
-                    "text": summary_text,
-                    "file_path": None,
-                    "format": "text"
-                }
-            except:
-                return None
-        else:
-            # File format requested
-            return self._create_shopping_file(extracted_data, original_query, output_format)
-    
-    def _summarize_general_results(self, extracted_data: str, original_query: str, output_format: str) -> dict:
-        """General summarization for non-shopping queries"""
-        if output_format == 'text':
-            prompt = f"""Summarize these search results for: "{original_query}"
-
-Search results:
-{extracted_data[:2000]}
-
-Provide a concise summary focusing on the most relevant information:"""
-            
-            try:
-                summary_text = self.llm.generate(prompt, max_tokens=1024)
-                return {
-                    "text": summary_text,
-                    "file_path": None,
-                    "format": "text"
-                }
-            except:
-                return None
-        else:
-            # File format requested
-            return self._create_general_file(extracted_data, original_query, output_format)
+        With ``on_chunk`` the output is streamed and its "summary" field passed
+        to the callback as it is decoded. A retry is not streamed when the
+        first attempt already was; its summary still reaches the rendered text.
+        """
+        streamed = []
+        
+        def generate(llm) -> Optional[dict]:
+            if on_chunk is None:
+                return parse_json(llm.generate(prompt, **options), "{")
+            emit = None if streamed else on_chunk
+            parser = IncrementalJsonParser("{")
+            summary = JsonFieldStreamer("summary")
+            for chunk in llm.generate_stream(prompt, **options):
+                text = summary.feed(chunk)
+                if text and emit:
+                    streamed.append(text)
+                    emit(text)
+                if parser.feed(chunk):
+                    break
+            return parser.value()
+        
+        return self.models.run(
+            stage,
+            generate,
+            lambda data: isinstance(data, dict) and bool(data.get(list_key)),
+            model
+        )
     
-    def _create_shopping_file(self, extracted_data: str, original_query: str, format_type: str) -> dict:
-        """Create structured file for shopping results"""
-        try:
-            # Extract product information using LLM
-            prompt = f"""Extract product information from this data and return ONLY valid JSON:
+    def _generate_shopping_data(self, extracted_data: str, original_query: str, model: Dict[str, Any],
+                                on_chunk: Optional[Callable[[str], None]] = None) -> Optional[dict]:
+        """Structured summary of shopping results"""
+        prompt = f"""Extract product information from this data and return ONLY valid JSON:
 
 Query: "{original_query}"
-Data: {extracted_data[:2000]}
+Data: {extracted_data}
 
 Return JSON format:
 {{
+    "summary": "brief overall summary",
     "query": "original query",
     "products": [
         {{
@@ -192,45 +367,31 @@ Return JSON format:
             "store": "store/source",
             "specifications": "key specs"
         }}
-    ],
-    "summary": "brief overall summary"
+    ]
 }}
 
 Extract maximum 5 products:"""
-            
-            json_response = self.llm.generate(prompt, max_tokens=1000)
-            
-            # Clean and parse JSON
-            json_match = re.search(r'\{.*\}', json_response, re.DOTALL)
-            if json_match:
-                products_data = json.loads(json_match.group())
-                file_path = self._save_to_file(products_data, original_query, format_type)
-                
-                summary_text = f"✅ I've found {len(products_data.get('products', []))} products and saved the results to a {format_type.upper()} file.\n\n"
-                summary_text += products_data.get('summary', 'Results have been exported successfully.')
-                
-                return {
-                    "text": summary_text,
-                    "file_path": file_path,
-                    "format": format_type,
-                    "data": products_data
-                }
         
+        try:
+            return self._generate_structured_data(
+                prompt, "products", model, on_chunk=on_chunk,
+                max_tokens=1000, temperature=0.1, format=PRODUCT_EXPORT_SCHEMA
+            )
         except Exception as e:
-            print(f"File creation error: {e}")
-        
-        return None
+            print(f"Summarization error: {e}")
+            return None
     
-    def _create_general_file(self, extracted_data: str, original_query: str, format_type: str) -> dict:
-        """Create structured file for general results"""
-        try:
-            prompt = f"""Extract key information from this search data and return ONLY valid JSON:
+    def _generate_general_data(self, extracted_data: str, original_query: str, model: Dict[str, Any],
+                               on_chunk: Optional[Callable[[str], None]] = None) -> Optional[dict]:
+        """Structured summary of general results"""
+        prompt = f"""Extract key information from this search data and return ONLY valid JSON:
 
 Query: "{original_query}"
-Data: {extracted_data[:2000]}
+Data: {extracted_data}
 
 Return JSON format:
 {{
+    "summary": "comprehensive summary",
     "query": "original query",
     "results": [
         {{
@@ -240,33 +401,103 @@ Return JSON format:
             "relevance": "relevance score"
         }}
     ],
-    "summary": "comprehensive summary",
     "key_findings": ["key point 1", "key point 2"]
 }}
 
 Extract the most important results:"""
-            
-            json_response = self.llm.generate(prompt, max_tokens=1000)
-            
-            json_match = re.search(r'\{.*\}', json_response, re.DOTALL)
-            if json_match:
-                general_data = json.loads(json_match.group())
-                file_path = self._save_to_file(general_data, original_query, format_type)
-                
-                summary_text = f"✅ Search completed! Results saved to {format_type.upper()} file.\n\n"
-                summary_text += general_data.get('summary', 'Export successful.')
-                
-                return {
-                    "text": summary_text,
-                    "file_path": file_path,
-                    "format": format_type,
-                    "data": general_data
-                }
         
+        try:
+            return self._generate_structured_data(
+                prompt, "results", model, on_chunk=on_chunk,
+                max_tokens=1000, temperature=0.1, format=RESULT_EXPORT_SCHEMA
+            )
         except Exception as e:
-            print(f"File creation error: {e}")
+            print(f"Summarization error: {e}")
+            return None
+    
+    def _extract_heuristic_data(self, extracted_data: str, original_query: str, shopping: bool,
+                                model: Dict[str, Any]) -> Optional[dict]:
+        """Structured data from regex-extracted records, or None if there are none"""
+        if shopping:
+            list_key, records = "products", self.extractor.extract_products(extracted_data)
+        else:
+            list_key, records = "results", self.extractor.extract_results(extracted_data, original_query)
+        if not records:
+            return None
+        
+        self._fill_missing_fields(records, list_key, original_query, model)
+        for record in records:
+            del record["_block"]
         
-        return None
+        if shopping:
+            return {"query": original_query, "products": records,
+                    "summary": self.extractor.product_summary(records)}
+        return {"query": original_query, "results": records,
+                "summary": self.extractor.result_summary(records, original_query),
+                "key_findings": self.extractor.key_findings(records)}
+    
+    def _render_result(self, data: dict, query: str, format_type: str) -> dict:
+        """Chat text, plus the file for file formats, rendered from structured data"""
+        if format_type == 'text':
+            return {
+                "text": self._format_chat_text(data, query),
+                "file_path": None,
+                "format": "text",
+                "data": data
+            }
+        
+        file_path = self._save_to_file(data, query, format_type)
+        if 'products' in data:
+            summary_text = f"✅ I've found {len(data['products'])} products and saved the results to a {format_type.upper()} file.\n\n"
+            summary_text += data.get('summary') or 'Results have been exported successfully.'
+        else:
+            summary_text = f"✅ Search completed! Results saved to {format_type.upper()} file.\n\n"
+            summary_text += data.get('summary') or 'Export successful.'
+        
+        return {
+            "text": summary_text,
+            "file_path": file_path,
+            "format": format_type,
+            "data": data
+        }
+    
+    def _fill_missing_fields(self, records: List[Dict[str, Any]], list_key: str, original_query: str,
+                             model: Dict[str, Any]):
+        """Ask the LLM, in one call, for required fields the patterns could not find"""
+        fields = _REQUIRED_FIELDS[list_key]
+        gaps = [record for record in records if any(not record[f] for f in fields)]
+        if not gaps or not settings.HEURISTIC_EXPORT_LLM_FILL:
+            return
+        
+        partial = [{k: v for k, v in record.items() if k != "_block"} for record in gaps]
+        data = "\n".join(record["_block"] for record in gaps)
+        prompt = f"""Fill in the empty fields of these records using only the data below and return ONLY valid JSON:
+
+Query: "{original_query}"
+Data: {data}
+
+Records:
+{json.dumps({list_key: partial}, ensure_ascii=False)}
+
+Return the same {len(gaps)} records in the same order, in the same JSON format, with a "query" and a one-sentence "summary".
+Leave a field empty if the data does not contain it:"""
+        
+        schema = PRODUCT_EXPORT_SCHEMA if list_key == "products" else RESULT_EXPORT_SCHEMA
+        try:
+            filled = self._generate_structured_data(
+                prompt, list_key, model, "export", max_tokens=400, temperature=0.1, format=schema
+            )
+        except Exception as e:
+            print(f"Field completion error: {e}")
+            return
+        
+        for record, update in zip(gaps, (filled or {}).get(list_key, [])):
+            if not isinstance(update, dict):
+                continue
+            for field in fields:
+                value = update.get(field)
+                if not record[field] and isinstance(value, str) and value.strip():
+                    record[field] = value.strip()
     
     def _save_to_file(self, data: dict, query: str, format_type: str) -> str:
         """Save data to appropriate file format"""
@@ -295,6 +526,40 @@ Extract the most important results:"""
         
         return file_path
     
+    def _format_chat_text(self, data: dict, query: str) -> str:
+        """Format data as a chat reply.
+
+        The summary comes first and unchanged, so the streamed summary is a
+        prefix of the reply.
+        """
+        output = f"{data['summary']}\n\n" if data.get('summary') else ""
+        if 'products' in data:
+            output += f"**Top products for \"{query}\"**\n\n"
+            for i, product in enumerate(data['products'], 1):
+                output += f"{i}. **{product.get('name') or 'Unnamed product'}**"
+                output += f" — {product['price']}\n" if product.get('price') else "\n"
+                details = []
+                if product.get('rating'):
+                    details.append(f"Rating: {product['rating']}")
+                if product.get('store'):
+                    details.append(f"Store: {product['store']}")
+                if product.get('specifications'):
+                    details.append(f"Specs: {product['specifications']}")
+                if details:
+                    output += "   " + " · ".join(details) + "\n"
+        
+        elif 'results' in data:
+            for i, result in enumerate(data['results'], 1):
+                output += f"{i}. **{result.get('title') or 'Untitled'}**"
+                output += f" ({result['source']})\n" if result.get('source') else "\n"
+                if result.get('description'):
+                    output += f"   {result['description']}\n"
+        
+        if data.get('key_findings'):
+            output += "\n**Key findings:**\n" + "".join(f"- {finding}\n" for finding in data['key_findings'])
+        
+        return output.rstrip()
+    
     def _format_text_output(self, data: dict, query: str) -> str:
         """Format data as readable text"""
         output = f"Search Results for: {query}\n"
@@ -1 +1,26 @@
- 
+import time
+from typing import Callable, Dict, Optional
+
+
+def elapsed_ms(started: float) -> float:
+    """Milliseconds since a time.perf_counter() reading"""
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token)"""
+    return (len(text or "") + 3) // 4
+
+
+def time_first_chunk(on_chunk: Optional[Callable[[str], None]], started: float,
+                     timings: Dict[str, float]) -> Optional[Callable[[str], None]]:
+    """Wrap a chunk callback so the first chunk records ``timings["first_token"]``"""
+    if on_chunk is None:
+        return None
+
+    def forward(chunk: str):
+        if "first_token" not in timings:
+            timings["first_token"] = elapsed_ms(started)
+        on_chunk(chunk)
+
+    return forward
@@ -161,6 +161,8 @@ class ChatApp {
         this.socket = io();
         this.currentConversationId = null;
         this.downloadedFiles = [];
+        this.streamingMessage = null;
+        this.streamingText = '';
         this.setupEventListeners();
         this.setupSocketListeners();
         this.loadDownloadHistory();
@@ -222,7 +224,12 @@ class ChatApp {
             }
         });
 
+        this.socket.on('message_chunk', (data) => {
+            this.appendChunk(data.chunk);
+        });
+
         this.socket.on('message_response', (data) => {
+            this.clearStreamingMessage();
             this.addMessage('assistant', data.response, data);
             this.updateUIAfterResponse(data);
         });
@@ -246,6 +253,7 @@ class ChatApp {
         });
 
         this.socket.on('error', (data) => {
+            this.clearStreamingMessage();
             this.addMessage('assistant', `Error: ${data.message}`);
             this.hideTypingIndicator();
         });
@@ -307,6 +315,30 @@ class ChatApp {
         chatMessages.scrollTop = chatMessages.scrollHeight;
     }
 
+    appendChunk(chunk) {
+        // Render the reply live; message_response replaces it with the final message
+        if (!this.streamingMessage) {
+            this.hideTypingIndicator();
+            this.addMessage('assistant', '');
+            this.streamingMessage = document.querySelector('#chatMessages .assistant-message:last-child');
+            this.streamingText = '';
+        }
+
+        this.streamingText += chunk;
+        this.streamingMessage.querySelector('.message-content').innerHTML = marked.parse(this.streamingText);
+
+        const chatMessages = document.getElementById('chatMessages');
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+    }
+
+    clearStreamingMessage() {
+        if (this.streamingMessage) {
+            this.streamingMessage.remove();
+            this.streamingMessage = null;
+            this.streamingText = '';
+        }
+    }
+
     createFileDownloadSection(responseData) {
         const fileDiv = document.createElement('div');
         fileDiv.className = 'file-download';
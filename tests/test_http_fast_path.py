@@ -0,0 +1,56 @@
+import pytest
+from benchmarks.fixture_server import FixtureServer
+from src.browser.http_fast_path import HttpFastPath
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FixtureServer(llm_latency_ms=0) as server:
+        yield server
+
+
+@pytest.fixture
+def fast_path():
+    return HttpFastPath()
+
+
+def _plan(url, selector=".g"):
+    return [
+        {"action": "navigate", "value": url, "description": "Open page"},
+        {"action": "wait", "value": "3000", "selector": selector, "description": "Wait"},
+        {"action": "extract", "selector": selector, "description": "Extract results"}
+    ]
+
+
+def test_plan_request_shapes(fast_path):
+    assert fast_path.plan_request(_plan("example.com")) == {"url": "https://example.com", "selector": ".g"}
+    search = [
+        {"action": "navigate", "value": "https://en.wikipedia.org"},
+        {"action": "type", "selector": "#searchInput", "value": "alan turing"},
+        {"action": "click", "selector": "button"},
+        {"action": "extract", "selector": ".mw-search-result"}
+    ]
+    assert fast_path.plan_request(search)["url"] == "https://en.wikipedia.org/w/index.php?search=alan+turing&fulltext=1"
+    # A type/click plan on a client-rendered search page needs the browser
+    search[0]["value"] = "https://www.google.com"
+    assert not fast_path.can_handle(search)
+
+
+def test_static_results_are_extracted(server, fast_path):
+    log = []
+    extracted = fast_path.run(_plan(server.url + "/search?q=gaming+laptops"), log)
+    assert extracted.startswith("Result 1: Gaming Laptops result 1")
+    assert extracted.count("Result ") == 10
+    assert [entry["action"]["action"] for entry in log] == ["navigate", "extract"]
+
+
+def test_fallback_selector_is_used_when_planned_one_misses(server, fast_path):
+    extracted = fast_path.run(_plan(server.url + "/search?q=laptops", selector=".no-such-result"), [])
+    assert extracted.startswith("Found with selector '.g':")
+
+
+@pytest.mark.parametrize("path", ["/app", "/consent", "/missing"])
+def test_pages_without_results_fall_back_to_browser(server, fast_path, path):
+    log = []
+    assert fast_path.run(_plan(server.url + path), log) is None
+    assert log == []
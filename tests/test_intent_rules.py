@@ -0,0 +1,63 @@
+import pytest
+from src.orchestrator.intent_rules import IntentRules
+
+
+@pytest.fixture
+def rules():
+    return IntentRules()
+
+
+@pytest.mark.parametrize("request_text, url", [
+    ("search laptops on amazon", "https://www.amazon.in/s?k=laptops"),
+    ("find python tutorials on youtube", "https://www.youtube.com/results?search_query=python+tutorials"),
+    ("search amazon for gaming laptops", "https://www.amazon.in/s?k=gaming+laptops"),
+    ("amazon search for gaming laptops", "https://www.amazon.in/s?k=gaming+laptops"),
+    ("ebay search vintage cameras", "https://www.ebay.com/sch/i.html?_nkw=vintage+cameras"),
+    ("On Flipkart, find redmi phones", "https://www.flipkart.com/search?q=redmi+phones"),
+    ("please search laptops on amazon and save as csv", "https://www.amazon.in/s?k=laptops"),
+])
+def test_explicit_site_search(rules, request_text, url):
+    match = rules.match(request_text)
+    assert match["rule"] == "site_search"
+    assert match["actions"][0]["value"] == url
+    assert [a["action"] for a in match["actions"]] == ["navigate", "wait", "extract"]
+
+
+@pytest.mark.parametrize("request_text", [
+    "amazon stock price today",
+    "google pixel 8 price",
+    "ebay earnings report",
+    "youtube premium price in india",
+    "get me the weather in delhi",
+    "search laptops on amazon and then compare prices",
+    "login to github",
+])
+def test_site_mentions_and_complex_requests_fall_through(rules, request_text):
+    assert rules.match(request_text) is None
+
+
+def test_web_search_types_the_query_on_google(rules):
+    match = rules.match("search for best laptops 2024")
+    assert match["rule"] == "web_search"
+    assert match["actions"][0]["value"] == "https://www.google.com"
+    assert match["actions"][1]["action"] == "type"
+    assert match["actions"][1]["value"] == "best laptops 2024"
+
+
+def test_encyclopedia_sends_timely_questions_to_web_search(rules):
+    assert rules.match("who is alan turing")["actions"][0]["value"] == (
+        "https://en.wikipedia.org/w/index.php?search=alan+turing&fulltext=1"
+    )
+    assert rules.match("what is the weather today")["actions"][0]["value"] == "https://www.google.com"
+
+
+def test_open_site_keeps_url_case(rules):
+    match = rules.match("Go to github.com/Hitish07")
+    assert match["rule"] == "open_site"
+    assert match["actions"][0]["value"] == "github.com/Hitish07"
+
+
+def test_stats_count_hits_by_rule(rules):
+    rules.match("search laptops on amazon")
+    rules.match("google pixel 8 price")
+    assert rules.get_stats() == {"hits": 1, "misses": 1, "by_rule": {"site_search": 1}, "hit_rate": 0.5}
@@ -0,0 +1,59 @@
+import json
+from src.llm.json_parser import IncrementalJsonParser, JsonFieldStreamer, parse_json
+
+PLAN = [
+    {"action": "navigate", "value": "https://www.google.com", "description": "Open Google"},
+    {"action": "type", "selector": "textarea[name='q']", "value": "laptops", "description": "Type the query"},
+    {"action": "extract", "selector": ".g", "description": "Extract results"}
+]
+
+
+def _feed(parser, text, size=7):
+    for i in range(0, len(text), size):
+        if parser.feed(text[i:i + size]):
+            return True
+    return False
+
+
+def test_chunked_feed_matches_json_loads():
+    text = json.dumps(PLAN)
+    parser = IncrementalJsonParser("[")
+    assert _feed(parser, "Here is the plan:\n" + text + "\nDone.")
+    assert parser.value() == PLAN
+
+
+def test_complete_stops_consuming_input():
+    parser = IncrementalJsonParser()
+    assert parser.feed('{"a": 1} {"b": 2}')
+    assert parser.value() == {"a": 1}
+
+
+def test_trailing_commas_are_dropped():
+    assert parse_json('[{"a": 1,}, {"b": [1, 2,],},]') == [{"a": 1}, {"b": [1, 2]}]
+
+
+def test_truncated_array_keeps_whole_elements_only():
+    text = json.dumps(PLAN)
+    cut = text.index('"selector": ".g"')
+    parser = IncrementalJsonParser("[")
+    assert not _feed(parser, text[:cut])
+    assert parser.value() == PLAN[:2]
+
+
+def test_truncated_object_keeps_complete_array_elements():
+    text = json.dumps({"summary": "Three laptops", "products": [{"name": "A"}, {"name": "B"}, {"name": "C"}]})
+    cut = text.index('"C"')
+    assert parse_json(text[:cut]) == {"summary": "Three laptops", "products": [{"name": "A"}, {"name": "B"}]}
+
+
+def test_nothing_complete_gives_empty_root():
+    assert parse_json('[{"action": "navi', "[") == []
+    assert parse_json("no json here") is None
+
+
+def test_field_streamer_decodes_the_field_across_chunks():
+    text = json.dumps({"summary": "Found \"3\" laptops\nunder ₹50,000", "products": []})
+    streamer = JsonFieldStreamer("summary")
+    streamed = "".join(streamer.feed(text[i:i + 3]) for i in range(0, len(text), 3))
+    assert streamed == "Found \"3\" laptops\nunder ₹50,000"
+    assert streamer.done
@@ -0,0 +1,84 @@
+import pytest
+from src.orchestrator.macros import MacroLibrary, QUERY_SLOT, classify_intent, request_shape
+
+AMAZON_PLAN = [
+    {"action": "navigate", "value": "https://www.amazon.in/s?k=gaming+laptops&ref=nb", "description": "Open Amazon"},
+    {"action": "wait", "value": "3000", "description": "Wait"},
+    {"action": "extract", "selector": ".s-result-item", "description": "Extract results"}
+]
+GOOGLE_PLAN = [
+    {"action": "navigate", "value": "https://www.google.com", "description": "Open Google"},
+    {"action": "type", "selector": "textarea[name='q']", "value": "gaming laptops",
+     "description": "Type search query: gaming laptops"},
+    {"action": "click", "selector": "input[name='btnK']", "description": "Search"},
+    {"action": "extract", "selector": ".g", "description": "Extract results"}
+]
+EXTRACTED = "Result 1: ASUS TUF Gaming F15 laptop ₹55,990"
+
+
+@pytest.fixture
+def library(tmp_path):
+    return MacroLibrary(path=str(tmp_path / "macros.json"), min_score=0.4)
+
+
+def test_parameterize_slots_url_parameters_and_typed_text(library):
+    template = library.parameterize("search gaming laptops on amazon", AMAZON_PLAN)
+    assert template[0]["value"] == f"https://www.amazon.in/s?k={QUERY_SLOT}&ref=nb"
+    assert template[1:] == AMAZON_PLAN[1:]
+
+    template = library.parameterize("find gaming laptops", GOOGLE_PLAN)
+    assert template[1]["value"] == QUERY_SLOT
+    assert template[0]["value"] == "https://www.google.com"
+
+
+def test_parameterize_without_query_text(library):
+    assert library.parameterize("open amazon", [{"action": "navigate", "value": "https://www.amazon.in"}]) is None
+
+
+def test_request_shape_and_intent():
+    assert request_shape("Please search gaming laptops on Amazon and save as csv") == "search on"
+    assert request_shape("laptops under 50000") == "* under"
+    assert classify_intent("cheap phones") == "shopping"
+    assert classify_intent("python tutorial videos") == "video"
+
+
+def test_match_fills_query_for_same_shape(library):
+    assert library.learn("search gaming laptops on amazon", AMAZON_PLAN, [], EXTRACTED)
+    macro = library.match("search budget phones on amazon", "budget phones")
+    assert macro["domain"] == "amazon.in"
+    assert macro["actions"][0]["value"] == "https://www.amazon.in/s?k=budget+phones&ref=nb"
+
+
+@pytest.mark.parametrize("request_text", [
+    "buy budget phones on amazon",
+    "search budget phones on flipkart",
+    "search budget phones on amazon and then compare prices",
+])
+def test_match_needs_same_shape_site_and_single_step(library, request_text):
+    library.learn("search gaming laptops on amazon", AMAZON_PLAN, [], EXTRACTED)
+    assert library.match(request_text, "budget phones") is None
+
+
+def test_failed_runs_are_not_learned(library):
+    assert library.learn("search gaming laptops on amazon", AMAZON_PLAN, [], "No data found") is None
+    log = [{"action": AMAZON_PLAN[0], "result": "Error executing navigate"}]
+    assert library.learn("search gaming laptops on amazon", AMAZON_PLAN, log, EXTRACTED) is None
+
+
+def test_failed_replays_demote_and_success_promotes(library):
+    macro_id = library.learn("search gaming laptops on amazon", AMAZON_PLAN, [], EXTRACTED)
+    for _ in range(3):
+        library.record_outcome(macro_id, "No data found")
+    assert library.match("search budget phones on amazon", "budget phones") is None
+    assert library.get_stats()["demotions"] == 1
+
+    for _ in range(3):
+        library.learn("search gaming laptops on amazon", AMAZON_PLAN, [], EXTRACTED)
+    assert library.match("search budget phones on amazon", "budget phones")["macro_id"] == macro_id
+
+
+def test_save_and_reload(library, tmp_path):
+    macro_id = library.learn("search gaming laptops on amazon", AMAZON_PLAN, [], EXTRACTED)
+    library.save()
+    reloaded = MacroLibrary(path=str(tmp_path / "macros.json"))
+    assert reloaded.match("search budget phones on amazon", "budget phones")["macro_id"] == macro_id
@@ -0,0 +1,80 @@
+import re
+import pytest
+from src.orchestrator.plan_cache import PlanCache, normalize_query, site_hints
+
+VOCABULARY = ("search", "laptops", "gaming", "cheap", "phones", "amazon", "flipkart", "weather")
+
+
+class WordEmbedder:
+    """Bag-of-words vectors over a fixed vocabulary"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, text, model=None):
+        self.calls += 1
+        words = re.findall(r"\w+", text.lower())
+        return [float(words.count(word)) for word in VOCABULARY]
+
+
+class FailingEmbedder:
+    def embed(self, text, model=None):
+        raise ConnectionError("embeddings endpoint down")
+
+
+PLAN = [{"action": "navigate", "value": "https://www.amazon.in/s?k=gaming+laptops"},
+        {"action": "extract", "selector": ".s-result-item"}]
+
+
+@pytest.fixture
+def cache():
+    return PlanCache(ttl=60, max_entries=3, threshold=0.8, llm=WordEmbedder())
+
+
+def test_helpers():
+    assert normalize_query("  Search, LAPTOPS!  on amazon.in ") == "search laptops on amazon.in"
+    assert site_hints("search laptops on amazon.in") == frozenset({"amazon.in"})
+    assert site_hints("find phones on flipkart") == frozenset({"flipkart"})
+
+
+def test_exact_hit_ignores_case_and_punctuation(cache):
+    cache.store("search gaming laptops on amazon", PLAN)
+    hit = cache.lookup("Search gaming laptops on Amazon?")
+    assert hit["match"] == "exact" and hit["actions"] == PLAN
+    hit["actions"][0]["value"] = "changed"
+    assert cache.lookup("search gaming laptops on amazon")["actions"] == PLAN
+
+
+def test_similar_hit_needs_same_sites(cache):
+    cache.store("search gaming laptops on amazon", PLAN)
+    hit = cache.lookup("search cheap gaming laptops on amazon")
+    assert hit["match"] == "similar" and hit["cached_query"] == "search gaming laptops on amazon"
+    assert cache.lookup("search cheap gaming laptops on flipkart") is None
+
+
+def test_rejected_similar_hit_counts_as_miss(cache):
+    cache.store("search gaming laptops on amazon", PLAN)
+    assert cache.lookup("search cheap gaming laptops on amazon", lambda actions, cached: None) is None
+    hit = cache.lookup("search cheap gaming laptops on amazon", lambda actions, cached: actions[:1])
+    assert hit["actions"] == PLAN[:1]
+    stats = cache.get_stats()
+    assert (stats["similar_hits"], stats["rejected_hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+
+def test_lru_eviction_and_expiry(cache):
+    for query in ("laptops", "phones", "weather", "gaming"):
+        cache.store(query, PLAN)
+    assert cache.get_stats()["entries"] == 3
+    assert cache.lookup("laptops") is None
+    assert cache.lookup("gaming")["match"] == "exact"
+
+    expired = PlanCache(ttl=-1, llm=WordEmbedder())
+    expired.store("search laptops", PLAN)
+    assert expired.lookup("search laptops") is None
+
+
+def test_embedding_failure_pauses_similarity_lookups():
+    cache = PlanCache(ttl=60, llm=FailingEmbedder())
+    cache.store("search gaming laptops", PLAN)
+    assert cache.lookup("search gaming laptops")["match"] == "exact"
+    assert cache.lookup("search cheap gaming laptops") is None
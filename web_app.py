@@ -232,11 +232,12 @@ def handle_message(data):
     # Send typing indicator
     socketio.emit('typing_start')
     
-    # Process message (with small delay to show typing)
-    time.sleep(1)
+    def emit_chunk(chunk):
+        # Stream the reply as it is generated; message_response still carries the full text
+        socketio.emit('message_chunk', {'chunk': chunk, 'conversation_id': conversation_id})
     
     try:
-        result = chat_manager.process_message(user_input, conversation_id)
+        result = chat_manager.process_message(user_input, conversation_id, on_chunk=emit_chunk)
         
         # Prepare response data
         response_data = {